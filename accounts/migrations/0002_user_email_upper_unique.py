@@ -0,0 +1,24 @@
+# Case-insensitive unique email for auth_user, which signup relies on instead of a pre-check.
+# Fails if existing users have emails differing only in case; merge those first.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_upper_uniq '
+                "ON auth_user (UPPER(email)) WHERE email <> ''"
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_upper_uniq',
+        ),
+    ]
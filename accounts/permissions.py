@@ -1,45 +1,37 @@
 """
 Permissions for the accounts app.
+
+Role and verification checks read the cached profile (accounts.profiles),
+not request.user.profile, so they cost no query once a worker has seen the user.
 """
 
 from rest_framework import permissions
 from .models import UserRole
+from .profiles import profile_of
 
 
 class IsSeekerUser(permissions.BasePermission):
     """Permission to check if user is a Seeker"""
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == UserRole.SEEKER
-        )
+        profile = profile_of(request.user)
+        return profile is not None and profile['role'] == UserRole.SEEKER
 
 
 class IsFacilitatorUser(permissions.BasePermission):
     """Permission to check if user is a Facilitator"""
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == UserRole.FACILITATOR
-        )
+        profile = profile_of(request.user)
+        return profile is not None and profile['role'] == UserRole.FACILITATOR
 
 
 class IsEmailVerified(permissions.BasePermission):
     """Permission to check if user's email is verified"""
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.email_verified
-        )
+        profile = profile_of(request.user)
+        return profile is not None and profile['email_verified']
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -0,0 +1,49 @@
+"""
+Roles and verification of users, cached for permission checks.
+
+Every IsSeekerUser/IsFacilitatorUser check needs the requesting user's
+profile, one query per request. profile_of(user) answers from the two-tier
+cache (events_platform.tiered) instead, for PROFILE_CACHE_SECONDS. Saving
+or deleting a profile invalidates it in every worker, right away and again
+once the transaction commits (so that a request reading the old row in the
+meantime cannot cache it). Profiles are read from the primary, never from a
+replica that has yet to see the change.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from events_platform.tiered import TieredCache
+from .models import UserProfile
+
+profiles = TieredCache('accounts:profile')
+
+
+def profile_of(user):
+    """{'role', 'email_verified'} of the user's profile, or None when the user has none"""
+    if not user or not user.is_authenticated:
+        return None
+    if 'profile' in user._state.fields_cache:  # loaded with the user (select_related)
+        profile = user._state.fields_cache['profile']
+        return {'role': profile.role, 'email_verified': profile.email_verified} if profile else None
+
+    def build():
+        return UserProfile.objects.filter(user_id=user.pk).values('role', 'email_verified').first()
+    return profiles.get(str(user.pk), build, settings.PROFILE_CACHE_SECONDS)
+
+
+def invalidate(user_id):
+    profiles.invalidate(str(user_id))
+    transaction.on_commit(lambda: profiles.invalidate(str(user_id)))
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=UserProfile)
+def profile_deleted(sender, instance, **kwargs):
+    invalidate(instance.user_id)
@@ -3,9 +3,13 @@ Serializers for the accounts app.
 """
 
 from rest_framework import serializers
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from .models import UserProfile, UserRole
+from .tokens import CachedBlacklistRefreshToken
 
 
 class SignupSerializer(serializers.Serializer):
@@ -15,31 +19,31 @@ class SignupSerializer(serializers.Serializer):
     role = serializers.ChoiceField(choices=UserRole.choices, required=True)
 
     def validate_email(self, value):
-        """Check if email already exists"""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError({
-                "detail": "A user with this email already exists.",
-                "code": "email_exists"
-            })
+        """Normalize the email; uniqueness is enforced by the database"""
         return value.lower()
 
     def create(self, validated_data):
-        """Create user and profile"""
-        user = User.objects.create_user(
-            username=validated_data['email'],  # Use email as username
-            email=validated_data['email'],
-            password=validated_data['password']
-        )
-        user.is_active = True  # User is active but not verified
-        user.save()
-
-        # Create user profile
-        UserProfile.objects.create(
-            user=user,
-            role=validated_data['role'],
-            email_verified=False
-        )
+        """
+        Create user and profile in one transaction.
 
+        The password is hashed before the transaction starts so no connection
+        sits idle in a transaction during the hash. A duplicate email (in any
+        case) raises IntegrityError from auth_user_email_upper_uniq.
+        """
+        email = validated_data['email']
+        password = make_password(validated_data['password'])
+        with transaction.atomic():
+            user = User.objects.create(
+                username=email,  # Use email as username
+                email=email,
+                password=password,
+                is_active=True,  # User is active but not verified
+            )
+            user.profile = UserProfile.objects.create(
+                user=user,
+                role=validated_data['role'],
+                email_verified=False
+            )
         return user
 
 
@@ -64,3 +68,8 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'role', 'email_verified', 'date_joined']
         read_only_fields = ['id', 'email', 'role', 'email_verified', 'date_joined']
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh serializer that rotates tokens through the cache-backed blacklist"""
+    token_class = CachedBlacklistRefreshToken
@@ -0,0 +1,13 @@
+"""
+Celery tasks for the accounts app.
+"""
+
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.utils.dateparse import parse_datetime
+
+
+@shared_task(ignore_result=True)
+def record_last_login(user_id, timestamp):
+    """Write last_login for a login that already returned its tokens"""
+    User.objects.filter(pk=user_id).update(last_login=parse_datetime(timestamp))
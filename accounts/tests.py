@@ -79,7 +79,40 @@ class TestSignup:
         response = api_client.post('/auth/signup', data, format='json')
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'email_exists'
+
+    def test_signup_duplicate_email_other_case(self, api_client, create_user):
+        """Test that the unique index rejects an email differing only in case"""
+        create_user('Existing@Example.com', 'Pass123!', UserRole.SEEKER)
+
+        data = {
+            'email': 'EXISTING@example.COM',
+            'password': 'SecurePass123!',
+            'role': 'Seeker'
+        }
+        response = api_client.post('/auth/signup', data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'email_exists'
+        assert User.objects.count() == 1
+        assert not UserProfile.objects.filter(user__email='existing@example.com').exists()
     
+    def test_signup_retry_with_idempotency_key(self, api_client, django_assert_num_queries):
+        """Test that a retried signup gets the original 201 instead of email_exists, without queries"""
+        from django.core.cache import cache
+
+        cache.clear()
+        data = {'email': 'retry@example.com', 'password': 'SecurePass123!', 'role': 'Seeker'}
+        first = api_client.post('/auth/signup', data, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+        with django_assert_num_queries(0):
+            retry = api_client.post('/auth/signup', data, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+        plain_retry = api_client.post('/auth/signup', data, format='json')
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json() and retry['Idempotent-Replayed'] == 'true'
+        assert plain_retry.data['code'] == 'email_exists'
+        assert User.objects.filter(email='retry@example.com').count() == 1
+
     def test_signup_invalid_role(self, api_client):
         """Test signup with invalid role"""
         data = {
@@ -180,3 +213,139 @@ class TestLogin:
         response = api_client.post('/auth/login', data, format='json')
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_is_one_query_and_defers_last_login(self, api_client, create_user, monkeypatch):
+        """Test that login loads user and profile in one query and queues last_login"""
+        from events_platform.instrumentation import collect_queries
+        from accounts.tasks import record_last_login
+
+        user = create_user('fast@example.com', 'SecurePass123!', UserRole.SEEKER, verified=True)
+        queued = []
+        monkeypatch.setattr(record_last_login, 'delay', lambda *args: queued.append(args))
+
+        with collect_queries(record=True) as queries:
+            response = api_client.post(
+                '/auth/login', {'email': 'Fast@Example.com', 'password': 'SecurePass123!'}, format='json'
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user']['role'] == UserRole.SEEKER
+        assert queries.count == 1
+        assert 'user_profiles' in queries.statements[0][0]
+        assert queued and queued[0][0] == user.pk
+        record_last_login(*queued[0])
+        user.refresh_from_db()
+        assert user.last_login is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_outdated_password_hash_is_upgraded_after_login(api_client, create_user):
+    """Test that a hash from an older hasher is replaced off the request thread"""
+    from django.contrib.auth.hashers import make_password
+    from accounts import utils
+
+    user = create_user('legacy@example.com', 'SecurePass123!', UserRole.SEEKER, verified=True)
+    User.objects.filter(pk=user.pk).update(password=make_password('SecurePass123!', hasher='pbkdf2_sha1'))
+
+    response = api_client.post(
+        '/auth/login', {'email': 'legacy@example.com', 'password': 'SecurePass123!'}, format='json'
+    )
+    utils._rehash_executor.submit(lambda: None).result()  # single worker: earlier jobs are done
+
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert user.password.startswith('pbkdf2_sha256$')
+    assert user.check_password('SecurePass123!')
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    def test_email_bucket_returns_429_before_orm_work(self, api_client, create_user, settings):
+        """Test that the per-email bucket answers 429 with Retry-After and no queries"""
+        from events_platform.instrumentation import collect_queries
+
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, 'login': {'ip': '100/min', 'email': '2/min'}}
+        create_user('victim@example.com', 'SecurePass123!', UserRole.SEEKER, verified=True)
+        data = {'email': 'Victim@example.com', 'password': 'wrong'}
+
+        responses = [api_client.post('/auth/login', data, format='json') for _ in range(2)]
+        with collect_queries() as queries:
+            throttled = api_client.post('/auth/login', {**data, 'email': 'victim@example.com '}, format='json')
+        other = api_client.post('/auth/login', {'email': 'other@example.com', 'password': 'x'}, format='json')
+
+        assert [r.status_code for r in responses] == [401, 401]
+        assert throttled.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert throttled.data['code'] == 'throttled'
+        assert 1 <= int(throttled['Retry-After']) <= 30
+        assert queries.count == 0
+        assert other.status_code == 401
+
+    def test_throttled_ip_does_not_drain_email_bucket(self, api_client, settings):
+        """Test that IP and email buckets are checked in order and stop at the first empty one"""
+        settings.THROTTLE_RATES = {
+            **settings.THROTTLE_RATES, 'resend-otp': {'ip': '1/hour', 'email': '1/hour'},
+        }
+
+        def resend(email, ip):
+            return api_client.post('/auth/resend-otp', {'email': email}, format='json', REMOTE_ADDR=ip)
+
+        first = resend('a@example.com', '10.0.0.1')
+        blocked = resend('b@example.com', '10.0.0.1')
+        other_ip = resend('b@example.com', '10.0.0.2')
+
+        assert first.status_code == status.HTTP_404_NOT_FOUND
+        assert blocked.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert other_ip.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestTokenRefresh:
+    def test_rotated_refresh_token_is_blacklisted(self, api_client, create_user):
+        """Test that a rotated refresh token cannot be used again and the new one can"""
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from accounts.tokens import BLACKLIST_KEY
+
+        user = create_user('rotate@example.com', 'SecurePass123!', UserRole.SEEKER, verified=True)
+        original = RefreshToken.for_user(user)
+
+        rotated = api_client.post('/auth/refresh', {'refresh': str(original)}, format='json')
+        replayed = api_client.post('/auth/refresh', {'refresh': str(original)}, format='json')
+        rotated_again = api_client.post('/auth/refresh', {'refresh': rotated.data['refresh']}, format='json')
+
+        assert rotated.status_code == status.HTTP_200_OK
+        assert 'access' in rotated.data and rotated.data['refresh'] != str(original)
+        assert replayed.status_code == status.HTTP_401_UNAUTHORIZED
+        assert rotated_again.status_code == status.HTTP_200_OK
+        assert cache.get(BLACKLIST_KEY.format(original['jti'])) is not None
+        cache.clear()
+
+
+@pytest.mark.django_db
+class TestCachedPermissions:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        from events_platform import tiered
+        cache.clear()
+        tiered.clear_local()
+
+    def test_role_is_cached_until_the_profile_changes(self, api_client, create_user):
+        """Test that role checks skip the profile query once cached and see a role change at once"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = create_user('cached@example.com', 'SecurePass123!', UserRole.SEEKER, verified=True)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        assert api_client.get('/api/seeker/enrollments').status_code == status.HTTP_200_OK
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get('/api/seeker/enrollments').status_code == status.HTTP_200_OK
+        assert not any('user_profiles' in query['sql'] for query in queries.captured_queries)
+
+        profile = UserProfile.objects.get(user=user)
+        profile.role = UserRole.FACILITATOR
+        profile.save()
+        assert api_client.get('/api/seeker/enrollments').status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get('/api/facilitator/events').status_code == status.HTTP_200_OK
@@ -0,0 +1,39 @@
+"""
+Refresh tokens blacklisted in the cache.
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION, every refresh
+blacklists the token it was given. Instead of simplejwt's token_blacklist
+app (two tables that only grow, plus queries on every refresh), the JTI is
+stored in the default cache until the token would have expired anyway. In
+production that cache is Redis, so every web worker sees it. Blacklisting uses
+cache.add(), so two concurrent refreshes with the same token cannot both win.
+"""
+
+import math
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+BLACKLIST_KEY = 'jwt:blacklist:{}'
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist is a cache key per JTI, expiring with the token"""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        if cache.get(BLACKLIST_KEY.format(self.payload[api_settings.JTI_CLAIM])) is not None:
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        leeway = self.get_token_backend().get_leeway().total_seconds()
+        ttl = max(1, math.ceil(self.payload['exp'] - time.time() + leeway))
+        if not cache.add(BLACKLIST_KEY.format(self.payload[api_settings.JTI_CLAIM]), 1, timeout=ttl):
+            raise TokenError(_('Token is blacklisted'))
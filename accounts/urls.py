@@ -4,6 +4,7 @@ URL configuration for accounts app.
 
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from events_platform import query_budgets
 from . import views
 
 urlpatterns = [
@@ -15,3 +16,13 @@ urlpatterns = [
     path('refresh', TokenRefreshView.as_view(), name='token-refresh'),
     path('me', views.get_current_user, name='current-user'),
 ]
+
+# Maximum queries per request; must not grow with page size (see events_platform.query_budgets)
+query_budgets.declare({
+    'signup': 6,
+    'verify-email': 6,
+    'login': 2,
+    'resend-otp': 4,
+    'token-refresh': 1,
+    'current-user': 2,
+})
@@ -2,14 +2,27 @@
 Utility functions for the accounts app.
 """
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone
 from datetime import timedelta
+from kombu.exceptions import OperationalError
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
 from .models import OTP
+from .tasks import record_last_login
+
+logger = logging.getLogger(__name__)
+
+# Password upgrades run here rather than in Celery so the plaintext never reaches the broker
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-rehash')
 
 
 def send_otp_email(email, otp_code):
@@ -95,6 +108,51 @@ def verify_otp(email, otp_code):
         return False, str(e)
 
 
+def get_login_user(email):
+    """The user for this email with its profile in one query, or None (username is the lowercased email)"""
+    return User.objects.select_related('profile').filter(username=email.lower()).first()
+
+
+def check_login_password(user, password):
+    """
+    Verify the password once, without writing anything during the request.
+
+    If the hash uses an outdated hasher or iteration count, the upgrade is
+    computed and saved on a background thread after the response.
+    """
+    encoded = user.password
+    return check_password(
+        password, encoded, setter=lambda raw: _rehash_executor.submit(_rehash_in_background, user.pk, encoded, raw),
+    )
+
+
+def run_default_hasher(password):
+    """Hash once for an unknown email so its response takes as long as a wrong password"""
+    make_password(password)
+
+
+def rehash_password(user_id, old_encoded, raw_password):
+    """Store the password with the preferred hasher unless it changed meanwhile"""
+    User.objects.filter(pk=user_id, password=old_encoded).update(password=make_password(raw_password))
+
+
+def _rehash_in_background(user_id, old_encoded, raw_password):
+    try:
+        rehash_password(user_id, old_encoded, raw_password)
+    except Exception:
+        logger.exception('Password rehash failed for user %s', user_id)
+    finally:
+        connections.close_all()
+
+
+def defer_last_login(user):
+    """Queue the last_login update; a login never fails because the broker is down"""
+    try:
+        record_last_login.delay(user.pk, timezone.now().isoformat())
+    except OperationalError as exc:
+        logger.warning('Could not queue last_login update for user %s: %s', user.pk, exc)
+
+
 def custom_exception_handler(exc, context):
     """Custom exception handler for consistent error responses"""
     response = exception_handler(exc, context)
@@ -3,30 +3,43 @@ Views for the accounts app.
 """
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db import IntegrityError
+from events_platform.idempotency import idempotent
+from events_platform.throttling import TokenBucketThrottle
 from .serializers import SignupSerializer, VerifyEmailSerializer, LoginSerializer, UserSerializer
-from .utils import create_otp, verify_otp
+from .utils import (
+    check_login_password, create_otp, defer_last_login, get_login_user, run_default_hasher, verify_otp,
+)
 
 
+@idempotent()
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenBucketThrottle])
 def signup(request):
     """
     User signup endpoint
     POST /auth/signup
     Body: {email, password, role}
+    Header: optionally Idempotency-Key (a retry with the same key gets the first response)
     """
     serializer = SignupSerializer(data=request.data)
     
     if serializer.is_valid():
         try:
             user = serializer.save()
-            
+        except IntegrityError:
+            return Response({
+                'detail': 'A user with this email already exists.',
+                'code': 'email_exists'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
             # Generate and send OTP
             create_otp(user.email)
             
@@ -57,6 +70,7 @@ def signup(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenBucketThrottle])
 def verify_email(request):
     """
     Email verification endpoint
@@ -110,6 +124,7 @@ def verify_email(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenBucketThrottle])
 def login(request):
     """
     User login endpoint
@@ -134,43 +149,43 @@ def login(request):
     email = serializer.validated_data['email']
     password = serializer.validated_data['password']
     
-    try:
-        user = User.objects.get(email=email)
-        
-        # Check if email is verified
-        if not user.profile.email_verified:
-            return Response({
-                'detail': 'Email not verified. Please verify your email first.',
-                'code': 'email_not_verified'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
-        # Authenticate user
-        user = authenticate(username=email, password=password)
-        
-        if user is not None:
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
-            return Response({
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-                'user': UserSerializer(user).data
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'detail': 'Invalid credentials',
-                'code': 'invalid_credentials'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-            
-    except User.DoesNotExist:
+    # One query for user and profile; the password is hashed once
+    user = get_login_user(email)
+    if user is None:
+        run_default_hasher(password)
+        return Response({
+            'detail': 'Invalid credentials',
+            'code': 'invalid_credentials'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    # Check if email is verified
+    if not user.profile.email_verified:
+        return Response({
+            'detail': 'Email not verified. Please verify your email first.',
+            'code': 'email_not_verified'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    if not user.is_active or not check_login_password(user, password):
         return Response({
             'detail': 'Invalid credentials',
             'code': 'invalid_credentials'
         }, status=status.HTTP_401_UNAUTHORIZED)
 
+    defer_last_login(user)
+
+    # Generate JWT tokens
+    refresh = RefreshToken.for_user(user)
+
+    return Response({
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': UserSerializer(user).data
+    }, status=status.HTTP_200_OK)
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenBucketThrottle])
 def resend_otp(request):
     """
     Resend OTP endpoint
@@ -0,0 +1,108 @@
+"""
+Compare the sync DRF read endpoints with their async counterparts.
+
+Start the server under uvicorn workers first, for example:
+    gunicorn -w 3 -k uvicorn.workers.UvicornWorker events_platform.asgi:application
+
+Then run:
+    python -m benchmarks.bench_async_read_path --base-url http://127.0.0.1:8000 --connections 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events.models import Event, Enrollment
+from benchmarks import loadgen
+
+BENCH_SEEKER = 'bench-seeker@example.com'
+BENCH_FACILITATOR = 'bench-facilitator@example.com'
+
+ENDPOINTS = [
+    ('search', '/api/events/search/?language=English', '/api/async/events/search/?language=English'),
+    ('list', '/api/events/', '/api/async/events/'),
+    ('detail', '/api/events/{event_id}/', '/api/async/events/{event_id}/'),
+    ('my_enrollments', '/api/seeker/enrollments', '/api/async/seeker/enrollments'),
+]
+
+
+def get_bench_user(email, role):
+    user, created = User.objects.get_or_create(username=email, defaults={'email': email})
+    if created:
+        user.set_password('BenchPass123!')
+        user.save()
+    UserProfile.objects.get_or_create(user=user, defaults={'role': role, 'email_verified': True})
+    return user
+
+
+def seed(events):
+    """Make sure the benchmark users and a minimum number of events exist"""
+    seeker = get_bench_user(BENCH_SEEKER, UserRole.SEEKER)
+    facilitator = get_bench_user(BENCH_FACILITATOR, UserRole.FACILITATOR)
+
+    existing = Event.objects.filter(created_by=facilitator).count()
+    starts_at = timezone.now() + timedelta(days=1)
+    Event.objects.bulk_create([
+        Event(
+            title=f'Benchmark event {i}',
+            description='Seeded by benchmarks.bench_async_read_path',
+            language='English',
+            location='Benchmark City',
+            starts_at=starts_at + timedelta(hours=i),
+            ends_at=starts_at + timedelta(hours=i, minutes=90),
+            capacity=1000,
+            created_by=facilitator,
+        )
+        for i in range(existing, events)
+    ])
+
+    event_ids = list(Event.objects.filter(created_by=facilitator).values_list('id', flat=True)[:20])
+    Enrollment.objects.bulk_create(
+        [Enrollment(event_id=event_id, seeker=seeker) for event_id in event_ids],
+        ignore_conflicts=True,
+    )
+    return seeker, event_ids[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--events', type=int, default=200, help='minimum number of seeded events')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    seeker, event_id = seed(args.events)
+    headers = {'Authorization': f'Bearer {RefreshToken.for_user(seeker).access_token}'}
+
+    results = {}
+    for name, sync_path, async_path in ENDPOINTS:
+        for variant, path in (('sync', sync_path), ('async', async_path)):
+            path = path.format(event_id=event_id)
+            summary = asyncio.run(loadgen.run(
+                args.base_url, [path], connections=args.connections,
+                duration=args.duration, headers=headers,
+            ))
+            results[f'{name}.{variant}'] = summary
+            print(f"{name:<15} {variant:<6} rps={summary['rps']:<8} p50={summary['p50_ms']}ms "
+                  f"p99={summary['p99_ms']}ms errors={summary['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'connections': args.connections, 'results': results}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
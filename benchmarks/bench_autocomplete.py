@@ -0,0 +1,119 @@
+"""
+Autocomplete prefix index: lookup latency, update cost and memory at scale.
+
+Builds an events.autocomplete.PrefixIndex from --entries synthetic upcoming
+events (titles like the seed data's, skewed locations and languages), then
+reports:
+
+    build     time to load the index
+    memory    bytes allocated by the loaded index (tracemalloc, on a separate
+              build), in total and per entry
+    lookup    suggest() latency for prefixes of 1-8 characters taken from
+              indexed words
+    update    put() latency for renamed events, including delta merges
+
+No database is needed; the index is what serves GET /api/events/autocomplete
+once a worker has started.
+
+    python -m benchmarks.bench_autocomplete --entries 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+django.setup()
+
+from faker import Faker
+from events.autocomplete import PrefixIndex, normalize
+from events.management.commands.seed_platform import FORMATS, LANGUAGES, LOCATIONS, TOPICS
+from benchmarks.loadgen import percentile
+
+
+def records(count, rng, faker):
+    languages, language_weights = zip(*LANGUAGES)
+    locations, location_weights = zip(*LOCATIONS)
+    expires_at = time.time() + 365 * 86400
+    for pk in range(count):
+        title = f'{rng.choice(TOPICS)} {rng.choice(FORMATS)}: {faker.catch_phrase()}'
+        yield (
+            pk, expires_at, title,
+            rng.choices(locations, location_weights)[0], rng.choices(languages, language_weights)[0],
+        )
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return {
+        'p50_us': round(percentile(timings, 50) * 1e6, 1),
+        'p99_us': round(percentile(timings, 99) * 1e6, 1),
+        'max_us': round(timings[-1] * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    parser.add_argument('--updates', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    faker = Faker()
+    faker.seed_instance(args.seed)
+    rows = list(records(args.entries, rng, faker))
+
+    tracemalloc.start()
+    traced = PrefixIndex()
+    traced.load(iter(rows))  # traced separately: tracing slows the build down
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    index = PrefixIndex()
+    started = time.perf_counter()
+    index.load(iter(rows))
+    build_s = time.perf_counter() - started
+    stats = index.stats()
+
+    words = [word for row in rng.sample(rows, 2000) for word in normalize(row[2]).split()]
+    prefixes = [word[:rng.randint(1, 8)] for word in rng.choices(words, k=args.lookups)]
+    lookups = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix)
+        lookups.append(time.perf_counter() - started)
+
+    updates = []
+    for pk, expires_at, title, location, language in rng.sample(rows, args.updates):
+        started = time.perf_counter()
+        index.put(pk, expires_at, f'{title} (rescheduled)', location, language)
+        updates.append(time.perf_counter() - started)
+
+    results = {
+        'entries': args.entries,
+        'keys': stats['keys'],
+        'distinct_values': stats['values'],
+        'build_s': round(build_s, 2),
+        'memory_mb': round(memory / 2 ** 20, 1),
+        'bytes_per_entry': round(memory / args.entries),
+        'lookup': summary(lookups),
+        'update': summary(updates),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure database connection overhead per request.
+
+Each simulated request checks out a connection, runs the `SELECT 1` a cheap
+endpoint like /api/health/ or /auth/me would cost at minimum, and then
+closes it as Django does at request end. Modes compared:
+
+    fresh       stock backend, CONN_MAX_AGE=0 (new TCP/TLS/auth every request)
+    persistent  stock backend, connection kept open (single-threaded reference)
+    pooled      events_platform.db.backends.postgresql_pool
+
+Usage:
+    python -m benchmarks.bench_db_connections --requests 500
+"""
+
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+django.setup()
+
+from django.db import connections
+from django.db.utils import load_backend
+from benchmarks.loadgen import percentile
+
+STOCK_ENGINE = 'django.db.backends.postgresql'
+POOL_ENGINE = 'events_platform.db.backends.postgresql_pool'
+
+
+def make_wrapper(engine, conn_max_age, options):
+    settings_dict = {
+        **connections['default'].settings_dict,
+        'ENGINE': engine,
+        'CONN_MAX_AGE': conn_max_age,
+        'OPTIONS': options,
+    }
+    return load_backend(engine).DatabaseWrapper(settings_dict, alias=f'bench-{engine}')
+
+
+def measure(wrapper, requests, close_each_request):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        if close_each_request:
+            wrapper.close()
+        timings.append(time.perf_counter() - started)
+    wrapper.close()
+
+    timings.sort()
+    return {
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    base_options = {
+        key: value for key, value in connections['default'].settings_dict['OPTIONS'].items() if key != 'pool'
+    }
+    pooled = make_wrapper(POOL_ENGINE, 0, {**base_options, 'pool': {'min_size': 1, 'max_size': 1}})
+    pooled.warm_pool()
+
+    results = {
+        'fresh': measure(make_wrapper(STOCK_ENGINE, 0, base_options), args.requests, True),
+        'persistent': measure(make_wrapper(STOCK_ENGINE, None, base_options), args.requests, False),
+        'pooled': measure(pooled, args.requests, True),
+    }
+    pooled.pool.close()
+
+    for mode, summary in results.items():
+        print(f"{mode:<11} mean={summary['mean_ms']}ms p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms")
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
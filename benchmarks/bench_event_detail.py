@@ -0,0 +1,175 @@
+"""
+Event detail stampede: concurrent GET /api/events/{id}/ when the cached detail goes away.
+
+Seeds a throwaway test database with one event holding --enrollments
+enrollments, then releases --concurrency threads (one web worker's threads,
+each with its own database connection) on its detail at the same moment,
+--rounds times per mode:
+
+    naive   cache.get/cache.set around the serializer: every request that
+            misses rebuilds the detail (the enrollment COUNT included)
+    miss    the single-flight cache after the entry was dropped: one
+            request builds, the others wait for its result
+    stale   the single-flight cache after an edit expired the entry: one
+            request rebuilds, the others get the previous detail at once
+    warm    nothing changed: answered from each worker's in-process tier
+            (events_platform.tiered) without a shared cache round-trip
+
+and reports the builds per round, the request latency p50/p99 and, for the
+two-tier cache, the share of lookups answered without a build.
+
+    python -m benchmarks.bench_event_detail --concurrency 50 --enrollments 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events import detail
+from events.models import Enrollment, Event
+from events_platform import tiered
+from benchmarks.loadgen import percentile
+
+MODES = ('naive', 'miss', 'stale', 'warm')
+
+
+def make_user(email, role):
+    user = User.objects.create_user(username=email, email=email)
+    UserProfile.objects.create(user=user, role=role, email_verified=True)
+    return user
+
+
+def seed(enrollments):
+    facilitator = make_user('bench-facilitator@example.com', UserRole.FACILITATOR)
+    starts_at = timezone.now() + timedelta(days=7)
+    event = Event.objects.create(
+        title='Popular event', description='Seeded by benchmarks.bench_event_detail', language='English',
+        location='Online', starts_at=starts_at, ends_at=starts_at + timedelta(hours=2), created_by=facilitator,
+    )
+    seekers = User.objects.bulk_create([User(username=f'bench-seeker{i}@example.com') for i in range(enrollments)])
+    Enrollment.objects.bulk_create([Enrollment(event=event, seeker=seeker) for seeker in seekers])
+    return event, make_user('bench-reader@example.com', UserRole.SEEKER)
+
+
+def naive_cached(event_id, build):
+    """What the detail cache would be without single-flight"""
+    key = detail.details.shared_key(event_id)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.EVENT_DETAIL_CACHE_SECONDS)
+    return data
+
+
+def stampede(path, headers, concurrency):
+    """Latencies of `concurrency` threads requesting `path` at once"""
+    barrier = threading.Barrier(concurrency)
+    latencies = []
+
+    def request():
+        client = Client()
+        try:
+            barrier.wait()
+            started = time.perf_counter()
+            response = client.get(path, secure=True, **headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=request) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def measure(mode, event, headers, concurrency, rounds):
+    """(latencies, builds per round) of `rounds` stampedes on the event's detail"""
+    single_flight = detail.cached
+    backend = naive_cached if mode == 'naive' else single_flight
+    builds = [0]
+
+    def counting(event_id, build):
+        def counted():
+            builds[0] += 1
+            return build()
+        return backend(event_id, counted)
+
+    path = f'/api/events/{event.pk}/'
+    latencies, per_round = [], []
+    detail.cached = counting
+    try:
+        cache.clear()
+        tiered.clear_local()
+        detail.details.counts.update(dict.fromkeys(detail.details.counts, 0))
+        for _ in range(rounds):
+            if mode != 'warm':
+                cache.clear()
+                tiered.clear_local()
+            if mode == 'stale':
+                Client().get(path, secure=True, **headers)  # cached, then an edit expires it
+                detail.details.invalidate(str(event.pk), stale=True)
+            builds[0] = 0
+            latencies.extend(stampede(path, headers, concurrency))
+            per_round.append(builds[0])
+    finally:
+        detail.cached = single_flight
+    return sorted(latencies), per_round
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50, help='requests released at once (and connections)')
+    parser.add_argument('--enrollments', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        event, reader = seed(args.enrollments)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(reader).access_token}'}
+        results = {'concurrency': args.concurrency, 'enrollments': args.enrollments}
+        for mode in MODES:
+            latencies, builds = measure(mode, event, headers, args.concurrency, args.rounds)
+            results[mode] = {
+                'builds_per_round': round(sum(builds) / len(builds), 1),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            }
+            if mode != 'naive':
+                results[mode]['hit_rate'] = detail.details.stats()['hit_rate']
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Search cost of recurring events: an EventSeries against pre-created Event rows.
+
+For each horizon (number of weekly occurrences) a fresh set of weekly classes
+is created twice, once as EventSeries rows and once as one Event row per
+occurrence, and /api/events/search/ is timed against each. The series cost
+follows the search window (EVENT_SERIES_WINDOW_DAYS), not the horizon; the
+pre-created rows grow the table with every week added.
+
+Runs against a throwaway test database:
+    python -m benchmarks.bench_event_series --classes 50 --horizons 52 520 0 --requests 200
+
+A horizon of 0 is an open-ended series (no COUNT/UNTIL); it has no
+pre-created counterpart.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events.models import Event, EventSeries
+from events_platform.instrumentation import collect_queries
+from benchmarks.loadgen import percentile
+
+LOCATION = 'Series City'
+
+
+def make_user(email, role):
+    user = User.objects.create_user(username=email, email=email, password='BenchPass123!')
+    UserProfile.objects.create(user=user, role=role, email_verified=True)
+    return user
+
+
+def create_classes(facilitator, classes, horizon, as_series):
+    """`classes` weekly classes of `horizon` occurrences, as series or as pre-created events"""
+    first = (timezone.now() + timedelta(hours=1)).replace(microsecond=0)
+    fields = {'description': 'Seeded by benchmarks.bench_event_series', 'language': 'English',
+              'location': LOCATION, 'capacity': 30, 'created_by': facilitator}
+    if as_series:
+        for i in range(classes):
+            starts_at = first + timedelta(hours=i)
+            EventSeries.objects.create(
+                title=f'Weekly class {i}', starts_at=starts_at, ends_at=starts_at + timedelta(hours=1),
+                rrule=f'FREQ=WEEKLY;COUNT={horizon}' if horizon else 'FREQ=WEEKLY', **fields,
+            )
+        return
+    Event.objects.bulk_create([
+        Event(
+            title=f'Weekly class {i}', starts_at=first + timedelta(hours=i, weeks=week),
+            ends_at=first + timedelta(hours=i + 1, weeks=week), **fields,
+        )
+        for i in range(classes)
+        for week in range(horizon)
+    ], batch_size=5000)
+
+
+def measure(client, headers, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        with collect_queries() as queries:
+            response = client.get('/api/events/search/', {'location': LOCATION}, secure=True, **headers)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.content
+    timings.sort()
+    return {
+        'rows': Event.objects.count() + EventSeries.objects.count(),
+        'count': response.json()['count'],
+        'p50_ms': round(percentile(timings, 50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2),
+        'queries': queries.count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--classes', type=int, default=50, help='weekly classes per run')
+    parser.add_argument('--horizons', type=int, nargs='+', default=[52, 520, 0], help='occurrences per class')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        facilitator = make_user('bench-facilitator@example.com', UserRole.FACILITATOR)
+        token = RefreshToken.for_user(make_user('bench-seeker@example.com', UserRole.SEEKER))
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token.access_token}'}
+        client = Client()
+
+        results = []
+        for horizon in args.horizons:
+            for mode in ('series', 'events'):
+                if mode == 'events' and not horizon:
+                    continue
+                Event.objects.all().delete()
+                EventSeries.objects.all().delete()
+                create_classes(facilitator, args.classes, horizon, mode == 'series')
+                result = {'mode': mode, 'horizon': horizon or 'open', **measure(client, headers, args.requests)}
+                results.append(result)
+                print(f"{mode:<7} horizon={result['horizon']:<5} rows={result['rows']:<7} "
+                      f"count={result['count']:<6} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                      f"queries={result['queries']}")
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Radius search latency over geocoded events.
+
+Seeds a throwaway test database with `manage.py seed_platform --events N`
+(events scattered around the gazetteer cities, about a third of them online
+and without coordinates) and, for each radius, times a search around a set of
+points:
+
+    geohash   geo.within(): geohash range scans on events_geohash_idx, then
+              the bounding box and the haversine distance
+    naive     the haversine distance over every located event (no index)
+    endpoint  GET /api/events/search/?lat=..&lng=..&radius_km=..&ordering=distance
+
+Times for the two queries are Postgres execution times from EXPLAIN ANALYZE;
+the endpoint time is wall time through the full middleware stack.
+
+    python -m benchmarks.bench_geo_search --events 1000000 --radii 1 10 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events import geo
+from events.models import Event
+from benchmarks.loadgen import percentile
+
+CITIES = ['mumbai', 'kolkata', 'london', 'tokyo', 'paris', 'sydney']
+
+
+def make_user(email, role):
+    user = User.objects.create_user(username=email, email=email, password='BenchPass123!')
+    UserProfile.objects.create(user=user, role=role, email_verified=True)
+    return user
+
+
+def points(count, rng):
+    """Points near seeded cities (dense), plus one with no events nearby (Sydney is not seeded)"""
+    places = [geo.GazetteerGeocoder.PLACES[city] for city in CITIES]
+    return [
+        (lat + rng.gauss(0, 0.05), lng + rng.gauss(0, 0.05))
+        for lat, lng in (places[i % len(places)] for i in range(count))
+    ]
+
+
+def execution_ms(queryset):
+    """Postgres execution time of a queryset, from EXPLAIN ANALYZE"""
+    plan = queryset.explain(analyze=True)
+    return float(re.search(r'Execution Time: ([\d.]+) ms', plan).group(1)), plan
+
+
+def measure(client, headers, radius_km, targets):
+    indexed, naive, endpoint, matches = [], [], [], []
+    located = Event.objects.filter(latitude__isnull=False)
+    for lat, lng in targets:
+        nearby = geo.within(Event.objects.all(), lat, lng, radius_km)
+        ms, plan = execution_ms(nearby)
+        indexed.append(ms)
+        matches.append(nearby.count())
+        scan = located.annotate(distance_km=geo.distance_km(lat, lng)).filter(distance_km__lte=radius_km)
+        naive.append(execution_ms(scan)[0])
+
+        started = time.perf_counter()
+        response = client.get('/api/events/search/', {
+            'lat': lat, 'lng': lng, 'radius_km': radius_km, 'ordering': 'distance',
+        }, secure=True, **headers)
+        endpoint.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.content
+
+    def p50(values):
+        return round(percentile(sorted(values), 50), 2)
+
+    return {
+        'radius_km': radius_km,
+        'matches_p50': int(percentile(sorted(matches), 50)),
+        'geohash_p50_ms': p50(indexed),
+        'naive_p50_ms': p50(naive),
+        'endpoint_p50_ms': p50(endpoint),
+        'endpoint_p95_ms': round(percentile(sorted(endpoint), 95), 2),
+        'uses_index': 'events_geohash' in plan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--radii', type=float, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--points', type=int, default=30, help='search points per radius')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        started = time.perf_counter()
+        call_command('seed_platform', users=1000, events=args.events, enrollments_per_event='fixed:0',
+                     seed=args.seed, verbosity=0)
+        print(f'seeded {args.events} events in {time.perf_counter() - started:.0f}s')
+
+        token = RefreshToken.for_user(make_user('bench-seeker@example.com', UserRole.SEEKER))
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token.access_token}'}
+        client = Client()
+        targets = points(args.points, random.Random(args.seed))
+
+        results = []
+        for radius_km in args.radii:
+            result = measure(client, headers, radius_km, targets)
+            results.append(result)
+            print(f"radius={radius_km:<5g}km matches={result['matches_p50']:<7} "
+                  f"geohash={result['geohash_p50_ms']}ms naive={result['naive_p50_ms']}ms "
+                  f"endpoint p50={result['endpoint_p50_ms']}ms p95={result['endpoint_p95_ms']}ms "
+                  f"index={result['uses_index']}")
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Cost of the seeker schedule-conflict checks as enrollments grow.
+
+Seeds a throwaway test database with --events events spread over two years,
+--background-enrollments enrollments of other seekers, and one seeker per
+--enrollments size, enrolled in that many of them. For each seeker it times:
+
+    check     find_conflicts() for a new event (range overlap via events_period_gist)
+    naive     the same check as starts_at < end AND ends_at > start over the
+              seeker's enrollments (no range index)
+    list      schedule_conflicts(), the sweep behind GET /api/seeker/conflicts
+
+Times are Postgres execution times from EXPLAIN ANALYZE for the two checks,
+and wall time around the Python call for the sweep.
+
+    python -m benchmarks.bench_schedule_conflicts --events 100000 --enrollments 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.utils import timezone
+from accounts.models import UserProfile, UserRole
+from events.conflicts import enrolled_events, find_conflicts, schedule_conflicts
+from events.models import Enrollment, Event
+from benchmarks.loadgen import percentile
+
+HORIZON_HOURS = 2 * 365 * 24
+
+
+def make_user(email, role):
+    user = User.objects.create_user(username=email, email=email, password='BenchPass123!')
+    UserProfile.objects.create(user=user, role=role, email_verified=True)
+    return user
+
+
+def seed(events, sizes, background, rng):
+    facilitator = make_user('bench-facilitator@example.com', UserRole.FACILITATOR)
+    now = timezone.now()
+    Event.objects.bulk_create([
+        Event(
+            title=f'Benchmark event {i}', description='Seeded by benchmarks.bench_schedule_conflicts',
+            language='English', location='Online', starts_at=now + timedelta(hours=offset),
+            ends_at=now + timedelta(hours=offset + rng.choice([1, 2, 3])), capacity=None, created_by=facilitator,
+        )
+        for i, offset in enumerate(rng.uniform(1, HORIZON_HOURS) for _ in range(events))
+    ], batch_size=5000)
+
+    event_ids = list(Event.objects.values_list('id', flat=True))
+    others = [make_user(f'bench-other-{i}@example.com', UserRole.SEEKER) for i in range(max(1, background // 100))]
+    Enrollment.objects.bulk_create(
+        [Enrollment(event_id=rng.choice(event_ids), seeker=rng.choice(others)) for _ in range(background)],
+        batch_size=5000, ignore_conflicts=True,
+    )
+    seekers = {}
+    for size in sizes:
+        seeker = make_user(f'bench-seeker-{size}@example.com', UserRole.SEEKER)
+        Enrollment.objects.bulk_create(
+            [Enrollment(event_id=event_id, seeker=seeker) for event_id in rng.sample(event_ids, size)],
+            batch_size=5000,
+        )
+        seekers[size] = seeker
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE events; ANALYZE enrollments')
+    return seekers, event_ids
+
+
+def execution_ms(queryset):
+    """Postgres execution time of a queryset, from EXPLAIN ANALYZE"""
+    plan = queryset.explain(analyze=True)
+    return float(re.search(r'Execution Time: ([\d.]+) ms', plan).group(1)), plan
+
+
+def measure(seeker, candidates, repeat):
+    check, naive, listing = [], [], []
+    for event in candidates[:repeat]:
+        overlapping = enrolled_events(seeker).overlapping(event.starts_at, event.ends_at).exclude(pk=event.pk)
+        ms, plan = execution_ms(overlapping)
+        check.append(ms)
+        find_conflicts(seeker, event)
+        plain = enrolled_events(seeker).filter(starts_at__lt=event.ends_at, ends_at__gt=event.starts_at)
+        naive.append(execution_ms(plain.exclude(pk=event.pk))[0])
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pairs = schedule_conflicts(seeker)
+        listing.append((time.perf_counter() - started) * 1000)
+
+    def p50(values):
+        return round(percentile(sorted(values), 50), 3)
+
+    return {
+        'check_p50_ms': p50(check),
+        'naive_p50_ms': p50(naive),
+        'list_p50_ms': p50(listing),
+        'conflict_pairs': len(pairs),
+        'uses_gist': 'events_period_gist' in plan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100_000)
+    parser.add_argument('--enrollments', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--background-enrollments', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        rng = random.Random(args.seed)
+        seekers, event_ids = seed(args.events, args.enrollments, args.background_enrollments, rng)
+        candidates = list(Event.objects.filter(pk__in=rng.sample(event_ids, args.repeat)))
+
+        results = {}
+        for size, seeker in seekers.items():
+            results[size] = measure(seeker, candidates, args.repeat)
+            summary = results[size]
+            print(f"enrollments={size:<6} check={summary['check_p50_ms']}ms naive={summary['naive_p50_ms']}ms "
+                  f"list={summary['list_p50_ms']}ms pairs={summary['conflict_pairs']} "
+                  f"gist={summary['uses_gist']}")
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
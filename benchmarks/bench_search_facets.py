@@ -0,0 +1,113 @@
+"""
+Cost of search sidebar counts: per-value count requests against ?facets=.
+
+Seeds a throwaway test database with `manage.py seed_platform --events N` and
+times, for a few search filters, the counts a filter sidebar shows:
+
+    per_value  one search request per language and per location value,
+               reading `count` (what clients do without facets)
+    miss       one search request with ?facets=language,location,date and
+               an empty cache (the GROUPING SETS query)
+    hit        the same request with the counts cached
+
+    python -m benchmarks.bench_search_facets --events 100000 --requests 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events.management.commands.seed_platform import LANGUAGES, LOCATIONS
+from events_platform.instrumentation import collect_queries
+from benchmarks.loadgen import percentile
+
+FILTERS = [{}, {'q': 'python'}, {'location': 'mumbai'}]
+
+
+def make_user(email, role):
+    user = User.objects.create_user(username=email, email=email, password='BenchPass123!')
+    UserProfile.objects.create(user=user, role=role, email_verified=True)
+    return user
+
+
+def timed(client, headers, requests):
+    """(wall ms, queries) of a list of (params) search requests"""
+    started = time.perf_counter()
+    with collect_queries() as queries:
+        for params in requests:
+            response = client.get('/api/events/search/', params, secure=True, **headers)
+            assert response.status_code == 200, response.content
+    return (time.perf_counter() - started) * 1000, queries.count
+
+
+def measure(client, headers, filters, repeat):
+    per_value_requests = (
+        [{**filters, 'language': language} for language, _ in LANGUAGES]
+        + [{**filters, 'location': location} for location, _ in LOCATIONS]
+    )
+    faceted = [{**filters, 'facets': 'language,location,date'}]
+    results = {}
+    for mode in ('per_value', 'miss', 'hit'):
+        timings = []
+        for _ in range(repeat):
+            if mode != 'hit':
+                cache.clear()
+            else:
+                timed(client, headers, faceted)
+            ms, queries = timed(client, headers, per_value_requests if mode == 'per_value' else faceted)
+            timings.append(ms)
+        timings.sort()
+        results[mode] = {'p50_ms': round(percentile(timings, 50), 2), 'queries': queries}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100_000)
+    parser.add_argument('--requests', type=int, default=20, help='repetitions per filter and mode')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        call_command('seed_platform', users=1000, events=args.events, enrollments_per_event='uniform:0-20',
+                     seed=args.seed, verbosity=0)
+        token = RefreshToken.for_user(make_user('bench-seeker@example.com', UserRole.SEEKER))
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token.access_token}'}
+        client = Client()
+
+        results = []
+        for filters in FILTERS:
+            result = {'filters': filters, **measure(client, headers, filters, args.requests)}
+            results.append(result)
+            print(f"filters={json.dumps(filters):<24} " + ' '.join(
+                f"{mode}={result[mode]['p50_ms']}ms/{result[mode]['queries']}q" for mode in ('per_value', 'miss', 'hit')
+            ))
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Live seat count streams: concurrent subscribers on one ASGI worker.
+
+Serves events_platform.asgi with one uvicorn worker (in a thread of this
+process, on a throwaway test database), opens --subscribers SSE streams
+(GET /api/events/{id}/seats/stream) from a separate client process, spread
+over --events events, then delivers --rate seat count changes per second
+for --duration seconds, as enroll/cancel would. Half of the changes go to
+one hot event. Reports:
+
+    connect     time until every stream got its first count, and failures
+    memory      worker RSS growth per open stream
+    published   changes delivered to the worker
+    received    updates the streams got, and the most one stream got per
+                second (coalescing caps it at one per event per second)
+    latency     change to update on the client, p50/p99 (includes the
+                coalescing wait of up to a second)
+
+Changes are handed to the worker's feed directly (what a message from the
+'seats' Redis channel does), so no Redis server is needed.
+
+    python -m benchmarks.bench_seat_stream --subscribers 10000 --rate 500
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import UserProfile, UserRole
+from events.models import Event
+from events_platform.db.pool import close_pools
+from benchmarks.loadgen import percentile
+
+CONNECTING = 500  # streams opening at once
+
+
+def rss_mb():
+    with open('/proc/self/status') as fh:
+        for line in fh:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def subscribe(port, path, token, gate, stop, stats):
+    """One stream: record the latency of every update after the first count"""
+    async with gate:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {token}\r\n'
+                f'Accept: text/event-stream\r\n\r\n'.encode()
+            )
+            head = await reader.readuntil(b'\r\n\r\n')
+            if b' 200 ' not in head.split(b'\r\n', 1)[0]:
+                raise ConnectionError(head.split(b'\r\n', 1)[0].decode())
+            while not (await reader.readline()).startswith(b'data: '):
+                pass
+        except (OSError, asyncio.IncompleteReadError, ConnectionError):
+            stats['failed'] += 1
+            return
+    stats['connected'] += 1
+
+    received = 0
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b'data: '):
+                stats['latencies'].append(time.time() - json.loads(line[6:])['at'])
+                received += 1
+    finally:
+        stats['per_stream'].append(received)
+        writer.close()
+
+
+async def run_clients(port, paths, token, connected, stop_flag, results):
+    stats = {'connected': 0, 'failed': 0, 'latencies': [], 'per_stream': []}
+    gate = asyncio.Semaphore(CONNECTING)
+    stop = asyncio.Event()
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(subscribe(port, path, token, gate, stop, stats)) for path in paths]
+    while stats['connected'] + stats['failed'] < len(paths):
+        await asyncio.sleep(0.1)
+    connected.put((stats['connected'], stats['failed'], time.perf_counter() - started))
+
+    while not stop_flag.is_set():
+        await asyncio.sleep(0.1)
+    stop.set()
+    await asyncio.sleep(1)  # let updates in flight arrive
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    results.put({key: stats[key] for key in ('latencies', 'per_stream')})
+
+
+def client_process(port, paths, token, connected, stop_flag, results):
+    asyncio.run(run_clients(port, paths, token, connected, stop_flag, results))
+
+
+def serve(port):
+    """Start uvicorn on a daemon thread; returns the server"""
+    import uvicorn
+    from events_platform.asgi import application
+
+    server = uvicorn.Server(uvicorn.Config(
+        application, host='127.0.0.1', port=port, lifespan='off', log_level='warning', backlog=CONNECTING * 2,
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def deliver_changes(events, rate, duration, rng):
+    """Seat count changes at `rate` per second, half of them on the first (hot) event"""
+    from events import seats
+
+    sent = 0
+    enrolled = {event.pk: 0 for event in events}
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        event = events[0] if rng.random() < 0.5 else rng.choice(events)
+        enrolled[event.pk] += 1
+        seats.deliver({
+            'event': event.pk, 'capacity': event.capacity, 'enrolled': enrolled[event.pk],
+            'available_seats': event.capacity - enrolled[event.pk], 'at': time.time(),
+        })
+        sent += 1
+        time.sleep(max(0.0, started + sent / rate - time.perf_counter()))
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=10_000)
+    parser.add_argument('--events', type=int, default=100)
+    parser.add_argument('--rate', type=int, default=500, help='seat count changes per second, all events')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        facilitator = User.objects.create_user(username='bench-facilitator@example.com')
+        UserProfile.objects.create(user=facilitator, role=UserRole.FACILITATOR, email_verified=True)
+        seeker = User.objects.create_user(username='bench-seeker@example.com')
+        UserProfile.objects.create(user=seeker, role=UserRole.SEEKER, email_verified=True)
+        starts_at = timezone.now() + timedelta(days=1)
+        events = Event.objects.bulk_create([
+            Event(
+                title=f'Stream event {i}', description='Seeded by benchmarks.bench_seat_stream',
+                language='English', location='Online', starts_at=starts_at, ends_at=starts_at + timedelta(hours=2),
+                capacity=10 ** 9, created_by=facilitator,
+            )
+            for i in range(args.events)
+        ])
+        token = str(RefreshToken.for_user(seeker).access_token)
+        paths = [f'/api/events/{events[i % len(events)].pk}/seats/stream' for i in range(args.subscribers)]
+
+        port = free_port()
+        server = serve(port)
+        idle_mb = rss_mb()
+
+        spawn = multiprocessing.get_context('spawn')
+        connected, results, stop_flag = spawn.Queue(), spawn.Queue(), spawn.Event()
+        client = spawn.Process(target=client_process, args=(port, paths, token, connected, stop_flag, results))
+        client.start()
+        streams, failed, connect_s = connected.get()
+        streams_mb = rss_mb()
+
+        published = deliver_changes(events, args.rate, args.duration, random.Random(args.seed))
+        stop_flag.set()
+        received = results.get()
+        client.join()
+        server.should_exit = True
+    finally:
+        close_pools()  # connections the worker opened with DB_POOL_MAX_SIZE set
+        teardown_databases(old_config, verbosity=0)
+
+    latencies = sorted(received['latencies'])
+    per_stream = received['per_stream']
+    summary = {
+        'subscribers': args.subscribers,
+        'events': args.events,
+        'connect': {'streams': streams, 'failed': failed, 'seconds': round(connect_s, 1)},
+        'memory': {
+            'idle_mb': round(idle_mb, 1),
+            'streams_mb': round(streams_mb, 1),
+            'kb_per_stream': round((streams_mb - idle_mb) * 1024 / max(streams, 1), 1),
+        },
+        'published': published,
+        'received': {
+            'updates': len(latencies),
+            'max_per_stream_per_s': round(max(per_stream, default=0) / args.duration, 2),
+        },
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            'p99': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        },
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(summary, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
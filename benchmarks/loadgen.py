@@ -0,0 +1,116 @@
+"""
+Minimal asyncio HTTP/1.1 load generator.
+
+Keeps one keep-alive connection per simulated client so hundreds of
+concurrent connections can be driven from a single process without any
+third-party HTTP client.
+"""
+
+import asyncio
+import itertools
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (milliseconds) for one run"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def client(host, port, paths, headers, deadline, latencies, counters):
+    """One keep-alive connection issuing requests back to back until the deadline"""
+    reader = writer = None
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+
+    while time.perf_counter() < deadline:
+        if writer is None:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                counters['errors'] += 1
+                await asyncio.sleep(0.05)
+                continue
+
+        request = f'GET {next(paths)} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n'.encode()
+        started = time.perf_counter()
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            counters['errors'] += 1
+            writer.close()
+            writer = None
+            continue
+
+        if status >= 400:
+            counters['errors'] += 1
+        else:
+            latencies.append(time.perf_counter() - started)
+
+        if not keep_alive:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run(base_url, paths, connections=100, duration=10.0, headers=None):
+    """Drive `connections` concurrent clients cycling through `paths` for `duration` seconds"""
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    latencies = []
+    counters = {'errors': 0}
+    path_cycle = itertools.cycle(paths)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        client(host, port, path_cycle, headers or {}, deadline, latencies, counters)
+        for _ in range(connections)
+    ))
+    return summarize(latencies, counters['errors'], time.perf_counter() - started)
@@ -0,0 +1,343 @@
+"""
+Mixed-workload benchmark suite driven through the real URLconf.
+
+A dedicated benchmark database is created next to the configured one (as the
+test runner does: test_<NAME>) and seeded at the chosen scale with
+`manage.py seed_platform`. Each workload is replayed with Django's test
+Client from a pool of threads, so every request passes through the full
+middleware stack, JWT authentication, the views and the serializers. The
+cache is whatever CACHES points at (Redis with REDIS_URL, locmem otherwise)
+and Celery tasks run eagerly in-process.
+
+Workloads:
+    search      event search/list/detail with mixed filters
+    flash_sale  many seekers enrolling in one hot event at once
+    auth        signup -> verify-email -> login -> me
+    login       repeated logins of existing seekers (login throughput)
+    dashboard   facilitator event lists and event details
+
+Per endpoint (URL name) the suite reports requests per second, p50/p95/p99
+latency and queries per request. Save a baseline with --output and diff a
+later run against it with --compare:
+
+    python -m benchmarks.suite --scale small --output benchmarks/baselines/main.json
+    python -m benchmarks.suite --scale small --compare benchmarks/baselines/main.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
+os.environ.setdefault('THROTTLE_ENABLED', 'False')  # every simulated client shares one IP
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import OTP, UserProfile, UserRole
+from events.models import Event
+from events_platform.celery import app as celery_app
+from events_platform.instrumentation import collect_queries
+from benchmarks.loadgen import percentile
+
+SCALES = {
+    'tiny': {'users': 220, 'events': 100, 'enrollments_per_event': 'zipf:1.0:100'},
+    'small': {'users': 2_100, 'events': 1_000, 'enrollments_per_event': 'zipf:0.8:500'},
+    'medium': {'users': 20_500, 'events': 10_000, 'enrollments_per_event': 'zipf:0.7:2000'},
+    'large': {'users': 202_000, 'events': 50_000, 'enrollments_per_event': 'uniform:10-70'},
+}
+
+LANGUAGES = ['English', 'Hindi', 'Spanish', 'Bengali', 'French', 'German', 'Portuguese', 'Japanese']
+LOCATIONS = ['Online', 'Kolkata', 'Mumbai', 'Bangalore', 'Delhi', 'London', 'New York', 'Berlin']
+TOPICS = ['Python', 'Django', 'Yoga', 'Cooking', 'Photography', 'Startups', 'Data', 'Music', 'Design', 'Writing']
+
+PASSWORD = 'BenchPass123!'
+
+
+def skewed_choice(rng, values):
+    """Pick from `values` with a long tail: the first entries dominate"""
+    return values[min(int(rng.paretovariate(1.2)) - 1, len(values) - 1)]
+
+
+def seed(scale, seed_value):
+    """Seed with seed_platform unless the database already has events; returns seeker and facilitator ids"""
+    if not Event.objects.exists():
+        call_command('seed_platform', seed=seed_value, password=PASSWORD, **scale)
+    return (
+        list(UserProfile.objects.filter(role=UserRole.SEEKER).values_list('user_id', flat=True)),
+        list(UserProfile.objects.filter(role=UserRole.FACILITATOR).values_list('user_id', flat=True)),
+    )
+
+
+# Workloads
+
+def bearer(user_id):
+    token = RefreshToken()
+    token['user_id'] = user_id
+    return {'HTTP_AUTHORIZATION': f'Bearer {token.access_token}'}
+
+
+class Context:
+    """Shared state for the workloads of one run"""
+
+    def __init__(self, seekers, facilitators):
+        self.seekers = seekers
+        self.facilitators = facilitators
+        self.event_ids = list(Event.objects.filter(starts_at__gt=timezone.now()).values_list('id', flat=True))
+        self.tokens = {}
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def auth(self, user_id):
+        if user_id not in self.tokens:
+            self.tokens[user_id] = bearer(user_id)
+        return self.tokens[user_id]
+
+    def next_id(self):
+        with self.lock:
+            return next(self.counter)
+
+
+def search_workload(ctx, rng):
+    headers = ctx.auth(rng.choice(ctx.seekers))
+    queries = [
+        {'language': skewed_choice(rng, LANGUAGES)},
+        {'location': skewed_choice(rng, LOCATIONS)},
+        {'q': rng.choice(TOPICS)},
+        {'language': skewed_choice(rng, LANGUAGES), 'location': skewed_choice(rng, LOCATIONS)},
+        {'starts_before': (timezone.now() + timedelta(days=30)).isoformat(), 'page': 2},
+    ]
+    yield 'GET', '/api/events/search/', rng.choice(queries), headers
+    yield 'GET', '/api/events/', {'language': skewed_choice(rng, LANGUAGES)}, headers
+    yield 'GET', f'/api/events/{rng.choice(ctx.event_ids)}/', None, headers
+
+
+def flash_sale_workload(ctx, rng):
+    headers = ctx.auth(rng.choice(ctx.seekers))
+    yield 'GET', f'/api/events/{ctx.hot_event_id}/', None, headers
+    yield 'POST', '/api/seeker/enroll', {'event_id': ctx.hot_event_id}, headers
+
+
+def auth_workload(ctx, rng):
+    email = f'signup{ctx.next_id()}-{os.getpid()}@bench.example.com'
+    yield 'POST', '/auth/signup', {'email': email, 'password': PASSWORD, 'role': UserRole.SEEKER}, {}
+    otp = OTP.objects.filter(email=email).values_list('otp_code', flat=True).first()
+    yield 'POST', '/auth/verify-email', {'email': email, 'otp': otp}, {}
+    response = yield 'POST', '/auth/login', {'email': email, 'password': PASSWORD}, {}
+    access = response.json().get('access') if response.status_code == 200 else ''
+    yield 'GET', '/auth/me', None, {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+
+def login_workload(ctx, rng):
+    email = ctx.seeker_emails[rng.choice(ctx.seekers)]
+    yield 'POST', '/auth/login', {'email': email, 'password': PASSWORD}, {}
+
+
+def dashboard_workload(ctx, rng):
+    headers = ctx.auth(rng.choice(ctx.facilitators))
+    yield 'GET', '/api/facilitator/events', None, headers
+    yield 'GET', f'/api/events/{rng.choice(ctx.event_ids)}/', None, headers
+
+
+def prepare_flash_sale(ctx, iterations):
+    """A fresh event with fewer seats than enroll attempts"""
+    starts_at = timezone.now() + timedelta(days=7)
+    ctx.hot_event_id = Event.objects.create(
+        title='Flash sale', description='Benchmark flash sale', language='English', location='Online',
+        starts_at=starts_at, ends_at=starts_at + timedelta(hours=2),
+        capacity=max(1, iterations // 2), created_by_id=ctx.facilitators[0],
+    ).pk
+
+
+def prepare_login(ctx, iterations):
+    ctx.seeker_emails = dict(User.objects.filter(pk__in=ctx.seekers).values_list('pk', 'email'))
+
+
+WORKLOADS = {
+    'search': (search_workload, None),
+    'flash_sale': (flash_sale_workload, prepare_flash_sale),
+    'auth': (auth_workload, None),
+    'login': (login_workload, prepare_login),
+    'dashboard': (dashboard_workload, None),
+}
+
+
+# Runner
+
+def run_steps(client, steps, samples):
+    response = None
+    while True:
+        try:
+            method, path, data, headers = steps.send(response)
+        except StopIteration:
+            return
+        started = time.perf_counter()
+        with collect_queries() as queries:
+            if method == 'GET':
+                response = client.get(path, data, secure=True, **headers)
+            else:
+                response = client.post(path, data, content_type='application/json', secure=True, **headers)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(response, 'resolver_match', None)
+        endpoint = f'{method} {match.view_name if match else path}'
+        samples[endpoint].append((elapsed, queries.count, response.status_code >= 500))
+
+
+def run_workload(ctx, workload, iterations, concurrency, seed_value):
+    samples = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed_value + index)
+        client = Client()
+        local = defaultdict(list)
+        try:
+            for _ in range(index, iterations, concurrency):
+                run_steps(client, workload(ctx, rng), local)
+        finally:
+            connections.close_all()
+        with lock:
+            for endpoint, values in local.items():
+                samples[endpoint].extend(values)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _, _ in samples)
+    query_counts = [count for _, count, _ in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(error for _, _, error in samples),
+        'rps': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries_mean': round(sum(query_counts) / len(query_counts), 2),
+        'queries_max': max(query_counts),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Print per-endpoint deltas against a baseline and return the regressions:
+    p95 slower by more than `threshold`, or at least one more query per request.
+    """
+    regressions = []
+    for workload, current in results['workloads'].items():
+        previous = baseline.get('workloads', {}).get(workload)
+        if not previous:
+            continue
+        for endpoint, now in current['endpoints'].items():
+            before = previous['endpoints'].get(endpoint)
+            if not before:
+                continue
+            p95_delta = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+            rps_delta = (now['rps'] - before['rps']) / before['rps'] if before['rps'] else 0.0
+            queries_delta = now['queries_mean'] - before['queries_mean']
+            flag = ''
+            if p95_delta > threshold or queries_delta >= 1:
+                flag = '  REGRESSION'
+                regressions.append(f'{workload}/{endpoint}')
+            print(f'{workload:<11} {endpoint:<36} p95 {p95_delta:+.1%}  rps {rps_delta:+.1%}  '
+                  f'queries {queries_delta:+.2f}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--iterations', type=int, default=300, help='workload iterations (virtual user sessions)')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured iterations per workload')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keepdb', action='store_true', help='keep the seeded benchmark database between runs')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON to diff against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown flagged as a regression')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    logging.getLogger('django.request').setLevel(logging.ERROR)  # sold-out enrolls are expected 400s
+    celery_app.conf.task_always_eager = True
+    old_config = setup_databases(verbosity=1, interactive=False, keepdb=args.keepdb)
+    try:
+        seekers, facilitators = seed(SCALES[args.scale], args.seed)
+        ctx = Context(seekers, facilitators)
+
+        results = {
+            'meta': {
+                'commit': git_commit(),
+                'scale': args.scale,
+                'iterations': args.iterations,
+                'concurrency': args.concurrency,
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'timestamp': timezone.now().isoformat(),
+            },
+            'workloads': {},
+        }
+        for name in args.workloads:
+            workload, prepare = WORKLOADS[name]
+            if prepare:
+                prepare(ctx, args.warmup + args.iterations)
+            run_workload(ctx, workload, args.warmup, args.concurrency, args.seed)
+            samples, elapsed = run_workload(ctx, workload, args.iterations, args.concurrency, args.seed)
+            endpoints = {endpoint: summarize(values, elapsed) for endpoint, values in sorted(samples.items())}
+            results['workloads'][name] = {'elapsed_s': round(elapsed, 3), 'endpoints': endpoints}
+
+            for endpoint, summary in endpoints.items():
+                print(f"{name:<11} {endpoint:<36} rps={summary['rps']:<8} p50={summary['p50_ms']}ms "
+                      f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms "
+                      f"queries={summary['queries_mean']} errors={summary['errors']}")
+    finally:
+        if not args.keepdb:
+            teardown_databases(old_config, verbosity=1)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
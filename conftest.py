@@ -0,0 +1,59 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from events_platform import query_budgets, throttling
+from events_platform.celery import app as celery_app
+from events_platform.instrumentation import collect_queries
+
+QUERY_BUDGET_SIZES = (1, 50)
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    Check a URL name against its declared query budget.
+
+    `scenario(n)` builds data for `n` results (e.g. n events on the page)
+    and returns a callable that performs the request. Only that request is
+    counted, with empty caches (the cold path). The query count must be
+    identical for every size and must not exceed the budget.
+    """
+    from django.core.cache import cache
+    from events_platform import tiered
+
+    budgets = query_budgets.get_budgets()
+
+    def check(url_name, scenario):
+        assert url_name in budgets, f'No query budget declared for "{url_name}"'
+        counts = {}
+        for n in QUERY_BUDGET_SIZES:
+            make_request = scenario(n)
+            cache.clear()
+            tiered.clear_local()
+            with collect_queries(record=True) as queries:
+                response = make_request()
+            assert response.status_code < 400, f'{url_name} returned {response.status_code}: {response.content[:200]}'
+            assert response.resolver_match.view_name == url_name
+            counts[n] = queries.count
+            statements = '\n'.join(sql for sql, _ in queries.statements)
+            assert queries.count <= budgets[url_name], (
+                f'{url_name} ran {queries.count} queries for n={n}, budget {budgets[url_name]}:\n{statements}'
+            )
+        assert len(set(counts.values())) == 1, f'{url_name} query count grows with n: {counts}'
+        return counts
+
+    return check
+
+
+@pytest.fixture(autouse=True, scope='session')
+def eager_celery():
+    """Run tasks queued with .delay() inline, as part of the request"""
+    celery_app.conf.task_always_eager = True
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    """Start every test with full token buckets"""
+    throttling.reset()
@@ -0,0 +1,18 @@
+"""
+Admin configuration for core app.
+"""
+
+from django.contrib import admin
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'query_count', 'user')
+    list_filter = ('view_name', 'method', 'created_at')
+    search_fields = ('path', 'view_name', 'user__email')
+    readonly_fields = [field.name for field in RequestProfile._meta.fields]
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
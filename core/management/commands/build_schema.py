@@ -0,0 +1,34 @@
+"""
+Write the OpenAPI schema files served by core.schema.CachedSchemaView.
+
+    python manage.py build_schema
+
+Run once per deploy (the Dockerfile does it at build time) so no web process
+ever has to generate the schema.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.schema import CachedSchemaView, generate_schema, render_schema, schema_path
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema files (YAML and JSON) into OPENAPI_SCHEMA_DIR'
+
+    def handle(self, *args, **options):
+        view = CachedSchemaView()
+        request = Request(APIRequestFactory().get('/api/schema/'))
+        started = time.perf_counter()
+        schema = generate_schema(view, request, version=None)
+        self.stdout.write(f'Generated schema in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        for renderer_class in view.renderer_classes[::2]:  # one YAML and one JSON renderer
+            renderer = renderer_class()
+            content = render_schema(view, request, renderer, schema)
+            path = schema_path(renderer.format)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({len(content)} bytes)'))
@@ -0,0 +1,123 @@
+"""
+Measure process startup per role (web, worker, beat).
+
+    python manage.py startup_report
+    python manage.py startup_report --roles worker --repeat 5 --top 15
+    python manage.py startup_report --json
+
+Each role boots in a fresh interpreter with APP_ROLE set, the way its process
+does: web loads the ASGI application and the URLconf, worker imports the
+Celery app and its task modules, beat also loads the database scheduler. The
+report gives wall time (median of --repeat runs, interpreter start included),
+peak RSS and loaded module count, then one more run under `python -X importtime`
+broken down by top-level package and by slowest module.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+ROLES = ('web', 'worker', 'beat')
+
+BOOT = {
+    'web': (
+        'import events_platform.asgi\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+    'worker': (
+        'from events_platform.celery import app\n'
+        'app.loader.import_default_modules()\n'
+    ),
+    'beat': (
+        'from events_platform.celery import app\n'
+        'app.loader.import_default_modules()\n'
+        'import django_celery_beat.schedulers\n'
+    ),
+}
+
+REPORT = (
+    'import json, resource, sys\n'
+    'print(json.dumps({"rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "modules": len(sys.modules)}))\n'
+)
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `python -X importtime` output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure(role, repeat, top):
+    env = {**os.environ, 'APP_ROLE': role}
+    command = [sys.executable, '-c', BOOT[role] + REPORT]
+
+    wall = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+        wall.append(time.perf_counter() - started)
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+
+    traced = subprocess.run(
+        [sys.executable, '-X', 'importtime', *command[1:]], env=env, capture_output=True, text=True, check=True,
+    )
+    imports = parse_importtime(traced.stderr)
+    packages = defaultdict(int)
+    for name, self_us, _ in imports:
+        packages[name.partition('.')[0]] += self_us
+    slowest = sorted(imports, key=lambda item: item[2], reverse=True)[:top]
+
+    return {
+        'role': role,
+        'wall_ms': round(statistics.median(wall) * 1000, 1),
+        'rss_mb': round(stats['rss_kb'] / 1024, 1),
+        'modules': stats['modules'],
+        'import_ms': round(sum(packages.values()) / 1000, 1),
+        'packages': {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        'slowest_imports': {name: round(cumulative_us / 1000, 1) for name, _, cumulative_us in slowest},
+    }
+
+
+class Command(BaseCommand):
+    help = 'Report startup time, RSS and import-time hot spots for the web, worker and beat roles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roles', nargs='+', choices=ROLES, default=list(ROLES))
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per role (median is reported)')
+        parser.add_argument('--top', type=int, default=10, help='Packages and modules listed per role')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        reports = [measure(role, options['repeat'], options['top']) for role in options['roles']]
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+
+        self.stdout.write(f'{"role":<8}{"wall ms":>10}{"import ms":>11}{"rss MB":>9}{"modules":>9}')
+        for report in reports:
+            self.stdout.write(
+                f'{report["role"]:<8}{report["wall_ms"]:>10}{report["import_ms"]:>11}'
+                f'{report["rss_mb"]:>9}{report["modules"]:>9}'
+            )
+        for report in reports:
+            self.stdout.write(f'\n{report["role"]}: import time by package (self, ms)')
+            for name, ms in report['packages'].items():
+                self.stdout.write(f'  {ms:>8}  {name}')
+            self.stdout.write(f'{report["role"]}: slowest imports (cumulative, ms)')
+            for name, ms in report['slowest_imports'].items():
+                self.stdout.write(f'  {ms:>8}  {name}')
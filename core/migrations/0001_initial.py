@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.CharField(max_length=2048)),
+                ("view_name", models.CharField(blank=True, max_length=255)),
+                ("status_code", models.PositiveSmallIntegerField()),
+                ("duration_ms", models.FloatField()),
+                ("query_count", models.PositiveIntegerField()),
+                (
+                    "samples",
+                    models.PositiveIntegerField(
+                        help_text="Stack samples in the collapsed stack file"
+                    ),
+                ),
+                (
+                    "pstats_file",
+                    models.FileField(
+                        help_text="cProfile stats (pstats, snakeviz)",
+                        upload_to="profiles/",
+                    ),
+                ),
+                (
+                    "collapsed_file",
+                    models.FileField(
+                        help_text="Collapsed stacks (flamegraph.pl, speedscope)",
+                        upload_to="profiles/",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "request_profiles",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["-created_at"], name="request_pro_created_58c2f1_idx"
+                    ),
+                    models.Index(
+                        fields=["view_name"], name="request_pro_view_na_e66b46_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+"""
+Models for the core app.
+"""
+
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """A profile captured for one request by core.profiling.ProfilingMiddleware"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    view_name = models.CharField(max_length=255, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    samples = models.PositiveIntegerField(help_text="Stack samples in the collapsed stack file")
+    pstats_file = models.FileField(upload_to='profiles/', help_text="cProfile stats (pstats, snakeviz)")
+    collapsed_file = models.FileField(upload_to='profiles/', help_text="Collapsed stacks (flamegraph.pl, speedscope)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'request_profiles'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['view_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
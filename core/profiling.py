@@ -0,0 +1,159 @@
+"""
+Staff-only, on-demand request profiling.
+
+A staff user (session or JWT) sends `X-Profile: 1` or `?_profile=1`. The
+request then runs under cProfile while a sampling thread records its stack
+every PROFILING_SAMPLE_INTERVAL seconds. Both results are stored under
+MEDIA_ROOT/profiles/ and listed in the admin as RequestProfile:
+    *.prof       pstats (python -m pstats, snakeviz)
+    *.collapsed  collapsed stacks (flamegraph.pl, speedscope)
+The response carries `X-Profile-Id`. At most PROFILING_RATE_LIMIT profiles
+are captured per hour across all workers (counted in the shared cache).
+Async views run on the event loop thread, so only their sync parts are sampled.
+"""
+
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from events_platform.instrumentation import collect_queries
+from .models import RequestProfile
+
+TRUTHY = {'1', 'true', 'yes'}
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def profiling_requested(request):
+    return (
+        request.META.get('HTTP_X_PROFILE', '').lower() in TRUTHY
+        or request.GET.get('_profile', '').lower() in TRUTHY
+    )
+
+
+def staff_user(request):
+    """The staff user behind this request (session or JWT), or None"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated and authenticated[0].is_staff:
+        return authenticated[0]
+    return None
+
+
+def acquire_slot():
+    """Take one of this hour's PROFILING_RATE_LIMIT slots; False when none are left"""
+    key = f'profiling:slots:{int(time.time() // 3600)}'
+    cache.add(key, 0, timeout=3600)
+    try:
+        return cache.incr(key) <= settings.PROFILING_RATE_LIMIT
+    except ValueError:  # expired between add() and incr()
+        return False
+
+
+class ProfilingMiddleware:
+    """Profile requests from staff users that ask for it (must follow AuthenticationMiddleware)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sync_get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.sync_get_response = async_to_sync(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.profile(request)
+
+    async def __acall__(self, request):
+        if not profiling_requested(request):
+            return await self.get_response(request)
+        # Profiled requests run on a thread, where the profiler and the sampler see their sync parts
+        return await sync_to_async(self.profile)(request)
+
+    def profile(self, request):
+        get_response = self.sync_get_response
+        if not profiling_requested(request):
+            return get_response(request)
+        user = staff_user(request)
+        if user is None or not acquire_slot():
+            return get_response(request)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            with collect_queries() as queries:
+                profiler.enable()
+                try:
+                    response = get_response(request)
+                finally:
+                    profiler.disable()
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+
+        profiler.create_stats()
+        resolver_match = getattr(request, 'resolver_match', None)
+        profile = RequestProfile(
+            user=user,
+            method=request.method,
+            path=request.get_full_path()[:2048],
+            view_name=(resolver_match.view_name if resolver_match else '') or '',
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 2),
+            query_count=queries.count,
+            samples=sum(sampler.stacks.values()),
+        )
+        stem = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{threading.get_ident()}'
+        profile.pstats_file.save(f'{stem}.prof', ContentFile(marshal.dumps(profiler.stats)), save=False)
+        profile.collapsed_file.save(f'{stem}.collapsed', ContentFile(sampler.collapsed().encode()), save=False)
+        profile.save()
+
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
@@ -0,0 +1,72 @@
+"""
+OpenAPI schema served from a build-time file or a per-process cache.
+
+Generating the schema introspects every view and serializer. CachedSchemaView
+renders each variant (format, version, language) at most once per process.
+The default variants are read from OPENAPI_SCHEMA_DIR when
+`manage.py build_schema` has written them at build time. Responses carry an
+ETag, so browsers revalidating /api/docs/ get a 304.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from drf_spectacular.views import SpectacularAPIView
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+def schema_path(renderer_format):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'schema.{renderer_format}'
+
+
+def clear_schema_cache():
+    with _lock:
+        _schemas.clear()
+
+
+def generate_schema(view, request, version):
+    generator = view.generator_class(urlconf=view.urlconf, api_version=version, patterns=view.patterns)
+    return generator.get_schema(request=request, public=view.serve_public)
+
+
+def render_schema(view, request, renderer, schema):
+    return renderer.render(schema, renderer.media_type, {'request': request, 'view': view})
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """SpectacularAPIView that renders each schema variant once and answers If-None-Match"""
+
+    def _get_schema_response(self, request):
+        if not self.serve_public:  # schema depends on the user's permissions
+            return super()._get_schema_response(request)
+
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        renderer = request.accepted_renderer
+        language = translation.get_language() if request.GET.get('lang') else None
+        default_variant = version is None and language is None
+        key = (renderer.media_type, version, language)
+
+        with _lock:
+            if key not in _schemas:
+                path = schema_path(renderer.format)
+                if default_variant and not settings.DEBUG and path.exists():
+                    content = path.read_bytes()
+                else:
+                    content = render_schema(self, request, renderer, generate_schema(self, request, version))
+                _schemas[key] = (content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+            content, etag = _schemas[key]
+
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=f'{renderer.media_type}; charset=utf-8')
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, version)}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -0,0 +1,156 @@
+"""
+Tests for core app.
+"""
+
+import pstats
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.models import RequestProfile
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.MIDDLEWARE = [*settings.MIDDLEWARE, 'core.profiling.ProfilingMiddleware']
+    settings.MEDIA_ROOT = tmp_path
+    settings.PROFILING_RATE_LIMIT = 2
+    settings.PROFILING_SAMPLE_INTERVAL = 0.001
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def jwt_client(is_staff):
+    user = User.objects.create_user(
+        username='profiler@example.com', email='profiler@example.com',
+        password='SecurePass123!', is_staff=is_staff,
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    def test_staff_request_is_profiled(self, profiling):
+        """Test that a staff user's flagged request stores pstats and collapsed stacks"""
+        client = jwt_client(is_staff=True)
+
+        response = client.get('/api/events/?_profile=1')
+
+        assert response.status_code == 200
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        assert profile.view_name == 'event-list'
+        assert profile.path == '/api/events/?_profile=1'
+        assert profile.query_count >= 1
+        assert profile.pstats_file.name.startswith('profiles/')
+        stats = pstats.Stats(profile.pstats_file.path)
+        assert stats.total_calls > 0
+        for line in open(profile.collapsed_file.path).read().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert ';' in stack and int(count) > 0
+
+    def test_non_staff_request_is_not_profiled(self, profiling):
+        """Test that the flag is ignored for regular users"""
+        client = jwt_client(is_staff=False)
+
+        response = client.get('/api/events/', HTTP_X_PROFILE='1')
+
+        assert 'X-Profile-Id' not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_rate_limit(self, profiling):
+        """Test that at most PROFILING_RATE_LIMIT profiles are captured per hour"""
+        client = jwt_client(is_staff=True)
+
+        responses = [client.get('/api/health/', HTTP_X_PROFILE='1') for _ in range(3)]
+
+        assert ['X-Profile-Id' in response for response in responses] == [True, True, False]
+        assert RequestProfile.objects.count() == 2
+
+
+@pytest.fixture
+def schema_cache(settings, tmp_path, monkeypatch):
+    """Empty per-process schema cache; counts schema generations"""
+    from drf_spectacular.generators import SchemaGenerator
+    from core.schema import clear_schema_cache
+
+    settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+    generations = []
+    get_schema = SchemaGenerator.get_schema
+
+    def counting_get_schema(self, *args, **kwargs):
+        generations.append(1)
+        return get_schema(self, *args, **kwargs)
+
+    monkeypatch.setattr(SchemaGenerator, 'get_schema', counting_get_schema)
+    clear_schema_cache()
+    yield generations
+    clear_schema_cache()
+
+
+@pytest.mark.django_db
+class TestCachedSchema:
+    def test_schema_generated_once_with_etag(self, schema_cache):
+        """Test that repeat hits reuse the rendered schema and revalidate with ETag"""
+        client = APIClient()
+
+        first = client.get('/api/schema/')
+        second = client.get('/api/schema/')
+        revalidated = client.get('/api/schema/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert b'openapi' in first.content
+        assert revalidated.status_code == 304
+        assert len(schema_cache) == 1
+
+    def test_formats_are_cached_separately(self, schema_cache):
+        """Test that YAML and JSON variants get their own content and ETag"""
+        client = APIClient()
+
+        yaml_response = client.get('/api/schema/')
+        json_response = client.get('/api/schema/?format=json')
+
+        assert json_response['Content-Type'].startswith('application/vnd.oai.openapi+json')
+        assert json_response.json()['openapi']
+        assert yaml_response['ETag'] != json_response['ETag']
+
+    def test_build_schema_files_are_served(self, schema_cache, settings):
+        """Test that a build-time schema file is served without generating"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command('build_schema', stdout=StringIO())
+        assert len(schema_cache) == 1
+        settings.DEBUG = False
+
+        response = APIClient().get('/api/schema/?format=json')
+
+        assert response.status_code == 200
+        assert response.json()['info']['title'] == 'Events Platform API'
+        assert len(schema_cache) == 1
+
+
+class TestStartupReport:
+    def test_worker_role_skips_web_only_packages(self):
+        """Test that a worker boots without the admin, DRF or API docs"""
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            'startup_report', '--roles', 'web', 'worker', '--repeat', '1', '--top', '100', '--json', stdout=out,
+        )
+        web, worker = json.loads(out.getvalue())
+
+        assert worker['role'] == 'worker'
+        assert worker['modules'] < web['modules']
+        assert worker['wall_ms'] > 0 and worker['rss_mb'] > 0
+        assert {'rest_framework', 'drf_spectacular'} <= set(web['packages'])
+        assert not {'rest_framework', 'drf_spectacular', 'corsheaders'} & set(worker['packages'])
+        assert 'django.contrib.admin' not in worker['slowest_imports']
@@ -3,7 +3,7 @@ Admin configuration for events app.
 """
 
 from django.contrib import admin
-from .models import Event, Enrollment
+from .models import Event, EventSeries, Enrollment
 
 
 @admin.register(Event)
@@ -15,6 +15,14 @@ class EventAdmin(admin.ModelAdmin):
     date_hierarchy = 'starts_at'
 
 
+@admin.register(EventSeries)
+class EventSeriesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'rrule', 'starts_at', 'until', 'capacity', 'created_by', 'created_at')
+    list_filter = ('language', 'location', 'created_at')
+    search_fields = ('title', 'description', 'location', 'created_by__email')
+    readonly_fields = ('until', 'created_at', 'updated_at')
+
+
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('seeker', 'event', 'status', 'created_at')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+
+    def ready(self):
+        from . import autocomplete  # noqa: F401 (connects the index's signal handlers)
+        from . import detail  # noqa: F401 (expires cached event details on save and delete)
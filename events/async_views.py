@@ -0,0 +1,266 @@
+"""
+Async read-only views for the events app.
+
+These mirror the sync DRF endpoints (search, event list/detail and seeker
+enrollments), series occurrences included, but use Django's async ORM. Served by uvicorn workers, every
+middleware runs natively async too, so a request waiting on a slow query
+only parks a coroutine: the query itself holds a thread of the async ORM,
+but the worker keeps serving other requests meanwhile. Keep new middleware
+async-capable (events_platform.tests.test_asgi_middleware_stays_async),
+or Django runs the whole chain, and these views, on a thread again.
+DRF itself is sync-only, so authentication, permissions and pagination are
+reproduced here on top of the existing JWT settings and permission classes.
+"""
+
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from accounts.permissions import IsSeekerUser
+from . import detail
+from .facets import cached_facets, count_facets, parse_facets
+from .filters import filter_events, ordering
+from .models import Event, Enrollment, EnrollmentStatus
+from .serializers import EventSerializer, EventListSerializer, EnrollmentSerializer
+from .series import EventsWithOccurrences, expand_occurrences, expansion_window
+
+jwt_authentication = JWTAuthentication()
+
+
+def error_response(detail, code, status):
+    """Error payload in the same shape as accounts.utils.custom_exception_handler"""
+    response = JsonResponse({'detail': detail, 'code': code}, status=status)
+    if status == 401:
+        response['WWW-Authenticate'] = jwt_authentication.authenticate_header(None)
+    return response
+
+
+async def authenticate(request):
+    """
+    Resolve the JWT user (with profile) in a single async query.
+    Returns None when no credentials were sent; raises InvalidToken on a bad token.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+
+    raw_token = jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    # Signature and expiry checks are pure CPU work
+    validated_token = jwt_authentication.get_validated_token(raw_token)
+    try:
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+
+    user = await User.objects.select_related('profile').filter(
+        **{jwt_settings.USER_ID_FIELD: user_id}
+    ).afirst()
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def async_api_view(permission_classes=(IsAuthenticated,)):
+    """Authenticate and authorize a GET-only async view like @api_view would"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return error_response(
+                    f'Method "{request.method}" not allowed.', 'method_not_allowed', 405
+                )
+
+            try:
+                request.user = await authenticate(request)
+            except InvalidToken as exc:
+                detail = exc.detail.get('detail') if isinstance(exc.detail, dict) else exc.detail
+                return error_response(str(detail), exc.default_code, 401)
+
+            if request.user is None:
+                return error_response(
+                    'Authentication credentials were not provided.', 'not_authenticated', 401
+                )
+
+            # Profile was loaded with the user, so these checks never hit the DB
+            for permission_class in permission_classes:
+                if not permission_class().has_permission(request, None):
+                    return error_response(
+                        'You do not have permission to perform this action.', 'permission_denied', 403
+                    )
+
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:  # e.g. ParseError from the search filters
+                return error_response(str(exc.detail), exc.default_code, exc.status_code)
+        return wrapped
+    return decorator
+
+
+async def paginate(request, listing, count_queryset, serializer_class, **extra):
+    """
+    Async equivalent of the default PageNumberPagination response over an
+    EventsWithOccurrences listing, plus any `extra` keys
+    """
+    page_size = api_settings.PAGE_SIZE
+    count = await count_queryset.acount() + len(listing.occurrences)
+    num_pages = max(1, math.ceil(count / page_size))
+
+    page_number = request.GET.get('page') or 1
+    if page_number == 'last':
+        page_number = num_pages
+    try:
+        page_number = int(page_number)
+    except (TypeError, ValueError):
+        page_number = 0
+    if page_number < 1 or page_number > num_pages:
+        return error_response('Invalid page.', 'not_found', 404)
+
+    offset = (page_number - 1) * page_size
+    if listing.occurrences:
+        # Finding where the page starts among the occurrences takes a few COUNTs
+        page = await sync_to_async(listing.__getitem__)(slice(offset, offset + page_size))
+    else:
+        page = [obj async for obj in listing.queryset[offset:offset + page_size].aiterator()]
+
+    url = request.build_absolute_uri()
+    next_link = None
+    if page_number < num_pages:
+        next_link = replace_query_param(url, 'page', page_number + 1)
+    previous_link = None
+    if page_number == 2:
+        previous_link = remove_query_param(url, 'page')
+    elif page_number > 2:
+        previous_link = replace_query_param(url, 'page', page_number - 1)
+
+    return JsonResponse({
+        'count': count,
+        'next': next_link,
+        'previous': previous_link,
+        'results': serializer_class(page, many=True).data,
+        **extra,
+    })
+
+
+@async_api_view()
+async def search_events(request):
+    """
+    Async search events with filters
+    GET /api/async/events/search/?location=&language=&starts_after=&starts_before=&q=&lat=&lng=&radius_km=
+        &facets=language,location,date
+    """
+    facet_names = parse_facets(request.GET)
+    queryset = filter_events(Event.objects.all(), request.GET)
+    queryset = queryset.filter(starts_at__gte=timezone.now())
+    occurrences = await sync_to_async(expand_occurrences)(
+        request.GET, *expansion_window(request.GET, timezone.now())
+    )
+
+    extra = {}
+    if facet_names:
+        # Same cache entries as the sync search; the grouped query runs on a raw cursor
+        extra['facets'] = await sync_to_async(cached_facets)(
+            request.GET, facet_names, lambda: count_facets(queryset, facet_names, occurrences)
+        )
+
+    return await paginate(
+        request,
+        EventsWithOccurrences(
+            queryset.with_enrollment_stats().order_by(*ordering(request.GET)), occurrences, ordering(request.GET)
+        ),
+        queryset,
+        EventListSerializer,
+        **extra,
+    )
+
+
+@async_api_view()
+async def event_list(request):
+    """
+    Async event listing
+    GET /api/async/events/
+    """
+    queryset = filter_events(Event.objects.all(), request.GET)
+    occurrences = await sync_to_async(expand_occurrences)(
+        request.GET, *expansion_window(request.GET, timezone.now())
+    )
+
+    return await paginate(
+        request,
+        EventsWithOccurrences(
+            queryset.with_enrollment_stats().order_by(*ordering(request.GET)), occurrences, ordering(request.GET)
+        ),
+        queryset,
+        EventListSerializer,
+    )
+
+
+@async_api_view()
+async def event_detail(request, pk):
+    """
+    Async event details
+    GET /api/async/events/{id}/
+    """
+    def build():
+        return EventSerializer(Event.objects.with_enrollment_stats().get(pk=pk)).data
+
+    try:
+        data = await sync_to_async(detail.cached)(pk, build)
+    except Event.DoesNotExist:
+        return error_response('Not found.', 'not_found', 404)
+    return JsonResponse(data)
+
+
+@async_api_view(permission_classes=(IsAuthenticated, IsSeekerUser))
+async def my_enrollments(request):
+    """
+    Async list of seeker's enrollments, or the waitlists they are on
+    GET /api/async/seeker/enrollments?type=upcoming|past|waitlisted
+    """
+    enrollment_type = request.GET.get('type', 'all')
+
+    enrollments = Enrollment.objects.filter(
+        seeker=request.user,
+        status=EnrollmentStatus.WAITLISTED if enrollment_type == 'waitlisted' else EnrollmentStatus.ENROLLED
+    )
+
+    if enrollment_type == 'upcoming':
+        enrollments = enrollments.filter(event__starts_at__gt=timezone.now())
+    elif enrollment_type == 'past':
+        enrollments = enrollments.filter(event__ends_at__lt=timezone.now())
+
+    results = [
+        enrollment async for enrollment in enrollments.select_related(
+            'seeker', 'event', 'event__created_by'
+        ).order_by('-created_at').aiterator()
+    ]
+
+    # One grouped COUNT for every listed event instead of one per serialized row
+    event_ids = {enrollment.event_id for enrollment in results}
+    counts = {
+        row['event_id']: row['total']
+        async for row in Enrollment.objects.filter(
+            event_id__in=event_ids,
+            status=EnrollmentStatus.ENROLLED
+        ).order_by().values('event_id').annotate(total=Count('id'))
+    }
+    for enrollment in results:
+        enrollment.event.enrolled_count = counts.get(enrollment.event_id, 0)
+
+    return JsonResponse({
+        'count': len(results),
+        'results': EnrollmentSerializer(results, many=True).data,
+    })
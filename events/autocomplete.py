@@ -0,0 +1,373 @@
+"""
+Typeahead suggestions from an in-process prefix index.
+
+GET /api/events/autocomplete?prefix= is answered from memory. Every web
+worker keeps the titles, locations and languages of upcoming events (and of
+series that still recur) as sorted arrays of keys, one array per kind. A
+value gets one key per word start: "python workshop" and "workshop" for
+"Python Workshop". A lookup is then a binary search plus a short scan.
+Keys are case- and accent-insensitive, cut to KEY_LENGTH bytes and packed
+into one bytes object per array; longer prefixes are checked against the
+word starts of the whole value.
+
+The index is built from the database when a web worker starts (or on first
+use) and then kept current without queries:
+    - Event/EventSeries saves and deletes update it once the transaction
+      commits, and publish the change on the 'autocomplete' channel
+      (events_platform.pubsub),
+    - every other worker applies the changes it receives there, and
+      reloads its index if the channel was disconnected,
+    - events drop out once they start (checked at most once a second).
+
+Writes go to a small sorted delta and a set of removed keys. Those are
+merged into the main arrays once they grow past a fraction of them, so a
+write does not shift a million-entry list. Rows written without signals
+(bulk_create, COPY, queryset.update) reach the index when it is next built.
+"""
+
+import bisect
+import heapq
+import re
+import sys
+import threading
+import time
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from events_platform import pubsub
+from .models import Event, EventSeries
+
+CHANNEL = 'autocomplete'
+KINDS = ('title', 'location', 'language')
+KEY_LENGTH = 16  # bytes
+MAX_WORDS = 8  # word starts indexed per value
+SCAN_LIMIT = 200  # keys read per kind and lookup; suggestions are ranked among these
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+COMPACT_MIN = 1024
+WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Case- and accent-folded text with runs of whitespace collapsed"""
+    if text.isascii():
+        return ' '.join(text.lower().split())
+    folded = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in folded if not unicodedata.combining(char)).split())
+
+
+def key(text):
+    """Fixed-width key: the first KEY_LENGTH bytes of the UTF-8 text, NUL-padded (sorts like the text)"""
+    return text.encode()[:KEY_LENGTH].ljust(KEY_LENGTH, b'\0')
+
+
+def word_starts(normalized):
+    """Offsets of the indexed word starts of a normalized value"""
+    return [match.start() for match in WORD.finditer(normalized)][:MAX_WORDS]
+
+
+def index_keys(text):
+    """Keys of a value: its normalized form from each word start"""
+    normalized = normalize(text)
+    return {key(normalized[start:]) for start in word_starts(normalized)}
+
+
+def starts_word_with(text, query):
+    """Whether a word of the value (one that is indexed) starts with the normalized query"""
+    normalized = normalize(text)
+    return any(normalized.startswith(query, start) for start in word_starts(normalized))
+
+
+class KeyBlock:
+    """Read-only sequence view of fixed-width keys packed into one bytes object, for bisect"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, position):
+        return self.data[position * KEY_LENGTH:(position + 1) * KEY_LENGTH]
+
+    def __len__(self):
+        return len(self.data) // KEY_LENGTH
+
+
+class SortedKeys:
+    """(key, value) pairs in a sorted array, plus a sorted delta of additions and a set of removals"""
+
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs)
+        # One bytes object instead of a str per key: KEY_LENGTH bytes plus a value pointer per key
+        self.keys = KeyBlock(b''.join(key for key, _ in pairs))
+        self.values = [value for _, value in pairs]
+        self.added = []
+        self.removed = set()
+
+    def add(self, pair):
+        if pair in self.removed:
+            self.removed.discard(pair)
+        else:
+            bisect.insort(self.added, pair)
+
+    def remove(self, pair):
+        position = bisect.bisect_left(self.added, pair)
+        if position < len(self.added) and self.added[position] == pair:
+            del self.added[position]
+        else:
+            self.removed.add(pair)
+        if len(self.added) + len(self.removed) > max(COMPACT_MIN, len(self.keys) // 16):
+            self.compact()
+
+    def compact(self):
+        """Merge the delta into the main arrays"""
+        removed = self.removed
+        keys = (self.keys[position] for position in range(len(self.keys)))
+        pairs = heapq.merge(
+            (pair for pair in zip(keys, self.values) if pair not in removed),
+            self.added,
+        )
+        self.__init__(pairs)
+
+    def scan(self, prefix, limit):
+        """Up to `limit` values with a key starting with `prefix` (bytes)"""
+        found = []
+        position = bisect.bisect_left(self.keys, prefix)
+        end = min(len(self.keys), position + limit)
+        while position < end and self.keys[position].startswith(prefix):
+            pair = (self.keys[position], self.values[position])
+            if pair not in self.removed:
+                found.append(pair[1])
+            position += 1
+        position = bisect.bisect_left(self.added, (prefix,))
+        for key, value in self.added[position:position + limit]:
+            if not key.startswith(prefix):
+                break
+            found.append(value)
+        return found
+
+    def __len__(self):
+        return len(self.keys) - len(self.removed) + len(self.added)
+
+
+class PrefixIndex:
+    """Titles, locations and languages of upcoming events, counted and searchable by prefix"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._sorted = {kind: SortedKeys() for kind in KINDS}
+        self._counts = {kind: {} for kind in KINDS}  # value -> records with that value
+        self._records = {}  # record id -> (expires_at, title, location, language)
+        self._expiring = {}  # hour -> record ids that expire in it
+        self._swept_hour = int(time.time() // 3600)
+        self._swept_at = 0.0
+
+    def load(self, records):
+        """Replace the contents with (record_id, expires_at, title, location, language) rows"""
+        with self._lock:
+            self._clear()
+            pairs = {kind: [] for kind in KINDS}
+            now = time.time()
+            for record_id, expires_at, title, location, language in records:
+                if expires_at is not None and expires_at <= now:
+                    continue
+                values = [title, sys.intern(location), sys.intern(language)]
+                for kind, value in zip(KINDS, values):
+                    count = self._counts[kind].get(value, 0)
+                    self._counts[kind][value] = count + 1
+                    if not count:
+                        pairs[kind].extend((key, value) for key in index_keys(value))
+                self._track(record_id, expires_at, values)
+            self._sorted = {kind: SortedKeys(pairs[kind]) for kind in KINDS}
+
+    def put(self, record_id, expires_at, title, location, language):
+        with self._lock:
+            self._discard(record_id)
+            if expires_at is not None and expires_at <= time.time():
+                return
+            values = [title, sys.intern(location), sys.intern(language)]
+            for kind, value in zip(KINDS, values):
+                count = self._counts[kind].get(value, 0)
+                self._counts[kind][value] = count + 1
+                if not count:
+                    for key in index_keys(value):
+                        self._sorted[kind].add((key, value))
+            self._track(record_id, expires_at, values)
+
+    def discard(self, record_id):
+        with self._lock:
+            self._discard(record_id)
+
+    def _track(self, record_id, expires_at, values):
+        self._records[record_id] = (expires_at, *values)
+        if expires_at is not None:
+            self._expiring.setdefault(int(expires_at // 3600), []).append(record_id)
+
+    def _discard(self, record_id):
+        record = self._records.pop(record_id, None)
+        if record is None:
+            return
+        for kind, value in zip(KINDS, record[1:]):
+            count = self._counts[kind][value] - 1
+            if count:
+                self._counts[kind][value] = count
+                continue
+            del self._counts[kind][value]
+            for key in index_keys(value):
+                self._sorted[kind].remove((key, value))
+
+    def _sweep(self):
+        """Drop records that have expired, at most once a second"""
+        now = time.time()
+        if now - self._swept_at < 1:
+            return
+        self._swept_at = now
+        hour = int(now // 3600)
+        for bucket in range(self._swept_hour, hour + 1):
+            record_ids = self._expiring.pop(bucket, [])
+            pending = []
+            for record_id in record_ids:
+                record = self._records.get(record_id)
+                if record is None or record[0] is None or int(record[0] // 3600) != bucket:
+                    continue  # deleted, or moved to another hour
+                if record[0] <= now:
+                    self._discard(record_id)
+                else:
+                    pending.append(record_id)
+            if pending:
+                self._expiring[bucket] = pending
+        self._swept_hour = hour
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """The most common values of each kind starting a word with `prefix`, most events first"""
+        query = normalize(prefix)
+        if not query:
+            return []
+        probe = query.encode()
+        with self._lock:
+            self._sweep()
+            found = {}
+            for kind in KINDS:
+                for value in self._sorted[kind].scan(probe[:KEY_LENGTH], SCAN_LIMIT):
+                    if len(probe) <= KEY_LENGTH or starts_word_with(value, query):
+                        found[kind, value] = self._counts[kind][value]
+        ranked = sorted(found.items(), key=lambda item: (-item[1], len(item[0][1]), item[0][1]))
+        return [{'text': value, 'kind': kind, 'count': count} for (kind, value), count in ranked[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'records': len(self._records),
+                'keys': {kind: len(self._sorted[kind]) for kind in KINDS},
+                'values': {kind: len(self._counts[kind]) for kind in KINDS},
+            }
+
+
+def event_record(event):
+    return event.pk, event.starts_at.timestamp(), event.title, event.location, event.language
+
+
+def series_record(series):
+    until = series.until.timestamp() if series.until else None
+    return f'series:{series.pk}', until, series.title, series.location, series.language
+
+
+def upcoming_records():
+    """Records of the events that have not started and the series that still recur"""
+    now = timezone.now()
+    fields = ('pk', 'starts_at', 'title', 'location', 'language')
+    for pk, starts_at, *values in Event.objects.filter(starts_at__gt=now).values_list(*fields).iterator(10_000):
+        yield (pk, starts_at.timestamp(), *values)
+    series = EventSeries.objects.filter(Q(until__isnull=True) | Q(until__gt=now))
+    for pk, until, *values in series.values_list('pk', 'until', 'title', 'location', 'language').iterator(10_000):
+        yield (f'series:{pk}', until.timestamp() if until else None, *values)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """This process's index, built on first use (web workers build it at start)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                # Subscribed first: changes that arrive while loading wait on the lock, then apply
+                pubsub.subscribe(CHANNEL, apply, resync=rebuild)
+                index = PrefixIndex()
+                index.load(upcoming_records())
+                _index = index
+    return _index
+
+
+def rebuild():
+    """Reload this process's index, if it has one, after changes from other processes were lost"""
+    global _index
+    with _index_lock:
+        if _index is not None:
+            index = PrefixIndex()
+            index.load(upcoming_records())
+            _index = index
+
+
+def reset():
+    """Forget the index; the next use rebuilds it (tests)"""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def apply(change):
+    """Apply a change published by another process, if this one has an index"""
+    with _index_lock:
+        index = _index
+    if index is None:
+        return
+    if change['record'] is None:
+        index.discard(change['id'])
+    else:
+        index.put(change['id'], *change['record'])
+
+
+def publish_change(record_id, record=None):
+    """Apply a change here (if indexed) and send it to the other workers, after the current transaction commits"""
+    def send():
+        if _index is not None:
+            if record is None:
+                _index.discard(record_id)
+            else:
+                _index.put(record_id, *record)
+        pubsub.publish(CHANNEL, {'id': record_id, 'record': record})
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_id, *record = event_record(instance)
+        publish_change(record_id, record)
+
+
+@receiver(post_save, sender=EventSeries)
+def series_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_id, *record = series_record(instance)
+        publish_change(record_id, record)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    publish_change(instance.pk)
+
+
+@receiver(post_delete, sender=EventSeries)
+def series_deleted(sender, instance, **kwargs):
+    publish_change(series_record(instance)[0])
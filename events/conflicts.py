@@ -0,0 +1,50 @@
+"""
+Seeker schedule conflicts: enrolled events whose times overlap.
+
+Checking one new enrollment starts from the events overlapping its period
+(the events_period_gist index on tstzrange(starts_at, ends_at)) and keeps
+those the seeker is enrolled in, so it costs a handful of index probes
+however many enrollments the seeker has. Listing all conflicts reads the
+seeker's enrolled events that have not ended in start order and sweeps them
+once, pairing each event with the earlier ones still running when it starts.
+"""
+
+import heapq
+
+from django.utils import timezone
+from .models import Event, EnrollmentStatus
+
+FIELDS = ('id', 'title', 'location', 'starts_at', 'ends_at')
+
+
+def enrolled_events(seeker):
+    return Event.objects.filter(
+        enrollments__seeker=seeker,
+        enrollments__status=EnrollmentStatus.ENROLLED,
+    )
+
+
+def find_conflicts(seeker, event):
+    """The seeker's enrolled events overlapping `event`, as dicts of FIELDS"""
+    return list(
+        enrolled_events(seeker).overlapping(event.starts_at, event.ends_at)
+        .exclude(pk=event.pk).order_by('starts_at').values(*FIELDS)
+    )
+
+
+def sweep(events):
+    """Overlapping pairs (earlier, later) from events ordered by starts_at"""
+    running = []  # heap of (ends_at, position, event)
+    pairs = []
+    for position, event in enumerate(events):
+        while running and running[0][0] <= event['starts_at']:
+            heapq.heappop(running)
+        pairs.extend((earlier, event) for _, _, earlier in sorted(running, key=lambda item: item[1]))
+        heapq.heappush(running, (event['ends_at'], position, event))
+    return pairs
+
+
+def schedule_conflicts(seeker):
+    """Overlapping pairs among the seeker's enrolled events that have not ended"""
+    events = enrolled_events(seeker).filter(ends_at__gt=timezone.now()).order_by('starts_at', 'id').values(*FIELDS)
+    return sweep(events)
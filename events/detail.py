@@ -0,0 +1,51 @@
+"""
+Cached event detail (GET /api/events/{id}/ and its async twin).
+
+The serialized detail, enrollment count included, is cached per event for
+EVENT_DETAIL_CACHE_SECONDS in the two-tier cache (events_platform.tiered):
+each worker keeps the hot events in memory, in front of the shared cache,
+where however many requests miss an entry at once, one of them builds it
+(events_platform.singleflight). Saving the event and enrolling or canceling
+invalidate it in every worker once the transaction commits, leaving the
+shared entry stale: the next request rebuilds it, and requests arriving
+during that rebuild get the previous detail (for at most
+EVENT_DETAIL_STALE_SECONDS). Deleting the event drops it. Details are
+built from the primary, like every tiered value: a lagging replica's copy
+would otherwise be served to everyone, the clients pinned to the primary
+included. Changes made
+without signals (queryset.update, another service) show within
+EVENT_DETAIL_CACHE_SECONDS.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from events_platform.tiered import TieredCache
+from .models import Event
+
+details = TieredCache('events:detail')
+
+
+def cached(event_id, build):
+    """The event's detail, from the cache or build() (run against the primary)"""
+    return details.get(
+        str(event_id), build, settings.EVENT_DETAIL_CACHE_SECONDS, stale=settings.EVENT_DETAIL_STALE_SECONDS,
+    )
+
+
+def expire(event_id):
+    """Mark the event's cached detail stale after the current transaction commits"""
+    transaction.on_commit(lambda: details.invalidate(str(event_id), stale=True))
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        expire(instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    event_id = str(instance.pk)
+    transaction.on_commit(lambda: details.invalidate(event_id))
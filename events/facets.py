@@ -0,0 +1,127 @@
+"""
+Facet counts for event search (?facets=language,location,date).
+
+A filter sidebar needs the number of matching events per language, location
+and start month. Rather than one request or query per value, the filtered
+queryset becomes a subquery grouped once with GROUPING SETS, one set per
+requested facet (UNION ALL of the same groupings on databases without
+GROUPING SETS), so any number of facets costs a single query.
+
+Counts are cached for EVENT_FACETS_CACHE_SECONDS under a key built from the
+normalized filters: the same filters spelled differently (letter case of
+the text filters, parameter order, facet order) share an entry, and
+page/ordering do not count. Cached counts may lag new events by up to that
+long. When an entry expires, one request recounts it and the others with
+the same filters wait for its result (events_platform.singleflight).
+"""
+
+import hashlib
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import DateField, F
+from django.db.models.functions import TruncMonth
+from events_platform import singleflight
+from . import geo
+
+FACETS = {
+    'language': F('language'),
+    'location': F('location'),
+    'date': TruncMonth('starts_at', output_field=DateField()),
+}
+MAX_BUCKETS = 20
+CACHE_KEY = 'events:facets:{}'
+
+
+def parse_facets(params):
+    """Requested facet names in canonical order, or None when ?facets= is absent"""
+    from rest_framework.exceptions import ParseError
+
+    value = params.get('facets')
+    if not value:
+        return None
+    names = {name.strip().lower() for name in value.split(',') if name.strip()}
+    unknown = names - FACETS.keys()
+    if unknown:
+        raise ParseError(f'Unknown facets: {", ".join(sorted(unknown))}; choose from {", ".join(FACETS)}')
+    return [name for name in FACETS if name in names]
+
+
+def bucket(name, value):
+    """The bucket label of a value: the month of a date as YYYY-MM, otherwise the value itself"""
+    return str(value)[:7] if name == 'date' else value
+
+
+def grouped_sql(queryset, names):
+    """SQL and params counting the queryset's rows per value of each named facet"""
+    columns = [f'facet_{name}' for name in names]
+    inner = queryset.order_by().annotate(
+        **{column: FACETS[name] for column, name in zip(columns, names)}
+    ).values(*columns)
+    sql, params = inner.query.get_compiler(using=queryset.db).as_sql()
+
+    if connections[queryset.db].vendor == 'postgresql':
+        flags = ', '.join(f'GROUPING({column})' for column in columns)
+        sets = ', '.join(f'({column})' for column in columns)
+        return (
+            f'SELECT {", ".join(columns)}, {flags}, COUNT(*) FROM ({sql}) facets GROUP BY GROUPING SETS ({sets})',
+            params,
+        )
+
+    selects = []
+    for column in columns:
+        values = ', '.join(c if c == column else 'NULL' for c in columns)
+        flags = ', '.join('0' if c == column else '1' for c in columns)
+        selects.append(f'SELECT {values}, {flags}, COUNT(*) FROM ({sql}) facets GROUP BY {column}')
+    return ' UNION ALL '.join(selects), tuple(params) * len(columns)
+
+
+def count_facets(queryset, names, occurrences=()):
+    """{facet: [{'value', 'count'}]} over the queryset plus unsaved series occurrences"""
+    counts = {name: Counter() for name in names}
+    sql, params = grouped_sql(queryset, names)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            values, flags, total = row[:len(names)], row[len(names):-1], row[-1]
+            name = names[flags.index(0)]
+            counts[name][bucket(name, values[flags.index(0)])] += total
+
+    for occurrence in occurrences:
+        for name in names:
+            value = occurrence.starts_at.date() if name == 'date' else getattr(occurrence, name)
+            counts[name][bucket(name, value)] += 1
+
+    return {
+        name: [
+            {'value': value, 'count': total}
+            for value, total in (
+                sorted(counter.items())[:MAX_BUCKETS] if name == 'date'
+                else sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:MAX_BUCKETS]
+            )
+        ]
+        for name, counter in counts.items()
+    }
+
+
+def cache_key(params, names):
+    """Cache key for these facets under the normalized search filters"""
+    point = geo.parse_point(params)
+    filters = {
+        'location': params.get('location', '').lower(),
+        'language': params.get('language', '').lower(),
+        'q': params.get('q', '').lower(),
+        'starts_after': params.get('starts_after', ''),
+        'starts_before': params.get('starts_before', ''),
+        'point': list(point) if point else None,
+        'facets': names,
+    }
+    digest = hashlib.sha256(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return CACHE_KEY.format(digest)
+
+
+def cached_facets(params, names, build):
+    """Facet counts for the search filters in `params`, from the cache or `build()`"""
+    return singleflight.cached(cache_key(params, names), build, settings.EVENT_FACETS_CACHE_SECONDS)
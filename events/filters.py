@@ -0,0 +1,55 @@
+"""
+Search filters shared by the sync and async event views.
+"""
+
+from django.db.models import Q
+from . import geo
+
+
+def filter_text(queryset, params):
+    """Apply the location/radius/language/text search filters to an Event or EventSeries queryset"""
+    location = params.get('location')
+    language = params.get('language')
+    q = params.get('q')
+    point = geo.parse_point(params)
+
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    # Within radius_km of lat/lng, annotated with distance_km
+    if point:
+        queryset = geo.within(queryset, *point)
+
+    if language:
+        queryset = queryset.filter(language__icontains=language)
+
+    # Search in title and description
+    if q:
+        queryset = queryset.filter(
+            Q(title__icontains=q) | Q(description__icontains=q)
+        )
+
+    return queryset
+
+
+def filter_events(queryset, params):
+    """Apply the location/radius/language/date/text search filters to an Event queryset"""
+    starts_after = params.get('starts_after')
+    starts_before = params.get('starts_before')
+
+    queryset = filter_text(queryset, params)
+
+    if starts_after:
+        queryset = queryset.filter(starts_at__gte=starts_after)
+
+    if starts_before:
+        queryset = queryset.filter(starts_at__lte=starts_before)
+
+    return queryset
+
+
+def ordering(params):
+    """Fields events are ordered by: start time, or distance (ordering=distance) on a radius search"""
+    if params.get('ordering') == 'distance' and geo.parse_point(params):
+        return ('distance_km', 'starts_at')
+    return ('starts_at',)
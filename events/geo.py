@@ -0,0 +1,195 @@
+"""
+Event coordinates: geocoding, geohash cells and radius search.
+
+Events and series may carry latitude/longitude. When they are not given,
+the GEOCODER (any class with `geocode(location) -> (lat, lng) | None`)
+resolves them from the free-text location on save. The default gazetteer
+knows a fixed list of cities, enough for development and tests; plug a
+caching client for a real geocoding service in its place.
+
+Each located event also stores its geohash, a base32 string in which every
+character narrows the cell the point lies in, so events in one cell share
+a prefix and sit next to each other in a plain B-tree index. A radius
+search (lat, lng, radius_km):
+
+    1. takes the bounding box of the circle,
+    2. covers it with at most MAX_CELLS geohash cells and reads each cell
+       as an index range scan (geohash >= cell AND geohash < next cell),
+    3. keeps the rows inside the box, then inside the circle by haversine
+       distance, which is also what results can be ordered by.
+"""
+
+import math
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from django.utils.module_loading import import_string
+
+EARTH_RADIUS_KM = 6371.0088
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9  # ~5 m cells, finer than any radius worth searching
+MAX_CELLS = 16
+MAX_RADIUS_KM = 500
+DEFAULT_RADIUS_KM = 10
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash of a point"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell"""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** ((bits + 1) // 2)
+
+
+def next_cell(cell):
+    """The first geohash after every geohash starting with `cell`, or None"""
+    cell = cell.rstrip(BASE32[-1])
+    if not cell:
+        return None
+    return cell[:-1] + BASE32[BASE32.index(cell[-1]) + 1]
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) around a circle; longitudes may wrap past +-180"""
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angular)
+    max_lat = latitude + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90:  # circle contains a pole
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    delta_lng = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(latitude))))
+    return min_lat, max_lat, longitude - delta_lng, longitude + delta_lng
+
+
+def covering_cells(box):
+    """The fewest-and-finest geohash cells (at most MAX_CELLS) covering a bounding box"""
+    min_lat, max_lat, min_lng, max_lng = box
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor((max_lat + 90) / height) - math.floor((min_lat + 90) / height) + 1
+        columns = math.floor((max_lng + 180) / width) - math.floor((min_lng + 180) / width) + 1
+        if rows * columns <= MAX_CELLS:
+            break
+    cells = set()
+    for row in range(rows):
+        latitude = min(max_lat, min_lat + row * height)
+        for column in range(columns):
+            longitude = min(max_lng, min_lng + column * width)
+            cells.add(encode(latitude, (longitude + 180) % 360 - 180, precision))
+    return sorted(cells)
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance in km from the row's coordinates to a point, as an ORM expression"""
+    lat, lng = math.radians(latitude), math.radians(longitude)
+    a = (
+        Power(Sin((Radians(F('latitude')) - Value(lat)) / 2), 2)
+        + Value(math.cos(lat)) * Cos(Radians(F('latitude')))
+        * Power(Sin((Radians(F('longitude')) - Value(lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a), output_field=FloatField())
+
+
+def parse_point(params):
+    """(lat, lng, radius_km) from the lat/lng/radius_km parameters, or None when lat and lng are absent"""
+    from rest_framework.exceptions import ParseError  # models import this module in the worker too
+
+    if params.get('lat') in (None, '') and params.get('lng') in (None, ''):
+        return None
+    try:
+        latitude, longitude = float(params.get('lat')), float(params.get('lng'))
+        radius_km = float(params.get('radius_km') or DEFAULT_RADIUS_KM)
+    except (TypeError, ValueError):
+        raise ParseError('lat and lng must both be numbers, and radius_km a number of km')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ParseError('lat must be within -90..90 and lng within -180..180')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ParseError(f'radius_km must be greater than 0 and at most {MAX_RADIUS_KM}')
+    return latitude, longitude, radius_km
+
+
+def within(queryset, latitude, longitude, radius_km):
+    """Rows within radius_km of the point, annotated with distance_km"""
+    min_lat, max_lat, min_lng, max_lng = box = bounding_box(latitude, longitude, radius_km)
+
+    cells = Q()
+    for cell in covering_cells(box):
+        upper = next_cell(cell)
+        cells |= Q(geohash__gte=cell, geohash__lt=upper) if upper else Q(geohash__gte=cell)
+
+    if min_lng < -180:
+        longitudes = Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng)
+    elif max_lng > 180:
+        longitudes = Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360)
+    else:
+        longitudes = Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+    return (
+        queryset.filter(cells, longitudes, latitude__gte=min_lat, latitude__lte=max_lat)
+        .annotate(distance_km=distance_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+class GazetteerGeocoder:
+    """Offline geocoder for a fixed list of cities (case-insensitive exact match)"""
+
+    PLACES = {
+        'bangalore': (12.9716, 77.5946),
+        'bengaluru': (12.9716, 77.5946),
+        'berlin': (52.5200, 13.4050),
+        'chennai': (13.0827, 80.2707),
+        'delhi': (28.6139, 77.2090),
+        'hyderabad': (17.3850, 78.4867),
+        'kolkata': (22.5726, 88.3639),
+        'london': (51.5074, -0.1278),
+        'madrid': (40.4168, -3.7038),
+        'mumbai': (19.0760, 72.8777),
+        'new york': (40.7128, -74.0060),
+        'paris': (48.8566, 2.3522),
+        'pune': (18.5204, 73.8567),
+        'sao paulo': (-23.5505, -46.6333),
+        'san francisco': (37.7749, -122.4194),
+        'singapore': (1.3521, 103.8198),
+        'sydney': (-33.8688, 151.2093),
+        'tokyo': (35.6762, 139.6503),
+    }
+
+    def geocode(self, location):
+        return self.PLACES.get(location.strip().lower())
+
+
+@lru_cache(maxsize=None)
+def get_geocoder():
+    return import_string(settings.GEOCODER)()
+
+
+def locate(instance):
+    """Fill in coordinates from the location when missing, and the geohash from the coordinates"""
+    if (instance.latitude is None or instance.longitude is None) and instance.location:
+        instance.latitude, instance.longitude = get_geocoder().geocode(instance.location) or (None, None)
+    if instance.latitude is None or instance.longitude is None:
+        instance.latitude = instance.longitude = None
+        instance.geohash = ''
+    else:
+        instance.geohash = encode(instance.latitude, instance.longitude)
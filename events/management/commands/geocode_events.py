@@ -0,0 +1,34 @@
+"""
+Fill in coordinates for events and series saved without them.
+
+    python manage.py geocode_events
+
+Rows written before coordinates existed, or in bulk (seed scripts, COPY),
+skip the geocoding done on save. Each distinct location is geocoded once
+with the configured GEOCODER and written to all its rows in one UPDATE.
+"""
+
+from django.core.management.base import BaseCommand
+from events import geo
+from events.models import Event, EventSeries
+
+
+class Command(BaseCommand):
+    help = 'Geocode the locations of events and series that have no coordinates'
+
+    def handle(self, *args, **options):
+        geocoder = geo.get_geocoder()
+        for model in (EventSeries, Event):
+            pending = model.objects.filter(latitude__isnull=True).exclude(location='')
+            located = unknown = 0
+            for location in pending.values_list('location', flat=True).distinct().order_by():
+                point = geocoder.geocode(location)
+                if point is None:
+                    unknown += 1
+                    continue
+                located += pending.filter(location=location).update(
+                    latitude=point[0], longitude=point[1], geohash=geo.encode(*point),
+                )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {located} located, {unknown} unknown locations'
+            )
@@ -0,0 +1,268 @@
+"""
+Seed users, profiles, events and enrollments at realistic volumes.
+
+    python manage.py seed_platform --users 200000 --events 100000 --enrollments-per-event uniform:50-150
+
+Rows are generated in chunks and written with Postgres COPY (plain INSERTs on
+other databases). Output is deterministic for a given --seed. Seeded accounts
+share one password (--password), which is hashed once.
+
+--enrollments-per-event:
+    fixed:K          every event gets K enrollments
+    uniform:A-B      a uniformly random count between A and B
+    zipf:S:MAX       the event with popularity rank r gets MAX / r**S
+"""
+
+import io
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+from accounts.models import UserProfile, UserRole
+from events import geo
+from events.models import Enrollment, EnrollmentStatus, Event
+
+# (value, weight) - a few languages and cities dominate, with a long tail
+LANGUAGES = [
+    ('English', 40), ('Hindi', 15), ('Spanish', 12), ('Bengali', 8), ('French', 6), ('German', 5),
+    ('Portuguese', 4), ('Japanese', 3), ('Tamil', 3), ('Marathi', 2), ('Italian', 1), ('Korean', 1),
+]
+LOCATIONS = [
+    ('Online', 30), ('Kolkata', 12), ('Mumbai', 10), ('Bangalore', 10), ('Delhi', 8), ('London', 6),
+    ('New York', 5), ('Berlin', 4), ('Madrid', 3), ('Tokyo', 3), ('Chennai', 3), ('Pune', 3),
+    ('Sao Paulo', 1), ('Paris', 1),
+]
+TOPICS = [
+    'Python', 'Django', 'Yoga', 'Cooking', 'Photography', 'Startups', 'Data Science', 'Music',
+    'Design', 'Writing', 'Meditation', 'Public Speaking', 'Gardening', 'Chess', 'Machine Learning',
+]
+FORMATS = ['Meetup', 'Workshop', 'Bootcamp', 'Talk', 'Masterclass', 'Study Group', 'Hackathon']
+
+NAME_POOL_SIZE = 1000
+
+
+def parse_distribution(spec):
+    """Turn an --enrollments-per-event spec into `count(rank, rng)`"""
+    kind, _, args = spec.partition(':')
+    try:
+        if kind == 'fixed':
+            k = int(args)
+            return lambda rank, rng: k
+        if kind == 'uniform':
+            low, high = (int(value) for value in args.split('-'))
+            return lambda rank, rng: rng.randint(low, high)
+        if kind == 'zipf':
+            exponent, maximum = args.split(':')
+            exponent, maximum = float(exponent), int(maximum)
+            return lambda rank, rng: int(maximum / rank ** exponent)
+    except ValueError:
+        pass
+    raise CommandError(f'Invalid --enrollments-per-event "{spec}" (use fixed:K, uniform:A-B or zipf:S:MAX)')
+
+
+def copy_value(value):
+    """Format one value for COPY's text format"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if not isinstance(value, str):
+        return str(value)
+    if '\\' in value or '\t' in value or '\n' in value:
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return value
+
+
+def write_rows(table, columns, rows):
+    """Bulk-load `rows` (tuples in `columns` order) into `table`"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write('\t'.join(map(copy_value, row)))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(columns))
+            cursor.executemany(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', rows)
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Seed users, profiles, events and enrollments at benchmark scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--events', type=int, default=1_000)
+        parser.add_argument('--enrollments-per-event', default='zipf:1.0:1000')
+        parser.add_argument('--facilitator-ratio', type=float, default=0.02)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='SeedPass123!')
+        parser.add_argument('--chunk-size', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.rng = random.Random(options['seed'])
+        self.faker = Faker()
+        self.faker.seed_instance(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        self.domain = f"seed{options['seed']}.example.org"
+        self.password_hash = make_password(options['password'])
+        distribution = parse_distribution(options['enrollments_per_event'])
+
+        if User.objects.filter(email__endswith=f'@{self.domain}').exists():
+            raise CommandError(f'Seed {options["seed"]} has already been loaded; pass a different --seed')
+
+        facilitator_count = max(1, round(options['users'] * options['facilitator_ratio']))
+        seeker_count = options['users'] - facilitator_count
+        if seeker_count < 1:
+            raise CommandError('--users must leave room for at least one seeker')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            facilitators = self.seed_users(facilitator_count, UserRole.FACILITATOR)
+            seekers = self.seed_users(seeker_count, UserRole.SEEKER)
+            events = self.seed_events(options['events'], facilitators, distribution, len(seekers))
+            enrollments = self.seed_enrollments(events, seekers)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in (User, UserProfile, Event, Enrollment):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {facilitator_count} facilitators, {seeker_count} seekers, {len(events)} events '
+            f'and {enrollments} enrollments in {elapsed:.1f}s'
+        ))
+
+    def log(self, message):
+        if self.verbosity > 1:
+            self.stdout.write(message)
+
+    @staticmethod
+    def last_id(model):
+        return model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+    def seed_users(self, count, role):
+        """Insert users and their verified profiles; returns the new user ids"""
+        tag = 'f' if role == UserRole.FACILITATOR else 's'
+        last_id = self.last_id(User)
+        first_names = [self.faker.first_name() for _ in range(NAME_POOL_SIZE)]
+        last_names = [self.faker.last_name() for _ in range(NAME_POOL_SIZE)]
+
+        def rows():
+            for i in range(count):
+                first, last = self.rng.choice(first_names), self.rng.choice(last_names)
+                email = f'{first}.{last}.{tag}{i}@{self.domain}'.lower()
+                joined = self.now - timedelta(minutes=self.rng.randint(0, 525_600))
+                yield (self.password_hash, False, email, first, last, email, False, True, joined)
+
+        columns = [
+            'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+            'is_staff', 'is_active', 'date_joined',
+        ]
+        for chunk in chunked(rows(), self.chunk_size):
+            write_rows(User._meta.db_table, columns, chunk)
+
+        user_ids = list(
+            User.objects.filter(id__gt=last_id, email__endswith=f'@{self.domain}')
+            .order_by('id').values_list('id', flat=True)
+        )
+        profile_columns = ['user_id', 'role', 'email_verified', 'created_at', 'updated_at']
+        for chunk in chunked(((user_id, role, True, self.now, self.now) for user_id in user_ids), self.chunk_size):
+            write_rows(UserProfile._meta.db_table, profile_columns, chunk)
+        self.log(f'{count} {role} users')
+        return user_ids
+
+    def seed_events(self, count, facilitators, distribution, seeker_count):
+        """Insert events; returns (event_id, enrollment count, first enrollment time) per event"""
+        languages, language_weights = zip(*LANGUAGES)
+        locations, location_weights = zip(*LOCATIONS)
+        blurbs = [self.faker.paragraph(nb_sentences=3) for _ in range(NAME_POOL_SIZE)]
+        popularity = list(range(1, count + 1))
+        self.rng.shuffle(popularity)
+
+        last_id = self.last_id(Event)
+        plans = []
+
+        def coordinates(location):
+            """A point scattered around the city (about 15 km), or none for online events"""
+            place = geo.GazetteerGeocoder.PLACES.get(location.lower())
+            if place is None:
+                return None, None, ''
+            latitude = max(-90.0, min(90.0, place[0] + self.rng.gauss(0, 0.1)))
+            longitude = place[1] + self.rng.gauss(0, 0.1)
+            return latitude, longitude, geo.encode(latitude, longitude)
+
+        def rows():
+            for i in range(count):
+                topic = self.rng.choice(TOPICS)
+                location = self.rng.choices(locations, location_weights)[0]
+                starts_at = self.now + timedelta(minutes=self.rng.randint(-90 * 1440, 365 * 1440))
+                enrolled = min(distribution(popularity[i], self.rng), seeker_count)
+                capacity = self.rng.choice([None, max(enrolled, self.rng.choice([20, 50, 100, 250, 1000]))])
+                created_at = min(self.now, starts_at) - timedelta(days=self.rng.randint(1, 60))
+                plans.append((enrolled, created_at))
+                yield (
+                    f'{topic} {self.rng.choice(FORMATS)}: {self.faker.catch_phrase()}',
+                    f'{self.rng.choice(blurbs)} {topic} for all levels.',
+                    self.rng.choices(languages, language_weights)[0],
+                    location,
+                    *coordinates(location),
+                    starts_at,
+                    starts_at + timedelta(minutes=self.rng.choice([60, 90, 120, 180, 480])),
+                    capacity,
+                    self.rng.choice(facilitators),
+                    created_at,
+                    created_at,
+                )
+
+        columns = [
+            'title', 'description', 'language', 'location', 'latitude', 'longitude', 'geohash',
+            'starts_at', 'ends_at', 'capacity', 'created_by_id', 'created_at', 'updated_at',
+        ]
+        for chunk in chunked(rows(), self.chunk_size):
+            write_rows(Event._meta.db_table, columns, chunk)
+
+        event_ids = list(Event.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True))
+        self.log(f'{count} events')
+        return [(event_id, enrolled, created_at) for event_id, (enrolled, created_at) in zip(event_ids, plans)]
+
+    def seed_enrollments(self, events, seekers):
+        """Insert each event's planned enrollments from distinct seekers"""
+        def rows():
+            for event_id, enrolled, created_at in events:
+                created_at = created_at.isoformat()  # formatted once per event, not per row
+                for seeker_id in self.rng.sample(seekers, enrolled):
+                    status = EnrollmentStatus.CANCELED if self.rng.random() < 0.05 else EnrollmentStatus.ENROLLED
+                    yield (event_id, seeker_id, status, created_at, created_at)
+
+        total = 0
+        columns = ['event_id', 'seeker_id', 'status', 'created_at', 'updated_at']
+        for chunk in chunked(rows(), self.chunk_size):
+            write_rows(Enrollment._meta.db_table, columns, chunk)
+            total += len(chunk)
+            self.log(f'{total} enrollments')
+        return total
@@ -0,0 +1,112 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField()),
+                ("language", models.CharField(max_length=100)),
+                ("location", models.CharField(max_length=255)),
+                (
+                    "starts_at",
+                    models.DateTimeField(help_text="Start of the first occurrence"),
+                ),
+                (
+                    "ends_at",
+                    models.DateTimeField(help_text="End of the first occurrence"),
+                ),
+                (
+                    "rrule",
+                    models.CharField(
+                        help_text="Recurrence rule, e.g. FREQ=WEEKLY;BYDAY=TU;COUNT=20",
+                        max_length=500,
+                    ),
+                ),
+                (
+                    "until",
+                    models.DateTimeField(
+                        blank=True,
+                        editable=False,
+                        help_text="Start of the last occurrence",
+                        null=True,
+                    ),
+                ),
+                (
+                    "capacity",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Max number of enrollments per occurrence (optional)",
+                        null=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "event_series",
+                "ordering": ["starts_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="eventseries",
+            name="created_by",
+            field=models.ForeignKey(
+                limit_choices_to={"profile__role": "Facilitator"},
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="event_series",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Series this occurrence was materialized from",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="events",
+                to="events.eventseries",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=models.UniqueConstraint(
+                fields=("series", "starts_at"), name="unique_series_occurrence"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventseries",
+            index=models.Index(
+                fields=["starts_at", "until"], name="event_serie_starts__5a2778_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventseries",
+            index=models.Index(
+                fields=["created_by"], name="event_serie_created_a8dc33_idx"
+            ),
+        ),
+    ]
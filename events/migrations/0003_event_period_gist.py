@@ -0,0 +1,23 @@
+# GiST index on each event's [starts_at, ends_at) range, used by
+# EventQuerySet.overlapping() for the seeker schedule-conflict checks.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+
+    dependencies = [
+        ('events', '0002_event_series'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS events_period_gist '
+                'ON events USING gist (tstzrange(starts_at, ends_at))'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS events_period_gist',
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:17
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_period_gist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Set from latitude/longitude",
+                max_length=12,
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Geocoded from location when not given",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="eventseries",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Set from latitude/longitude",
+                max_length=12,
+            ),
+        ),
+        migrations.AddField(
+            model_name="eventseries",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Geocoded from location when not given",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="eventseries",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["geohash"], name="events_geohash_23fbc9_idx"),
+        ),
+    ]
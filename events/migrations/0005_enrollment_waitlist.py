@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_event_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="enrollment",
+            name="position",
+            field=models.BigIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Place in the event's waitlist; only grows, so earlier joiners have smaller positions",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="promoted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="promotion_sent_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name="enrollment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("enrolled", "Enrolled"),
+                    ("waitlisted", "Waitlisted"),
+                    ("canceled", "Canceled"),
+                ],
+                default="enrolled",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                condition=models.Q(("status", "waitlisted")),
+                fields=["event", "position"],
+                name="enrollments_waitlist_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                condition=models.Q(
+                    ("promoted_at__isnull", False), ("promotion_sent_at__isnull", True)
+                ),
+                fields=["promoted_at"],
+                name="enrollments_promotion_idx",
+            ),
+        ),
+        # Source of waitlist positions (events.waitlist.next_position)
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE IF NOT EXISTS enrollments_position_seq",
+            reverse_sql="DROP SEQUENCE IF EXISTS enrollments_position_seq",
+        ),
+    ]
@@ -2,10 +2,39 @@
 Models for the events app.
 """
 
-from django.db import models
+from datetime import timedelta
+
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, YEARLY, rrule, rrulestr
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import IntegrityError, connections, models, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Count, F, Func, Q
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils import timezone
+from .geo import locate
+
+
+class EventQuerySet(models.QuerySet):
+    """QuerySet helpers for Event"""
+
+    def with_enrollment_stats(self):
+        """Load the creator and the active enrollment count in the same query"""
+        return self.select_related('created_by').annotate(
+            enrolled_count=Count(
+                'enrollments',
+                filter=Q(enrollments__status=EnrollmentStatus.ENROLLED)
+            )
+        )
+
+    def overlapping(self, starts_at, ends_at):
+        """Events whose [starts_at, ends_at) overlaps the given period"""
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(starts_at__lt=ends_at, ends_at__gt=starts_at)
+        # Same expression as the events_period_gist index (migration 0003)
+        period = Func(F('starts_at'), F('ends_at'), function='tstzrange', output_field=DateTimeRangeField())
+        return self.alias(period=period).filter(period__overlap=DateTimeTZRange(starts_at, ends_at))
 
 
 class Event(models.Model):
@@ -17,15 +46,33 @@ class Event(models.Model):
     starts_at = models.DateTimeField()
     ends_at = models.DateTimeField()
     capacity = models.IntegerField(null=True, blank=True, help_text="Max number of enrollments (optional)")
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        help_text="Geocoded from location when not given"
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, blank=True, editable=False, help_text="Set from latitude/longitude")
     created_by = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='created_events',
         limit_choices_to={'profile__role': 'Facilitator'}
     )
+    series = models.ForeignKey(
+        'EventSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='events',
+        help_text="Series this occurrence was materialized from"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         db_table = 'events'
         ordering = ['starts_at']
@@ -35,6 +82,10 @@ class Event(models.Model):
             models.Index(fields=['location']),
             models.Index(fields=['created_by']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['geohash']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'starts_at'], name='unique_series_occurrence'),
         ]
 
     def __str__(self):
@@ -46,6 +97,7 @@ class Event(models.Model):
             raise ValidationError('End time must be after start time')
 
     def save(self, *args, **kwargs):
+        locate(self)
         self.full_clean()
         super().save(*args, **kwargs)
 
@@ -62,6 +114,9 @@ class Event(models.Model):
     @property
     def total_enrollments(self):
         """Get total active enrollments"""
+        # Annotated by EventQuerySet.with_enrollment_stats()
+        if hasattr(self, 'enrolled_count'):
+            return self.enrolled_count
         return self.enrollments.filter(status='enrolled').count()
 
     @property
@@ -79,9 +134,140 @@ class Event(models.Model):
         return self.total_enrollments >= self.capacity
 
 
+class EventSeries(models.Model):
+    """
+    Recurring event, stored once with an RFC 5545 recurrence rule.
+
+    Occurrences are expanded on the fly for the window being searched and
+    only become Event rows (materialize) when someone enrolls or the
+    facilitator edits a single occurrence. Times recur in UTC.
+    """
+    FREQUENCIES = {DAILY, WEEKLY, MONTHLY, YEARLY}
+    MAX_OCCURRENCES = 1000
+
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    language = models.CharField(max_length=100)
+    location = models.CharField(max_length=255)
+    starts_at = models.DateTimeField(help_text="Start of the first occurrence")
+    ends_at = models.DateTimeField(help_text="End of the first occurrence")
+    rrule = models.CharField(max_length=500, help_text="Recurrence rule, e.g. FREQ=WEEKLY;BYDAY=TU;COUNT=20")
+    until = models.DateTimeField(null=True, blank=True, editable=False, help_text="Start of the last occurrence")
+    capacity = models.IntegerField(
+        null=True, blank=True, help_text="Max number of enrollments per occurrence (optional)"
+    )
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        help_text="Geocoded from location when not given"
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, blank=True, editable=False, help_text="Set from latitude/longitude")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='event_series',
+        limit_choices_to={'profile__role': 'Facilitator'}
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'event_series'
+        ordering = ['starts_at']
+        indexes = [
+            models.Index(fields=['starts_at', 'until']),
+            models.Index(fields=['created_by']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.rrule})"
+
+    def get_rule(self):
+        return rrulestr(self.rrule, dtstart=self.starts_at)
+
+    def clean(self):
+        """Validate dates and the recurrence rule; compute `until`"""
+        if self.starts_at:
+            self.starts_at = self.starts_at.replace(microsecond=0)  # rrule works in whole seconds
+        if self.ends_at and self.starts_at and self.ends_at <= self.starts_at:
+            raise ValidationError('End time must be after start time')
+        try:
+            rule = self.get_rule()
+        except (ValueError, TypeError) as exc:
+            raise ValidationError(f'Invalid recurrence rule: {exc}')
+        if not isinstance(rule, rrule) or rule._dtstart != self.starts_at:
+            raise ValidationError('Give a single RRULE without DTSTART, RDATE or EXDATE')
+        if rule._freq not in self.FREQUENCIES:
+            raise ValidationError('Recurrence must be DAILY, WEEKLY, MONTHLY or YEARLY')
+        if rule._count or rule._until:
+            occurrences = list(rule.xafter(self.starts_at, count=self.MAX_OCCURRENCES + 1, inc=True))
+            if len(occurrences) > self.MAX_OCCURRENCES:
+                raise ValidationError(f'A series can have at most {self.MAX_OCCURRENCES} occurrences')
+            self.until = occurrences[-1] if occurrences else self.starts_at
+        else:
+            self.until = None
+
+    def save(self, *args, **kwargs):
+        locate(self)
+        self.full_clean()
+        super().save(*args, **kwargs)
+
+    @property
+    def duration(self):
+        return self.ends_at - self.starts_at
+
+    def occurrences(self, start, end):
+        """Start times of the occurrences starting within [start, end]"""
+        return self.get_rule().between(start, end, inc=True)
+
+    def has_occurrence(self, starts_at):
+        return self.get_rule().after(starts_at - timedelta(microseconds=1)) == starts_at
+
+    def occurrence(self, starts_at):
+        """Unsaved Event for one occurrence (as listed before it is materialized)"""
+        event = Event(
+            title=self.title,
+            description=self.description,
+            language=self.language,
+            location=self.location,
+            starts_at=starts_at,
+            ends_at=starts_at + self.duration,
+            capacity=self.capacity,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            geohash=self.geohash,
+            created_by=self.created_by,
+            series=self,
+        )
+        event.enrolled_count = 0
+        if hasattr(self, 'distance_km'):  # annotated by a radius search
+            event.distance_km = self.distance_km
+        return event
+
+    def materialize(self, starts_at):
+        """The Event row for one occurrence, created on first use"""
+        try:
+            with transaction.atomic():
+                return Event.objects.get_or_create(
+                    series=self, starts_at=starts_at,
+                    defaults={
+                        field: getattr(self, field)
+                        for field in (
+                            'title', 'description', 'language', 'location', 'capacity', 'latitude', 'longitude',
+                            'created_by',
+                        )
+                    } | {'ends_at': starts_at + self.duration},
+                )[0]
+        except (IntegrityError, ValidationError):  # created concurrently
+            return Event.objects.get(series=self, starts_at=starts_at)
+
+
 class EnrollmentStatus(models.TextChoices):
     """Enrollment status choices"""
     ENROLLED = 'enrolled', 'Enrolled'
+    WAITLISTED = 'waitlisted', 'Waitlisted'
     CANCELED = 'canceled', 'Canceled'
 
 
@@ -99,6 +285,14 @@ class Enrollment(models.Model):
         choices=EnrollmentStatus.choices,
         default=EnrollmentStatus.ENROLLED
     )
+    position = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Place in the event's waitlist; only grows, so earlier joiners have smaller positions"
+    )
+    promoted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    promotion_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -110,6 +304,18 @@ class Enrollment(models.Model):
             models.Index(fields=['seeker', 'status']),
             models.Index(fields=['event', 'status']),
             models.Index(fields=['-created_at']),
+            # The waitlist queues, read head first (events/waitlist.py)
+            models.Index(
+                fields=['event', 'position'],
+                condition=Q(status='waitlisted'),
+                name='enrollments_waitlist_idx',
+            ),
+            # Promotions whose email has not gone out yet
+            models.Index(
+                fields=['promoted_at'],
+                condition=Q(promoted_at__isnull=False, promotion_sent_at__isnull=True),
+                name='enrollments_promotion_idx',
+            ),
         ]
 
     def __str__(self):
@@ -0,0 +1,317 @@
+"""
+Live seat counts, pushed to clients as Server-Sent Events.
+
+GET /api/events/{id}/seats/stream answers with the event's current seat
+count, then an update whenever it changes:
+
+    event: seats
+    data: {"event": 1, "capacity": 50, "enrolled": 12, "available_seats": 38, "at": ...}
+
+instead of clients polling the event detail (and its enrollment COUNT).
+Enrolling and canceling publish the new count they already loaded, once, on
+the 'seats' channel (events_platform.pubsub), after the transaction
+commits. Each ASGI worker subscribes once and fans the count out to its own
+streams. A worker sends at most one update per event per INTERVAL: changes
+in between replace the pending one, so a busy event costs its subscribers
+one message a second and a slow client only ever gets the newest count.
+
+The stream is a plain ASGI app in front of Django (events_platform.asgi):
+Django 4.2 does not notice a client disconnecting from a streaming
+response, and an idle stream needs no middleware. It authenticates with
+the same JWT as the API in the Authorization header, or, since the browser
+EventSource API cannot set headers, with ?ticket=: a single-use ticket from
+POST /api/events/{id}/seats/ticket/, valid for SEAT_STREAM_TICKET_SECONDS
+(access tokens stay out of URLs, and so out of access logs). Without
+CorsMiddleware in front of it, it answers cross-origin requests from
+CORS_ALLOWED_ORIGINS itself. Under WSGI workers the path is not served.
+"""
+
+import asyncio
+import json
+import math
+import re
+import secrets
+import threading
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Exists, Q
+from events_platform import pubsub
+from .models import EnrollmentStatus, Event
+
+CHANNEL = 'seats'
+INTERVAL = 1.0  # seconds between updates of one event, per worker
+KEEPALIVE = 15.0  # seconds between comments on idle streams, so proxies keep them open
+KEEPALIVE_MESSAGE = b': keepalive\n\n'
+PATH = re.compile(r'^/api/events/(\d+)/seats/stream/?$')
+TICKET_KEY = 'events:seats:ticket:{}'
+
+
+def seat_count(event):
+    """Seat count message of an event loaded with_enrollment_stats()"""
+    return {
+        'event': event.pk,
+        'capacity': event.capacity,
+        'enrolled': event.total_enrollments,
+        'available_seats': event.available_seats,
+        'at': time.time(),
+    }
+
+
+def encode(message):
+    return f'event: seats\ndata: {json.dumps(message)}\n\n'.encode()
+
+
+def publish(event):
+    """Send the event's seat count to every stream, after the current transaction commits"""
+    message = seat_count(event)
+
+    def send():
+        deliver(message)
+        pubsub.publish(CHANNEL, message)
+    transaction.on_commit(send)
+
+
+class Watcher:
+    """One stream's view of an event: the newest encoded update it has not sent"""
+
+    __slots__ = ('message', 'changed', 'closed')
+
+    def __init__(self):
+        self.message = None
+        self.changed = asyncio.Event()
+        self.closed = False
+
+    def push(self, message):
+        self.message = message
+        self.changed.set()
+
+    def close(self):
+        self.closed = True
+        self.changed.set()
+
+
+class SeatFeed:
+    """Fans seat counts out to the streams on one event loop, at most once per event per INTERVAL"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.watchers = {}  # event id -> Watchers
+        self.latest = {}  # event id -> newest message not sent yet
+        self.seen_at = {}  # event id -> 'at' of the newest message received
+        self.sent_at = {}  # event id -> loop time of the last fan-out
+        self.loop.call_later(KEEPALIVE, self._keepalive)
+
+    def receive(self, message):
+        """Take a message from any thread"""
+        self.loop.call_soon_threadsafe(self._update, message)
+
+    def _update(self, message):
+        event_id = message['event']
+        if event_id not in self.watchers or message['at'] < self.seen_at.get(event_id, 0):
+            return  # nobody watching, or overtaken by a newer count
+        self.seen_at[event_id] = message['at']
+        pending = event_id in self.latest
+        self.latest[event_id] = message
+        if pending:
+            return  # a flush is already scheduled
+        wait = self.sent_at.get(event_id, -math.inf) + INTERVAL - self.loop.time()
+        if wait > 0:
+            self.loop.call_later(wait, self._flush, event_id)
+        else:
+            self._flush(event_id)
+
+    def _flush(self, event_id):
+        message = self.latest.pop(event_id, None)
+        watchers = self.watchers.get(event_id)
+        if message is None or not watchers:
+            return
+        self.sent_at[event_id] = self.loop.time()
+        data = encode(message)  # once for every watcher
+        for watcher in watchers:
+            watcher.push(data)
+
+    def _keepalive(self):
+        """Comment on every stream with nothing to send (one timer per loop, not per stream)"""
+        for watchers in self.watchers.values():
+            for watcher in watchers:
+                if watcher.message is None:
+                    watcher.push(KEEPALIVE_MESSAGE)
+        self.loop.call_later(KEEPALIVE, self._keepalive)
+
+    def watch(self, event_id):
+        watcher = Watcher()
+        self.watchers.setdefault(event_id, set()).add(watcher)
+        return watcher
+
+    def unwatch(self, event_id, watcher):
+        watchers = self.watchers.get(event_id, set())
+        watchers.discard(watcher)
+        if not watchers:
+            self.watchers.pop(event_id, None)
+            self.latest.pop(event_id, None)
+            self.seen_at.pop(event_id, None)
+            self.sent_at.pop(event_id, None)
+
+
+_feeds = {}  # event loop -> SeatFeed
+_feeds_lock = threading.Lock()
+
+
+def get_feed():
+    """The feed of the running event loop; the first one subscribes this process to the channel"""
+    loop = asyncio.get_running_loop()
+    with _feeds_lock:
+        feed = _feeds.get(loop)
+        if feed is None:
+            pubsub.subscribe(CHANNEL, deliver)
+            for closed in [other for other in _feeds if other.is_closed()]:
+                del _feeds[closed]
+            feed = _feeds[loop] = SeatFeed(loop)
+    return feed
+
+
+def deliver(message):
+    """Hand a seat count to the feeds of this process (called from any thread)"""
+    with _feeds_lock:
+        feeds = [feed for loop, feed in _feeds.items() if not loop.is_closed()]
+    for feed in feeds:
+        feed.receive(message)
+
+
+def issue_ticket(user, event_id):
+    """A ticket that opens the event's seat stream for `user`, once, within SEAT_STREAM_TICKET_SECONDS"""
+    ticket = secrets.token_urlsafe(24)
+    cache.set(TICKET_KEY.format(ticket), {'user': user.pk, 'event': event_id}, settings.SEAT_STREAM_TICKET_SECONDS)
+    return ticket
+
+
+async def redeem_ticket(ticket, event_id):
+    """Lookup of the user a ticket for this event was issued to, or None; the ticket is used up either way"""
+    key = TICKET_KEY.format(ticket)
+    grant = await cache.aget(key)
+    # Of concurrent requests with one ticket, only the one whose delete removed it gets in
+    if grant is None or not await cache.adelete(key) or grant['event'] != event_id:
+        return None
+    return {'pk': grant['user']}
+
+
+async def authenticate(scope, event_id):
+    """Lookup of the user with the access token or stream ticket that came with the request, or None"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    header = dict(scope['headers']).get(b'authorization')
+    if header is None:
+        ticket = parse_qs(scope.get('query_string', b'').decode()).get('ticket', [None])[0]
+        return None if ticket is None else await redeem_ticket(ticket, event_id)
+
+    authentication = JWTAuthentication()
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        user_id = authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
+    return {jwt_settings.USER_ID_FIELD: user_id}
+
+
+def cors_headers(scope):
+    """The CORS headers CorsMiddleware would add for the request's Origin; none unless it is allowed"""
+    origin = dict(scope['headers']).get(b'origin')
+    if origin is None or origin.decode('latin-1') not in settings.CORS_ALLOWED_ORIGINS:
+        return []
+    headers = [(b'access-control-allow-origin', origin), (b'vary', b'origin')]
+    if settings.CORS_ALLOW_CREDENTIALS:
+        headers.append((b'access-control-allow-credentials', b'true'))
+    return headers
+
+
+@sync_to_async
+def current_seats(event_id, user):
+    """Seat count message of the event, or None when the user or the event is not found"""
+    try:
+        event = Event.objects.filter(pk=event_id).annotate(
+            enrolled_count=Count('enrollments', filter=Q(enrollments__status=EnrollmentStatus.ENROLLED)),
+            user_active=Exists(User.objects.filter(is_active=True, **user)),
+        ).only('pk', 'capacity').first()
+        return seat_count(event) if event and event.user_active else None
+    finally:
+        # What request_finished does for Django's own requests
+        close_old_connections()
+
+
+async def respond(send, status, body, content_type=b'application/json', more_body=False, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),  # nginx: pass events through unbuffered
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+
+async def stream(scope, receive, send, event_id):
+    """Serve one seat count stream until the client disconnects"""
+    cors = cors_headers(scope)
+    if scope['method'] == 'OPTIONS' and cors:
+        # Preflight of a cross-origin request sending the Authorization header
+        return await respond(send, 200, b'', headers=[
+            *cors,
+            (b'access-control-allow-methods', b'GET, OPTIONS'),
+            (b'access-control-allow-headers', ', '.join(settings.CORS_ALLOW_HEADERS).encode()),
+            (b'access-control-max-age', b'86400'),
+        ])
+    if scope['method'] != 'GET':
+        return await respond(
+            send, 405, b'{"detail": "Method not allowed.", "code": "method_not_allowed"}', headers=cors
+        )
+    user = await authenticate(scope, event_id)
+    if user is None:
+        return await respond(send, 401, b'{"detail": "Authentication credentials were not provided.", '
+                                        b'"code": "not_authenticated"}', headers=cors)
+    message = await current_seats(event_id, user)
+    if message is None:
+        return await respond(send, 404, b'{"detail": "Event not found", "code": "event_not_found"}', headers=cors)
+
+    feed = get_feed()
+    watcher = feed.watch(event_id)
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        watcher.close()
+
+    disconnect = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await respond(send, 200, encode(message), content_type=b'text/event-stream', more_body=True, headers=cors)
+        while not watcher.closed:
+            await watcher.changed.wait()
+            watcher.changed.clear()
+            if watcher.message is not None and not watcher.closed:
+                data, watcher.message = watcher.message, None
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+    finally:
+        feed.unwatch(event_id, watcher)
+        disconnect.cancel()
+
+
+def with_seat_streams(application):
+    """Wrap an ASGI application so that seat count streams are served before it"""
+    async def app(scope, receive, send):
+        match = PATH.match(scope['path']) if scope['type'] == 'http' else None
+        if match is None:
+            return await application(scope, receive, send)
+        await stream(scope, receive, send, int(match.group(1)))
+    return app
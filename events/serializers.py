@@ -3,8 +3,9 @@ Serializers for the events app.
 """
 
 from rest_framework import serializers
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
-from .models import Event, Enrollment, EnrollmentStatus
+from .models import Event, EventSeries, Enrollment
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -18,12 +19,12 @@ class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = [
-            'id', 'title', 'description', 'language', 'location',
+            'id', 'title', 'description', 'language', 'location', 'latitude', 'longitude',
             'starts_at', 'ends_at', 'capacity', 'created_by', 'created_by_email',
             'total_enrollments', 'available_seats', 'is_past', 'is_upcoming',
-            'created_at', 'updated_at'
+            'series', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_by', 'series', 'created_at', 'updated_at']
 
     def validate(self, data):
         """Validate event dates"""
@@ -45,21 +46,81 @@ class EventSerializer(serializers.ModelSerializer):
                     "code": "past_event"
                 })
 
-        return data
+        return validate_coordinates(self, data)
 
 
 class EventListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for event listings"""
+    """Lightweight serializer for event listings (id is null for an unmaterialized series occurrence)"""
     created_by_email = serializers.EmailField(source='created_by.email', read_only=True)
     total_enrollments = serializers.IntegerField(read_only=True)
     available_seats = serializers.IntegerField(read_only=True)
+    series = serializers.IntegerField(source='series_id', read_only=True)
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
         fields = [
-            'id', 'title', 'language', 'location', 'starts_at', 'ends_at',
-            'capacity', 'created_by_email', 'total_enrollments', 'available_seats'
+            'id', 'title', 'language', 'location', 'latitude', 'longitude', 'starts_at', 'ends_at',
+            'capacity', 'created_by_email', 'total_enrollments', 'available_seats', 'series', 'distance_km'
+        ]
+
+    def get_distance_km(self, obj):
+        """Distance from lat/lng on a radius search, else null"""
+        distance = getattr(obj, 'distance_km', None)
+        return None if distance is None else round(distance, 3)
+
+
+class EventSeriesSerializer(serializers.ModelSerializer):
+    """Serializer for EventSeries; starts_at/ends_at are the first occurrence"""
+    created_by_email = serializers.EmailField(source='created_by.email', read_only=True)
+
+    class Meta:
+        model = EventSeries
+        fields = [
+            'id', 'title', 'description', 'language', 'location', 'latitude', 'longitude',
+            'starts_at', 'ends_at', 'rrule', 'until', 'capacity',
+            'created_by', 'created_by_email', 'created_at', 'updated_at'
         ]
+        read_only_fields = ['id', 'until', 'created_by', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        """Validate dates and the recurrence rule with the model's checks"""
+        series = EventSeries(**{
+            field: data.get(field, getattr(self.instance, field, None))
+            for field in ('starts_at', 'ends_at', 'rrule')
+        })
+        try:
+            series.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({
+                "detail": '; '.join(exc.messages),
+                "code": "invalid_series"
+            })
+
+        if not self.instance and data.get('starts_at') and data['starts_at'] < timezone.now():
+            raise serializers.ValidationError({
+                "detail": "Cannot create series in the past",
+                "code": "past_event"
+            })
+
+        return validate_coordinates(self, data)
+
+
+def validate_coordinates(serializer, data):
+    """
+    Require latitude and longitude together. A new location without them
+    clears the old coordinates, so the event is geocoded again on save.
+    """
+    given = [field for field in ('latitude', 'longitude') if data.get(field) is not None]
+    if len(given) == 1:
+        raise serializers.ValidationError({
+            "detail": "Give both latitude and longitude, or neither",
+            "code": "invalid_coordinates"
+        })
+    instance = serializer.instance
+    if not given and instance and data.get('location', instance.location) != instance.location:
+        data['latitude'] = data['longitude'] = None
+    return data
 
 
 class EnrollmentSerializer(serializers.ModelSerializer):
@@ -96,8 +157,13 @@ class EnrollmentSerializer(serializers.ModelSerializer):
 
 
 class EnrollmentCreateSerializer(serializers.Serializer):
-    """Serializer for creating enrollment"""
-    event_id = serializers.IntegerField(required=True)
+    """Serializer for creating enrollment, by event_id or by series_id and starts_at"""
+    event_id = serializers.IntegerField(required=False)
+    series_id = serializers.IntegerField(required=False)
+    starts_at = serializers.DateTimeField(required=False)
+    waitlist = serializers.BooleanField(
+        required=False, default=False, help_text="Join the waitlist if the event is full"
+    )
 
     def validate_event_id(self, value):
         """Validate event exists"""
@@ -111,13 +177,7 @@ class EnrollmentCreateSerializer(serializers.Serializer):
                     "code": "past_event"
                 })
             
-            # Check capacity
-            if event.is_full:
-                raise serializers.ValidationError({
-                    "detail": "Event is at full capacity",
-                    "code": "event_full"
-                })
-            
+            self.event = event
             return value
             
         except Event.DoesNotExist:
@@ -126,6 +186,60 @@ class EnrollmentCreateSerializer(serializers.Serializer):
                 "code": "event_not_found"
             })
 
+    def validate(self, data):
+        """Resolve a series occurrence (its Event is only created with the enrollment), then check capacity"""
+        if data.get('event_id') is None:
+            data['event_id'] = self.validate_occurrence(data)
+
+        # Check capacity; a full event takes the seeker onto its waitlist if they asked
+        data['waitlisted'] = self.event.is_full
+        if data['waitlisted'] and not data['waitlist']:
+            raise enrollment_error("Event is at full capacity", "event_full")
+        return data
+
+    def validate_occurrence(self, data):
+        """
+        Validate the series occurrence in `data`: its Event when it was already
+        materialized (returns its id), otherwise an unsaved one (returns None).
+        """
+        if data.get('series_id') is None or data.get('starts_at') is None:
+            raise enrollment_error("Give event_id, or series_id and starts_at", "validation_error")
+
+        series = EventSeries.objects.select_related('created_by').filter(pk=data['series_id']).first()
+        if series is None or not series.has_occurrence(data['starts_at']):
+            raise enrollment_error("Occurrence not found", "event_not_found")
+        if data['starts_at'] + series.duration < timezone.now():
+            raise enrollment_error("Cannot enroll in past events", "past_event")
+
+        event = Event.objects.filter(series=series, starts_at=data['starts_at']).first()
+        if event is None:
+            self.event = series.occurrence(data['starts_at'])
+            return None
+        try:
+            return self.validate_event_id(event.pk)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'event_id': [exc.detail]})
+
+
+def enrollment_error(detail, code):
+    """A field error in the {"detail", "code"} shape enroll_event returns as-is"""
+    return serializers.ValidationError({'event_id': [{"detail": detail, "code": code}]})
+
+
+class EventPeriodSerializer(serializers.Serializer):
+    """When and where an event takes place, for schedule conflicts"""
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    location = serializers.CharField()
+    starts_at = serializers.DateTimeField()
+    ends_at = serializers.DateTimeField()
+
+
+class ScheduleConflictSerializer(serializers.Serializer):
+    """Two enrolled events that overlap; conflicts_with is the one starting first"""
+    event = EventPeriodSerializer()
+    conflicts_with = EventPeriodSerializer()
+
 
 class FacilitatorEventSerializer(serializers.ModelSerializer):
     """Serializer for facilitator's event list with enrollment stats"""
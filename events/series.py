@@ -0,0 +1,130 @@
+"""
+Recurring event series merged into event listings.
+
+An EventSeries is one row however far it recurs. Listings expand it only
+within the window being looked at: from now (or `starts_after`) to
+`starts_before`, at most EVENT_SERIES_WINDOW_DAYS ahead. The occurrences are
+unsaved Event objects (no id, `series` and `starts_at` identify them) merged
+with the stored events in start order. Occurrences that were already
+materialized are listed as the stored Event instead.
+
+Expanding costs two queries (the matching series and their materialized
+occurrences in the window), whatever the series' horizon.
+"""
+
+import heapq
+import itertools
+from datetime import datetime, time, timedelta
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .filters import filter_text
+from .models import Event, EventSeries
+
+
+def parse_bound(value):
+    """Aware datetime from a starts_after/starts_before parameter, or None"""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def expansion_window(params, earliest):
+    """(start, end) in which to expand occurrences for these search parameters"""
+    start = max(filter(None, [earliest, parse_bound(params.get('starts_after'))]))
+    limit = start + timedelta(days=settings.EVENT_SERIES_WINDOW_DAYS)
+    starts_before = parse_bound(params.get('starts_before'))
+    return start, min(starts_before, limit) if starts_before else limit
+
+
+def expand_occurrences(params, start, end):
+    """Unmaterialized occurrences of the series matching `params` that start within [start, end]"""
+    if start > end:
+        return []
+    series_list = list(
+        filter_text(EventSeries.objects.select_related('created_by'), params)
+        .filter(starts_at__lte=end)
+        .filter(Q(until__isnull=True) | Q(until__gte=start))
+    )
+    if not series_list:
+        return []
+
+    materialized = set(
+        Event.objects.filter(series__in=series_list, starts_at__range=(start, end))
+        .values_list('series_id', 'starts_at')
+    )
+    occurrences = [
+        series.occurrence(starts_at)
+        for series in series_list
+        for starts_at in series.occurrences(start, end)
+        if (series.pk, starts_at) not in materialized
+    ]
+    return occurrences
+
+
+class EventsWithOccurrences:
+    """
+    An Event queryset merged with series occurrences, both ordered by `ordering`.
+
+    Slicing fetches only the events within the slice: a paginator reads page
+    N with one LIMIT/OFFSET query, one COUNT, and beyond the first page a
+    COUNT per step of a bisection over the occurrences to find where the
+    page starts.
+    """
+
+    def __init__(self, queryset, occurrences, ordering=('starts_at',)):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.key = attrgetter(*ordering)
+        self.occurrences = sorted(occurrences, key=self.key)
+
+    def count(self):
+        return self.queryset.count() + len(self.occurrences)
+
+    def __len__(self):
+        return self.count()
+
+    def events_before(self, occurrence):
+        """Q for the events merged ahead of `occurrence` (ties go to the events)"""
+        *fields, last = self.ordering
+        condition = Q(**{f'{last}__lte': getattr(occurrence, last)})
+        for field in reversed(fields):
+            value = getattr(occurrence, field)
+            condition = Q(**{f'{field}__lt': value}) | (Q(**{field: value}) & condition)
+        return condition
+
+    def occurrences_before(self, position):
+        """How many occurrences the merged order places ahead of `position`"""
+        # Occurrence i lands at i plus the events ahead of it, which only grows with i
+        low, high = 0, min(position, len(self.occurrences))
+        while low < high:
+            middle = (low + high) // 2
+            if middle + self.queryset.filter(self.events_before(self.occurrences[middle])).count() < position:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.occurrences:
+            return list(self.queryset[start:stop])
+        size = None if stop is None else stop - start
+        skipped = self.occurrences_before(start)
+        events = self.queryset[start - skipped:][:size]
+        merged = heapq.merge(events, self.occurrences[skipped:][:size], key=self.key)
+        return list(itertools.islice(merged, size))
@@ -3,11 +3,14 @@ Celery tasks for scheduled email notifications.
 """
 
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from .models import Enrollment, EnrollmentStatus
+from .waitlist import NOTIFY_KEY
 
 
 @shared_task
@@ -116,3 +119,58 @@ def send_event_reminder_email():
             continue
     
     return f"Sent {emails_sent} reminder emails"
+
+
+@shared_task
+def send_waitlist_promotion_emails(batch_size=500):
+    """
+    Tell seekers promoted off a waitlist that they are enrolled.
+    Queued a few seconds after a promotion (events.waitlist) and scheduled to run
+    every 5 minutes; sends everything pending, batch_size emails per connection.
+    """
+    # Promotions committed from here on queue another run
+    cache.delete(NOTIFY_KEY)
+
+    emails_sent = 0
+    while True:
+        with transaction.atomic():
+            # SKIP LOCKED: runs that overlap split the pending promotions instead of both sending them
+            batch = list(
+                Enrollment.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(promoted_at__isnull=False, promotion_sent_at__isnull=True)
+                .select_related('seeker', 'event')
+                .order_by('promoted_at')[:batch_size]
+            )
+            messages = [
+                (
+                    f'A seat opened up: you are enrolled in {enrollment.event.title}',
+                    f"""
+            Hi,
+            
+            A seat opened up in "{enrollment.event.title}" and you were next on the waitlist,
+            so you are now enrolled.
+            
+            Event Details:
+            - Date: {enrollment.event.starts_at.strftime('%B %d, %Y at %I:%M %p')}
+            - Location: {enrollment.event.location}
+            - Language: {enrollment.event.language}
+            
+            If you can no longer make it, please cancel so the next seeker gets the seat.
+            
+            Best regards,
+            Events Platform Team
+            """,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [enrollment.seeker.email],
+                )
+                for enrollment in batch
+                if enrollment.status == EnrollmentStatus.ENROLLED
+            ]
+            emails_sent += send_mass_mail(messages, fail_silently=True)
+            Enrollment.objects.filter(pk__in=[enrollment.pk for enrollment in batch]).update(
+                promotion_sent_at=timezone.now()
+            )
+        if len(batch) < batch_size:
+            break
+
+    return f"Sent {emails_sent} waitlist promotion emails"
@@ -9,7 +9,7 @@ from datetime import timedelta
 from rest_framework.test import APIClient
 from rest_framework import status
 from accounts.models import UserProfile, UserRole
-from events.models import Event, Enrollment, EnrollmentStatus
+from events.models import Event, EventSeries, Enrollment, EnrollmentStatus
 
 
 @pytest.fixture
@@ -17,6 +17,31 @@ def api_client():
     return APIClient()
 
 
+@pytest.fixture
+def replica_db(db, tmp_path, settings):
+    """A separate SQLite database standing in for a read replica"""
+    from django.core.cache import cache
+    from django.db import connections
+
+    alias = 'replica'
+    connections.settings[alias] = connections.configure_settings({
+        'default': connections.settings['default'],
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path / 'replica.sqlite3')},
+    })[alias]
+    with connections[alias].schema_editor() as editor:
+        for model in (User, UserProfile, EventSeries, Event, Enrollment):
+            editor.create_model(model)
+
+    settings.DATABASE_REPLICAS = [alias]
+    cache.clear()
+    yield alias
+
+    cache.clear()
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
 @pytest.fixture
 def seeker_user(db):
     user = User.objects.create_user(
@@ -207,6 +232,94 @@ class TestEnrollment:
 
 
 @pytest.mark.django_db
+class TestIdempotentEnrollment:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    @staticmethod
+    def authenticate(api_client, user):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    @pytest.mark.django_db
+    def test_retry_replays_the_first_response_without_queries(
+        self, api_client, seeker_user, sample_event, django_assert_num_queries
+    ):
+        """Test that a retried enroll gets the original 201, not already_enrolled, and runs no query"""
+        self.authenticate(api_client, seeker_user)
+        data = {'event_id': sample_event.id}
+        first = api_client.post('/api/seeker/enroll', data, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+
+        with django_assert_num_queries(0):
+            retry = api_client.post('/api/seeker/enroll', data, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert Enrollment.objects.filter(event=sample_event, seeker=seeker_user).count() == 1
+
+        other = {'event_id': sample_event.id, 'waitlist': True}
+        reused = api_client.post('/api/seeker/enroll', other, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+        assert reused.status_code == 422
+        assert reused.json()['code'] == 'idempotency_key_reused'
+
+        # Keys are per user: another seeker's request with the same key runs
+        seeker = User.objects.create_user(username='retry@example.com', email='retry@example.com')
+        UserProfile.objects.create(user=seeker, role=UserRole.SEEKER, email_verified=True)
+        self.authenticate(api_client, seeker)
+        response = api_client.post('/api/seeker/enroll', data, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['id'] != first.json()['id']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_duplicates_run_once(self, seeker_user, sample_event, settings, monkeypatch):
+        """Test that duplicates sent while the first request runs wait for its response, or get 409 after the wait"""
+        import threading
+        import time
+        from django.core.cache import cache
+        from django.db import connection
+        from events import views
+
+        is_valid = views.EnrollmentCreateSerializer.is_valid
+
+        def slow_is_valid(serializer, *args, **kwargs):
+            time.sleep(0.3)
+            return is_valid(serializer, *args, **kwargs)
+        monkeypatch.setattr(views.EnrollmentCreateSerializer, 'is_valid', slow_is_valid)
+
+        def send(count, key):
+            responses = []
+
+            def post():
+                client = APIClient()
+                self.authenticate(client, seeker_user)
+                try:
+                    responses.append(client.post(
+                        '/api/seeker/enroll', {'event_id': sample_event.id}, format='json', HTTP_IDEMPOTENCY_KEY=key,
+                    ))
+                finally:
+                    connection.close()
+            threads = [threading.Thread(target=post) for _ in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return responses
+
+        responses = send(3, 'twice')
+        assert [response.status_code for response in responses] == [status.HTTP_201_CREATED] * 3
+        assert len({response.json()['id'] for response in responses}) == 1
+        assert sum(response.has_header('Idempotent-Replayed') for response in responses) == 2
+
+        cache.clear()
+        settings.IDEMPOTENCY_WAIT_SECONDS = 0
+        Enrollment.objects.all().delete()
+        codes = sorted(response.status_code for response in send(2, 'impatient'))
+        assert codes == [status.HTTP_201_CREATED, status.HTTP_409_CONFLICT]
+
+
 class TestEnrollmentCancellation:
     def test_cancel_enrollment(self, api_client, seeker_user, sample_event):
         """Test enrollment cancellation"""
@@ -223,3 +336,1100 @@ class TestEnrollmentCancellation:
         assert response.status_code == status.HTTP_200_OK
         enrollment.refresh_from_db()
         assert enrollment.status == EnrollmentStatus.CANCELED
+
+
+@pytest.mark.django_db
+class TestEventDetailCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        from events_platform import tiered
+        cache.clear()
+        tiered.clear_local()
+
+    @staticmethod
+    def authenticate(api_client, user):
+        """JWT credentials, which the async views read too"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def test_detail_is_cached_until_the_event_changes(
+        self, api_client, seeker_user, facilitator_user, sample_event, django_capture_on_commit_callbacks
+    ):
+        """Test that the detail is served from the cache and rebuilt after an edit, an enrollment and a cancel"""
+        self.authenticate(api_client, seeker_user)
+        url = f'/api/events/{sample_event.id}/'
+        assert api_client.get(url).data['title'] == 'Test Event'
+
+        # No signal, so the cached detail stands
+        Event.objects.filter(pk=sample_event.pk).update(title='Renamed quietly')
+        assert api_client.get(url).data['title'] == 'Test Event'
+        assert api_client.get(f'/api/async/events/{sample_event.id}/').json()['title'] == 'Test Event'
+
+        facilitator_client = APIClient()
+        facilitator_client.force_authenticate(user=facilitator_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            facilitator_client.patch(url, {'title': 'Renamed'}, format='json')
+        assert api_client.get(url).data['title'] == 'Renamed'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/api/seeker/enroll', {'event_id': sample_event.id}, format='json')
+        enrollment_id = response.data['id']
+        assert api_client.get(url).data['total_enrollments'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(f'/api/seeker/enrollments/{enrollment_id}/cancel')
+        assert api_client.get(url).data['total_enrollments'] == 0
+
+    def test_filtered_lookup_and_deleted_event_bypass_the_cache(
+        self, api_client, seeker_user, sample_event, django_capture_on_commit_callbacks
+    ):
+        """Test that ?filters apply to the detail and a deleted event is not served from the cache"""
+        self.authenticate(api_client, seeker_user)
+        event_id = sample_event.id
+        url = f'/api/events/{event_id}/'
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        assert api_client.get(url, {'location': 'Elsewhere'}).status_code == status.HTTP_404_NOT_FOUND
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sample_event.delete()
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(f'/api/async/events/{event_id}/').status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestWaitlist:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    @staticmethod
+    def create_seekers(count):
+        seekers = []
+        for i in range(count):
+            user = User.objects.create_user(username=f'waiting{i}@example.com', email=f'waiting{i}@example.com')
+            UserProfile.objects.create(user=user, role=UserRole.SEEKER, email_verified=True)
+            seekers.append(user)
+        return seekers
+
+    @staticmethod
+    def full_event(facilitator, capacity, enrolled, waitlisted):
+        """An event with `enrolled` filling its seats and `waitlisted` queued in order"""
+        from events import waitlist
+
+        event = Event.objects.create(
+            title='Popular Event', description='Test', language='English', location='Mumbai',
+            starts_at=timezone.now() + timedelta(days=5), ends_at=timezone.now() + timedelta(days=5, hours=2),
+            capacity=capacity, created_by=facilitator,
+        )
+        enrollments = [Enrollment.objects.create(event=event, seeker=seeker) for seeker in enrolled]
+        queue = [waitlist.join(event, seeker) for seeker in waitlisted]
+        return event, enrollments, queue
+
+    @pytest.mark.django_db
+    def test_join_waitlist_when_full(self, api_client, seeker_user, facilitator_user):
+        other, = self.create_seekers(1)
+        event, _, _ = self.full_event(facilitator_user, 1, [other], [])
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': event.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'event_full'
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': event.id, 'waitlist': True}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['status'] == EnrollmentStatus.WAITLISTED
+        assert response.data['waitlist_place'] == 1
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': event.id, 'waitlist': True}, format='json')
+        assert response.data['code'] == 'already_waitlisted'
+
+        response = api_client.get('/api/seeker/enrollments', {'type': 'waitlisted'})
+        assert [row['event'] for row in response.data['results']] == [event.id]
+
+    @pytest.mark.django_db
+    def test_cancel_promotes_head_of_waitlist(
+        self, api_client, seeker_user, facilitator_user, mailoutbox, django_capture_on_commit_callbacks
+    ):
+        first, second = self.create_seekers(2)
+        event, (enrollment,), (head, tail) = self.full_event(facilitator_user, 1, [seeker_user], [first, second])
+        assert head.position < tail.position
+
+        api_client.force_authenticate(user=seeker_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(f'/api/seeker/enrollments/{enrollment.id}/cancel')
+        assert response.status_code == status.HTTP_200_OK
+
+        head.refresh_from_db()
+        tail.refresh_from_db()
+        assert head.status == EnrollmentStatus.ENROLLED and head.promoted_at and head.promotion_sent_at
+        assert tail.status == EnrollmentStatus.WAITLISTED
+        assert [message.to for message in mailoutbox] == [[first.email]]
+
+    @pytest.mark.django_db
+    def test_leaving_waitlist_promotes_nobody(self, api_client, facilitator_user, seeker_user):
+        other, = self.create_seekers(1)
+        event, _, (waiting,) = self.full_event(facilitator_user, 1, [other], [seeker_user])
+
+        api_client.force_authenticate(user=seeker_user)
+        response = api_client.post(f'/api/seeker/enrollments/{waiting.id}/cancel')
+        assert response.data['status'] == EnrollmentStatus.CANCELED
+        assert event.enrollments.filter(status=EnrollmentStatus.ENROLLED).count() == 1
+
+    @pytest.mark.django_db
+    def test_larger_capacity_promotes_in_order(self, api_client, facilitator_user):
+        seekers = self.create_seekers(4)
+        event, _, queue = self.full_event(facilitator_user, 1, seekers[:1], seekers[1:])
+
+        api_client.force_authenticate(user=facilitator_user)
+        response = api_client.patch(f'/api/events/{event.id}/', {'capacity': 3}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        statuses = [Enrollment.objects.get(pk=enrollment.pk).status for enrollment in queue]
+        assert statuses == [EnrollmentStatus.ENROLLED, EnrollmentStatus.ENROLLED, EnrollmentStatus.WAITLISTED]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_parallel_cancels_promote_each_seeker_once(self, facilitator_user):
+        """Every cancel commits in its own thread and connection, all released at once"""
+        import threading
+        from django.db import connection
+
+        seekers = self.create_seekers(10)
+        event, enrollments, queue = self.full_event(facilitator_user, 4, seekers[:4], seekers[4:])
+        # Two requests per enrollment: the second must find it canceled and free nothing
+        requests = [(enrollment.seeker, enrollment.pk) for enrollment in enrollments] * 2
+        barrier = threading.Barrier(len(requests))
+        codes = []
+
+        def cancel(seeker, enrollment_id):
+            client = APIClient()
+            client.force_authenticate(user=seeker)
+            try:
+                barrier.wait()
+                codes.append(client.post(f'/api/seeker/enrollments/{enrollment_id}/cancel').status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=cancel, args=request) for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(codes) == [200] * 4 + [400] * 4
+        promoted = Enrollment.objects.filter(event=event, status=EnrollmentStatus.ENROLLED)
+        assert sorted(promoted.values_list('pk', flat=True)) == [enrollment.pk for enrollment in queue[:4]]
+        assert event.enrollments.filter(status=EnrollmentStatus.WAITLISTED).count() == 2
+
+
+@pytest.mark.django_db
+class TestScheduleConflicts:
+    @staticmethod
+    def create_event(facilitator, title, start_hours, end_hours):
+        starts_at = timezone.now() + timedelta(days=3)
+        return Event.objects.create(
+            title=title,
+            description='Test',
+            language='English',
+            location='Mumbai',
+            starts_at=starts_at + timedelta(hours=start_hours),
+            ends_at=starts_at + timedelta(hours=end_hours),
+            created_by=facilitator
+        )
+
+    def test_overlapping_enrollment_is_rejected(self, api_client, seeker_user, facilitator_user):
+        """Test that enrolling in an overlapping event fails and back-to-back events are allowed"""
+        morning = self.create_event(facilitator_user, 'Morning', 0, 2)
+        overlapping = self.create_event(facilitator_user, 'Overlapping', 1, 3)
+        afterwards = self.create_event(facilitator_user, 'Afterwards', 2, 4)
+        Enrollment.objects.create(event=morning, seeker=seeker_user)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': overlapping.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'schedule_conflict'
+        assert [event['id'] for event in response.data['conflicts']] == [morning.id]
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': afterwards.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert 'conflicts' not in response.data
+
+    def test_warn_policy_enrolls_and_lists_conflicts(self, api_client, settings, seeker_user, facilitator_user):
+        """Test that the warn policy enrolls anyway and returns the conflicts"""
+        settings.ENROLLMENT_CONFLICT_POLICY = 'warn'
+        morning = self.create_event(facilitator_user, 'Morning', 0, 2)
+        overlapping = self.create_event(facilitator_user, 'Overlapping', 1, 3)
+        Enrollment.objects.create(event=morning, seeker=seeker_user)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': overlapping.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [event['id'] for event in response.data['conflicts']] == [morning.id]
+
+    def test_list_conflicts(self, api_client, seeker_user, facilitator_user):
+        """Test that overlapping pairs of enrolled events are listed, ignoring canceled enrollments"""
+        first = self.create_event(facilitator_user, 'First', 0, 3)
+        second = self.create_event(facilitator_user, 'Second', 1, 2)
+        third = self.create_event(facilitator_user, 'Third', 2.5, 5)
+        fourth = self.create_event(facilitator_user, 'Fourth', 6, 7)
+        canceled = self.create_event(facilitator_user, 'Canceled', 6, 7)
+        for event in (first, second, third, fourth):
+            Enrollment.objects.create(event=event, seeker=seeker_user)
+        Enrollment.objects.create(event=canceled, seeker=seeker_user, status=EnrollmentStatus.CANCELED)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/seeker/conflicts')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+        pairs = [(item['conflicts_with']['id'], item['event']['id']) for item in response.data['results']]
+        assert pairs == [(first.id, second.id), (first.id, third.id)]
+
+
+@pytest.mark.django_db
+class TestNearbySearch:
+    @staticmethod
+    def create_event(facilitator, location, **coordinates):
+        return Event.objects.create(
+            title=f'{location} Event',
+            description='Test',
+            language='English',
+            location=location,
+            starts_at=timezone.now() + timedelta(days=5),
+            ends_at=timezone.now() + timedelta(days=5, hours=2),
+            created_by=facilitator,
+            **coordinates
+        )
+
+    def test_location_is_geocoded_on_save(self, facilitator_user):
+        """Test that known locations get coordinates and a geohash, unknown ones none"""
+        from events import geo
+
+        mumbai = self.create_event(facilitator_user, 'Mumbai')
+        assert (mumbai.latitude, mumbai.longitude) == geo.GazetteerGeocoder.PLACES['mumbai']
+        assert mumbai.geohash == geo.encode(mumbai.latitude, mumbai.longitude) == 'te7ud2evv'
+
+        assert self.create_event(facilitator_user, 'Online').geohash == ''
+
+    def test_radius_search_sorted_by_distance(self, api_client, seeker_user, facilitator_user):
+        """Test that lat/lng/radius_km keeps events within the radius and ordering=distance sorts them"""
+        self.create_event(facilitator_user, 'Mumbai')
+        self.create_event(facilitator_user, 'Thane', latitude=19.2183, longitude=72.9781)
+        self.create_event(facilitator_user, 'Pune')
+        self.create_event(facilitator_user, 'Online')
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?lat=19.2&lng=72.97&radius_km=30&ordering=distance')
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['location'] for item in response.data['results']] == ['Thane', 'Mumbai']
+        distances = [item['distance_km'] for item in response.data['results']]
+        assert distances[0] < 3 and 10 < distances[1] < 30
+
+        response = api_client.get('/api/events/search/?lat=19.2&lng=72.97&radius_km=200')
+        assert {item['location'] for item in response.data['results']} == {'Mumbai', 'Thane', 'Pune'}
+
+        response = api_client.get('/api/events/search/?lat=north&lng=72.97')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_radius_search_across_antimeridian(self, api_client, seeker_user, facilitator_user):
+        """Test that a circle crossing longitude 180 finds events on both sides"""
+        self.create_event(facilitator_user, 'Fiji East', latitude=-16.8, longitude=179.9)
+        self.create_event(facilitator_user, 'Fiji West', latitude=-16.8, longitude=-179.9)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?lat=-16.8&lng=179.99&radius_km=50')
+        assert {item['location'] for item in response.data['results']} == {'Fiji East', 'Fiji West'}
+
+    def test_new_location_is_geocoded_again(self, api_client, facilitator_user):
+        """Test that changing the location without coordinates re-geocodes the event"""
+        event = self.create_event(facilitator_user, 'Mumbai')
+        api_client.force_authenticate(user=facilitator_user)
+
+        response = api_client.patch(f'/api/events/{event.id}/', {'location': 'Delhi'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['latitude'], response.data['longitude']) == (28.6139, 77.2090)
+
+        response = api_client.patch(f'/api/events/{event.id}/', {'latitude': 28.5}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestSearchFacets:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        yield
+        cache.clear()
+
+    @staticmethod
+    def create_event(facilitator, language, location, days=5):
+        return Event.objects.create(
+            title=f'{language} in {location}',
+            description='Test',
+            language=language,
+            location=location,
+            starts_at=timezone.now() + timedelta(days=days),
+            ends_at=timezone.now() + timedelta(days=days, hours=2),
+            created_by=facilitator
+        )
+
+    def test_facet_counts(self, api_client, seeker_user, facilitator_user):
+        """Test that ?facets= counts matching upcoming events per language, location and month"""
+        self.create_event(facilitator_user, 'English', 'Mumbai')
+        self.create_event(facilitator_user, 'English', 'Delhi')
+        self.create_event(facilitator_user, 'Hindi', 'Mumbai')
+        self.create_event(facilitator_user, 'Hindi', 'Mumbai', days=-5)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?facets=language,location,date')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 3
+        facets = response.data['facets']
+        assert facets['language'] == [{'value': 'English', 'count': 2}, {'value': 'Hindi', 'count': 1}]
+        assert facets['location'] == [{'value': 'Mumbai', 'count': 2}, {'value': 'Delhi', 'count': 1}]
+        assert sum(bucket['count'] for bucket in facets['date']) == 3
+
+        response = api_client.get('/api/events/search/?location=mumbai&facets=language')
+        assert list(response.data['facets']) == ['language']
+        assert response.data['facets']['language'] == [
+            {'value': 'English', 'count': 1}, {'value': 'Hindi', 'count': 1},
+        ]
+
+        response = api_client.get('/api/events/search/')
+        assert 'facets' not in response.data
+
+    def test_facets_count_series_occurrences(self, api_client, seeker_user, facilitator_user):
+        """Test that upcoming occurrences of matching series are counted like the results"""
+        starts_at = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        EventSeries.objects.create(
+            title='Weekly Meetup', description='Test', language='Tamil', location='Chennai',
+            starts_at=starts_at, ends_at=starts_at + timedelta(hours=2), rrule='FREQ=WEEKLY;COUNT=3',
+            created_by=facilitator_user
+        )
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?facets=language')
+        assert response.data['facets']['language'] == [{'value': 'Tamil', 'count': 3}]
+
+    def test_facets_cached_per_normalized_filters(self, api_client, seeker_user, facilitator_user):
+        """Test that equivalent filters share cached counts until the cache expires"""
+        from django.core.cache import cache
+        from events_platform.instrumentation import collect_queries
+
+        self.create_event(facilitator_user, 'English', 'Mumbai')
+        api_client.force_authenticate(user=seeker_user)
+        api_client.get('/api/events/search/?location=Mumbai&facets=location,language')
+
+        self.create_event(facilitator_user, 'English', 'Mumbai')
+        with collect_queries(record=True) as queries:
+            response = api_client.get('/api/events/search/?facets=Language,location&location=MUMBAI&page=1')
+        assert response.data['count'] == 2
+        assert response.data['facets']['location'] == [{'value': 'Mumbai', 'count': 1}]
+        assert not any('GROUPING' in sql for sql, _ in queries.statements)
+
+        cache.clear()
+        response = api_client.get('/api/events/search/?location=Mumbai&facets=location,language')
+        assert response.data['facets']['location'] == [{'value': 'Mumbai', 'count': 2}]
+
+    def test_async_search_facets(self, api_client, seeker_user, facilitator_user):
+        """Test that the async search returns the same facets as the sync one"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        self.create_event(facilitator_user, 'English', 'Mumbai')
+        self.create_event(facilitator_user, 'Hindi', 'Delhi')
+        api_client.force_authenticate(user=seeker_user)
+        expected = api_client.get('/api/events/search/?facets=language,location,date').data['facets']
+
+        token = RefreshToken.for_user(seeker_user).access_token
+        response = api_client.get(
+            '/api/async/events/search/?facets=date,location,language', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['facets'] == expected
+
+    def test_unknown_facet(self, api_client, seeker_user):
+        """Test that an unknown facet name is rejected"""
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?facets=language,price')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'parse_error'
+
+
+@pytest.mark.django_db
+class TestAutocomplete:
+    @pytest.fixture(autouse=True)
+    def fresh_index(self):
+        from events import autocomplete
+
+        autocomplete.reset()
+        yield
+        autocomplete.reset()
+
+    @staticmethod
+    def create_event(facilitator, title, location='Mumbai', language='English', days=5):
+        return Event.objects.create(
+            title=title,
+            description='Test',
+            language=language,
+            location=location,
+            starts_at=timezone.now() + timedelta(days=days),
+            ends_at=timezone.now() + timedelta(days=days, hours=2),
+            created_by=facilitator
+        )
+
+    def suggest(self, api_client, prefix):
+        response = api_client.get('/api/events/autocomplete', {'prefix': prefix})
+        assert response.status_code == status.HTTP_200_OK
+        return [(item['kind'], item['text'], item['count']) for item in response.data['results']]
+
+    def test_suggests_word_prefixes(self, api_client, seeker_user, facilitator_user):
+        """Test that upcoming titles, locations and languages match from any word, ignoring case and accents"""
+        self.create_event(facilitator_user, 'Python Workshop', location='São Paulo', language='Portuguese')
+        self.create_event(facilitator_user, 'Advanced python', location='Pune')
+        self.create_event(facilitator_user, 'Advanced python', location='Pune')
+        self.create_event(facilitator_user, 'Python Retrospective', days=-5)
+        api_client.force_authenticate(user=seeker_user)
+
+        assert self.suggest(api_client, 'PYTH') == [
+            ('title', 'Advanced python', 2), ('title', 'Python Workshop', 1),
+        ]
+        assert self.suggest(api_client, 'p') == [
+            ('location', 'Pune', 2), ('title', 'Advanced python', 2),
+            ('location', 'São Paulo', 1), ('language', 'Portuguese', 1), ('title', 'Python Workshop', 1),
+        ]
+        assert self.suggest(api_client, 'sao  pa') == [('location', 'São Paulo', 1)]
+        assert self.suggest(api_client, ' ') == []
+
+        response = api_client.get('/api/events/autocomplete', {'prefix': 'p', 'limit': 50})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_index_follows_saves_and_deletes(
+        self, api_client, seeker_user, facilitator_user, django_capture_on_commit_callbacks
+    ):
+        """Test that saves and deletes reach a built index once their transaction commits"""
+        api_client.force_authenticate(user=seeker_user)
+        assert self.suggest(api_client, 'rust') == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event = self.create_event(facilitator_user, 'Rust Meetup')
+        assert self.suggest(api_client, 'rust') == [('title', 'Rust Meetup', 1)]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event.title = 'Go Meetup'
+            event.save()
+        assert self.suggest(api_client, 'meetup') == [('title', 'Go Meetup', 1)]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event.delete()
+        assert self.suggest(api_client, 'meetup') == []
+
+    def test_changes_from_other_workers(self, api_client, seeker_user):
+        """Test that changes published by another worker are applied, and this worker's own are not re-applied"""
+        import time
+        from events import autocomplete
+        from events_platform import pubsub
+
+        api_client.force_authenticate(user=seeker_user)
+        assert self.suggest(api_client, 'kotlin') == []
+
+        record = [time.time() + 3600, 'Kotlin Night', 'Pune', 'English']
+        pubsub.get_broker().publish(autocomplete.CHANNEL, {
+            'origin': 'another-worker', 'payload': {'id': 999, 'record': record},
+        })
+        assert self.suggest(api_client, 'kotlin') == [('title', 'Kotlin Night', 1)]
+
+        pubsub.publish(autocomplete.CHANNEL, {'id': 999, 'record': None})
+        assert self.suggest(api_client, 'kotlin') == [('title', 'Kotlin Night', 1)]
+
+    def test_rebuild_after_lost_changes(self, api_client, seeker_user, facilitator_user):
+        """Test that a resync reloads a built index from the database and leaves an unbuilt one alone"""
+        from events import autocomplete
+
+        autocomplete.rebuild()
+        assert autocomplete._index is None
+
+        api_client.force_authenticate(user=seeker_user)
+        assert self.suggest(api_client, 'rust') == []
+        self.create_event(facilitator_user, 'Rust Night')  # never committed, so never applied to the index
+        assert self.suggest(api_client, 'rust') == []
+
+        autocomplete.rebuild()
+        assert self.suggest(api_client, 'rust') == [('title', 'Rust Night', 1)]
+
+    def test_prefix_index_expiry_and_compaction(self):
+        """Test that started events drop out and that merging the delta keeps every value"""
+        import time
+        from events import autocomplete
+
+        index = autocomplete.PrefixIndex()
+        index.load([(1, time.time() + 0.05, 'Soon Starting', 'Pune', 'English')])
+        for pk in range(2, 2 + 3 * autocomplete.COMPACT_MIN):
+            index.put(pk, time.time() + 3600, f'Talk {pk}', 'Pune', 'English')
+        for pk in range(2, 2 + 2 * autocomplete.COMPACT_MIN):
+            index.discard(pk)
+
+        time.sleep(0.1)
+        assert index.suggest('soon') == []
+        assert index.suggest('pune') == [{'text': 'Pune', 'kind': 'location', 'count': autocomplete.COMPACT_MIN}]
+        assert index.stats()['keys']['title'] == 2 * autocomplete.COMPACT_MIN
+        assert index.suggest(f'talk {2 * autocomplete.COMPACT_MIN + 2}', 1) == [
+            {'text': f'Talk {2 * autocomplete.COMPACT_MIN + 2}', 'kind': 'title', 'count': 1},
+        ]
+
+    def test_long_prefix_matches_word_starts_only(self):
+        """Test that a prefix longer than a key is matched at a word start, not inside a word"""
+        import time
+        from events import autocomplete
+
+        index = autocomplete.PrefixIndex()
+        index.load([
+            (1, time.time() + 3600, 'Python web apps vs CPython web apps for all', 'Pune', 'English'),
+            (2, time.time() + 3600, 'Intro: Python web apps for beginners', 'Pune', 'English'),
+        ])
+
+        prefix = 'python web apps f'
+        assert len(prefix.encode()) > autocomplete.KEY_LENGTH
+        assert index.suggest(prefix) == [
+            {'text': 'Intro: Python web apps for beginners', 'kind': 'title', 'count': 1},
+        ]
+
+
+@pytest.mark.django_db
+class TestEventSeries:
+    @pytest.fixture
+    def weekly_series(self, facilitator_user):
+        starts_at = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        return EventSeries.objects.create(
+            title='Weekly Meetup',
+            description='Test',
+            language='English',
+            location='Pune',
+            starts_at=starts_at,
+            ends_at=starts_at + timedelta(hours=2),
+            rrule='FREQ=WEEKLY;COUNT=52',
+            capacity=5,
+            created_by=facilitator_user
+        )
+
+    def test_create_series(self, api_client, facilitator_user):
+        """Test that a facilitator can create a series and invalid rules are rejected"""
+        api_client.force_authenticate(user=facilitator_user)
+        starts_at = timezone.now() + timedelta(days=3)
+        data = {
+            'title': 'Daily Standup',
+            'description': 'Test',
+            'language': 'English',
+            'location': 'Pune',
+            'starts_at': starts_at.isoformat(),
+            'ends_at': (starts_at + timedelta(minutes=15)).isoformat(),
+            'rrule': 'FREQ=DAILY;COUNT=10',
+        }
+
+        response = api_client.post('/api/series/', data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        series = EventSeries.objects.get(pk=response.data['id'])
+        assert series.until == series.starts_at + timedelta(days=9)
+
+        response = api_client.post('/api/series/', {**data, 'rrule': 'FREQ=MINUTELY'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'DAILY, WEEKLY, MONTHLY or YEARLY' in str(response.data['detail'])
+
+    def test_search_lists_occurrences_within_window(self, api_client, settings, seeker_user, weekly_series):
+        """Test that occurrences are expanded only within the window and merged in start order"""
+        settings.EVENT_SERIES_WINDOW_DAYS = 30
+        weekly_series.materialize(weekly_series.starts_at + timedelta(weeks=1))
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/?location=Pune')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 5  # 4 weeks plus today's slot
+        results = response.data['results']
+        assert [item['starts_at'] for item in results] == sorted(item['starts_at'] for item in results)
+        assert {item['series'] for item in results} == {weekly_series.id}
+        assert [item['id'] is None for item in results] == [True, False, True, True, True]
+
+        response = api_client.get('/api/events/search/?location=Delhi')
+        assert response.data['count'] == 0
+
+    def test_async_listings_merge_occurrences(self, api_client, settings, seeker_user, weekly_series):
+        """Test that the async search and list merge occurrences like the sync ones, on every page"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        settings.EVENT_SERIES_WINDOW_DAYS = 150
+        weekly_series.materialize(weekly_series.starts_at + timedelta(weeks=20))
+        api_client.force_authenticate(user=seeker_user)
+        token = RefreshToken.for_user(seeker_user).access_token
+
+        for path in ('/api/events/search/?location=Pune&facets=date', '/api/events/?location=Pune&page=2'):
+            expected = api_client.get(path).json()
+            response = api_client.get(path.replace('/api/', '/api/async/'), HTTP_AUTHORIZATION=f'Bearer {token}')
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()['count'] == expected['count'] == 22
+            assert response.json()['results'] == expected['results']
+            assert response.json().get('facets') == expected.get('facets')
+
+    def test_slices_fetch_only_their_events(self, facilitator_user, weekly_series):
+        """Test that every slice matches the full merge, ties included, and reads only its own events"""
+        import heapq
+        from operator import attrgetter
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .series import EventsWithOccurrences
+
+        for day in range(0, 36, 3):  # every 21 days on the same start as an occurrence
+            starts_at = weekly_series.starts_at + timedelta(days=day)
+            Event.objects.create(
+                title=f'Day {day}', description='Test', language='English', location='Pune',
+                starts_at=starts_at, ends_at=starts_at + timedelta(hours=1), created_by=facilitator_user,
+            )
+        first = weekly_series.starts_at
+        occurrences = [
+            weekly_series.occurrence(starts_at)
+            for starts_at in weekly_series.occurrences(first, first + timedelta(weeks=6))
+        ]
+        queryset = Event.objects.order_by('starts_at', 'id')
+        listing = EventsWithOccurrences(queryset, occurrences)
+        everything = list(heapq.merge(queryset.all(), occurrences, key=attrgetter('starts_at')))
+
+        assert len(listing) == len(everything) == 19
+        for start in range(len(everything)):
+            for size in (1, 5):
+                assert listing[start:start + size] == everything[start:start + size]
+
+        with CaptureQueriesContext(connection) as queries:
+            listing[10:15]
+        assert 'LIMIT 5 OFFSET' in queries.captured_queries[-1]['sql']
+
+    def test_enroll_materializes_occurrence(self, api_client, seeker_user, weekly_series):
+        """Test that enrolling in an occurrence creates its Event once"""
+        api_client.force_authenticate(user=seeker_user)
+        starts_at = weekly_series.starts_at + timedelta(weeks=2)
+        data = {'series_id': weekly_series.id, 'starts_at': starts_at.isoformat()}
+
+        response = api_client.post('/api/seeker/enroll', data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        event = Event.objects.get(series=weekly_series)
+        assert event.starts_at == starts_at
+        assert event.capacity == 5
+
+        response = api_client.post('/api/seeker/enroll', data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Event.objects.filter(series=weekly_series).count() == 1
+
+        data['starts_at'] = (starts_at + timedelta(hours=1)).isoformat()
+        response = api_client.post('/api/seeker/enroll', data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'event_not_found'
+
+    def test_rejected_enroll_leaves_no_occurrence_behind(
+        self, api_client, settings, seeker_user, facilitator_user, weekly_series
+    ):
+        """Test that an occurrence is only materialized together with an accepted enrollment"""
+        settings.ENROLLMENT_CONFLICT_POLICY = 'reject'
+        starts_at = weekly_series.starts_at + timedelta(weeks=2)
+        overlapping = Event.objects.create(
+            title='Overlapping', description='Test', language='English', location='Pune',
+            starts_at=starts_at, ends_at=starts_at + timedelta(hours=1), created_by=facilitator_user,
+        )
+        Enrollment.objects.create(event=overlapping, seeker=seeker_user, status=EnrollmentStatus.ENROLLED)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.post(
+            '/api/seeker/enroll', {'series_id': weekly_series.id, 'starts_at': starts_at.isoformat()}, format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['code'] == 'schedule_conflict'
+        assert not Event.objects.filter(series=weekly_series).exists()
+
+    def test_series_edit_updates_future_occurrences(self, api_client, facilitator_user, weekly_series):
+        """Test that editing a series carries over to materialized occurrences"""
+        api_client.force_authenticate(user=facilitator_user)
+        starts_at = weekly_series.starts_at + timedelta(weeks=3)
+        response = api_client.post(
+            f'/api/series/{weekly_series.id}/materialize/', {'starts_at': starts_at.isoformat()}, format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = api_client.patch(f'/api/series/{weekly_series.id}/', {'location': 'Goa'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert Event.objects.get(series=weekly_series).location == 'Goa'
+
+    def test_series_edit_refreshes_details_and_seat_streams(
+        self, api_client, monkeypatch, facilitator_user, seeker_user, weekly_series, django_capture_on_commit_callbacks
+    ):
+        """Test that a series edit expires its occurrences' cached details and pushes their seat counts"""
+        from django.core.cache import cache
+        from events import seats
+        from events_platform import tiered
+
+        cache.clear()
+        tiered.clear_local()
+        event = weekly_series.materialize(weekly_series.starts_at + timedelta(weeks=1))
+        Enrollment.objects.create(event=event, seeker=seeker_user, status=EnrollmentStatus.WAITLISTED, position=1)
+        api_client.force_authenticate(user=facilitator_user)
+        url = f'/api/events/{event.id}/'
+        assert api_client.get(url).data['location'] == 'Pune'
+
+        pushed = []
+        monkeypatch.setattr(seats, 'deliver', pushed.append)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.patch(
+                f'/api/series/{weekly_series.id}/', {'location': 'Goa', 'capacity': 6}, format='json'
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = api_client.get(url)
+        assert response.data['location'] == 'Goa'
+        assert response.data['total_enrollments'] == 1  # promoted from the waitlist by the larger capacity
+        assert [(message['event'], message['enrolled'], message['capacity']) for message in pushed] == [
+            (event.id, 1, 6),
+        ]
+
+
+@pytest.mark.django_db(transaction=True)  # the stream closes its connection like a finished request
+class TestSeatStream:
+    @staticmethod
+    def token(user):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        return str(RefreshToken.for_user(user).access_token)
+
+    @staticmethod
+    async def connect(path, token=None, query=b'', method='GET', headers=()):
+        """Run the ASGI app on a request; returns (task, client messages, server messages)"""
+        import asyncio
+        from events_platform.asgi import application
+
+        headers = [*headers, *([(b'authorization', f'Bearer {token}'.encode())] if token else [])]
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': headers}
+        received, sent = asyncio.Queue(), asyncio.Queue()
+        await received.put({'type': 'http.request', 'body': b'', 'more_body': False})
+        task = asyncio.ensure_future(application(scope, received.get, sent.put))
+        return task, received, sent
+
+    @staticmethod
+    async def next_seats(sent, timeout=2):
+        """The next seat count the stream sends"""
+        import asyncio
+        import json
+
+        while True:
+            message = await asyncio.wait_for(sent.get(), timeout)
+            if message['type'] == 'http.response.body' and message['body'].startswith(b'event: seats'):
+                return json.loads(message['body'].split(b'data: ', 1)[1])
+
+    def test_stream_pushes_coalesced_seat_counts(self, api_client, monkeypatch, seeker_user, sample_event):
+        import asyncio
+        from asgiref.sync import async_to_sync, sync_to_async
+        from events import seats
+
+        monkeypatch.setattr(seats, 'INTERVAL', 0.2)
+        api_client.force_authenticate(user=seeker_user)
+
+        async def scenario():
+            task, received, sent = await self.connect(
+                f'/api/events/{sample_event.id}/seats/stream', self.token(seeker_user)
+            )
+            first = await self.next_seats(sent)
+            assert (first['enrolled'], first['available_seats']) == (0, 10)
+
+            response = await sync_to_async(api_client.post)(
+                '/api/seeker/enroll', {'event_id': sample_event.id}, format='json'
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert (await self.next_seats(sent))['enrolled'] == 1
+
+            # Changes within INTERVAL of the last update collapse into the newest one
+            for enrolled in range(2, 7):
+                seats.deliver({**first, 'enrolled': enrolled, 'at': first['at'] + enrolled})
+            assert (await self.next_seats(sent))['enrolled'] == 6
+            await asyncio.sleep(0.3)
+            assert sent.empty()
+
+            await received.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(task, 2)
+            assert sample_event.id not in seats.get_feed().watchers
+
+        async_to_sync(scenario)()
+
+    @classmethod
+    async def start_of(cls, path, **request):
+        """The response start the ASGI app sends for a request"""
+        import asyncio
+
+        task, received, sent = await cls.connect(path, **request)
+        start = await asyncio.wait_for(sent.get(), 2)
+        if not task.done():
+            await received.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(task, 2)
+        return start
+
+    def test_stream_requires_token_and_event(self, seeker_user, sample_event):
+        from asgiref.sync import async_to_sync
+
+        async def status_of(path, **credentials):
+            return (await self.start_of(path, **credentials))['status']
+
+        async def scenario():
+            token = self.token(seeker_user)
+            path = f'/api/events/{sample_event.id}/seats/stream'
+            assert await status_of(path) == 401
+            assert await status_of(path, token='not-a-token') == 401
+            assert await status_of(f'/api/events/{sample_event.id + 1}/seats/stream', token=token) == 404
+            assert await status_of(path, query=f'token={token}'.encode()) == 401  # access tokens stay out of URLs
+
+        async_to_sync(scenario)()
+
+    def test_stream_tickets_are_single_use(self, api_client, seeker_user, sample_event, settings):
+        """Test that a ticket opens only its event's stream, once, before it expires"""
+        from asgiref.sync import async_to_sync
+        from django.core.cache import cache
+        from events import seats
+
+        settings.SEAT_STREAM_TICKET_SECONDS = 30
+        api_client.force_authenticate(user=seeker_user)
+        path = f'/api/events/{sample_event.id}/seats/stream'
+
+        def ticket(event_id=sample_event.id):
+            response = api_client.post(f'/api/events/{event_id}/seats/ticket/')
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.data['expires_in'] == 30
+            return f'ticket={response.data["ticket"]}'.encode()
+
+        async def status_of(path, query):
+            return (await self.start_of(path, query=query))['status']
+
+        first = ticket()
+        assert async_to_sync(status_of)(path, first) == 200
+        assert async_to_sync(status_of)(path, first) == 401
+
+        other_event = ticket()
+        assert async_to_sync(status_of)(f'/api/events/{sample_event.id + 1}/seats/stream', other_event) == 401
+        assert async_to_sync(status_of)(path, other_event) == 401  # used up by the wrong event
+
+        expired = ticket()
+        cache.delete(seats.TICKET_KEY.format(expired.decode().split('=', 1)[1]))
+        assert async_to_sync(status_of)(path, expired) == 401
+
+        assert api_client.post(f'/api/events/{sample_event.id + 1}/seats/ticket/').status_code == 404
+
+    def test_stream_answers_cors(self, seeker_user, sample_event, settings):
+        """Test that allowed origins get CORS headers and preflights, like the API behind CorsMiddleware"""
+        from asgiref.sync import async_to_sync
+
+        settings.CORS_ALLOWED_ORIGINS = ['https://app.example.com']
+        path = f'/api/events/{sample_event.id}/seats/stream'
+        token = self.token(seeker_user)
+
+        def headers_of(origin, **request):
+            start = async_to_sync(self.start_of)(path, headers=[(b'origin', origin)], **request)
+            return start['status'], dict(start['headers'])
+
+        code, headers = headers_of(b'https://app.example.com', token=token)
+        assert code == 200
+        assert headers[b'access-control-allow-origin'] == b'https://app.example.com'
+        assert headers[b'access-control-allow-credentials'] == b'true'
+        assert headers[b'vary'] == b'origin'
+
+        code, headers = headers_of(b'https://app.example.com')
+        assert code == 401 and headers[b'access-control-allow-origin'] == b'https://app.example.com'
+
+        code, headers = headers_of(b'https://evil.example.com', token=token)
+        assert code == 200 and b'access-control-allow-origin' not in headers
+
+        code, headers = headers_of(b'https://app.example.com', method='OPTIONS')
+        assert code == 200
+        assert b'authorization' in headers[b'access-control-allow-headers']
+        assert headers[b'access-control-allow-methods'] == b'GET, OPTIONS'
+        assert headers_of(b'https://evil.example.com', method='OPTIONS')[0] == 405
+
+
+@pytest.mark.django_db
+class TestAsyncReadPath:
+    @staticmethod
+    def authenticate(api_client, user):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        token = RefreshToken.for_user(user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_async_search_matches_sync(self, api_client, seeker_user, sample_event):
+        """Test that async search returns the same payload as the sync view"""
+        Enrollment.objects.create(event=sample_event, seeker=seeker_user)
+        self.authenticate(api_client, seeker_user)
+
+        sync_response = api_client.get('/api/events/search/?location=Test')
+        async_response = api_client.get('/api/async/events/search/?location=Test')
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.json()['count'] == sync_response.data['count'] == 1
+        assert async_response.json()['results'] == sync_response.json()['results']
+        assert async_response.json()['results'][0]['total_enrollments'] == 1
+
+    def test_async_event_detail(self, api_client, seeker_user, sample_event):
+        """Test async event detail and missing event"""
+        self.authenticate(api_client, seeker_user)
+
+        response = api_client.get(f'/api/async/events/{sample_event.id}/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == api_client.get(f'/api/events/{sample_event.id}/').json()
+
+        response = api_client.get(f'/api/async/events/{sample_event.id + 1000}/')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_async_my_enrollments(self, api_client, seeker_user, sample_event):
+        """Test async seeker enrollments listing"""
+        Enrollment.objects.create(event=sample_event, seeker=seeker_user)
+        self.authenticate(api_client, seeker_user)
+
+        response = api_client.get('/api/async/seeker/enrollments?type=upcoming')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 1
+        assert response.json()['results'][0]['event_details']['total_enrollments'] == 1
+
+    def test_async_views_require_auth_and_role(self, api_client, facilitator_user):
+        """Test that async views enforce authentication and permissions"""
+        response = api_client.get('/api/async/events/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        self.authenticate(api_client, facilitator_user)
+        response = api_client.get('/api/async/seeker/enrollments')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestReplicaRouting:
+    @staticmethod
+    def create_replica_only_event(alias, facilitator):
+        """Simulate replica state that differs from the primary"""
+        replica_facilitator = User.objects.using(alias).create(
+            id=facilitator.id,
+            username=facilitator.username,
+            email=facilitator.email,
+        )
+        Event.objects.using(alias).create(
+            title='Replica Event',
+            description='Only on the replica',
+            language='English',
+            location='Replica',
+            starts_at=timezone.now() + timedelta(days=3),
+            ends_at=timezone.now() + timedelta(days=3, hours=2),
+            created_by=replica_facilitator,
+        )
+
+    def test_reads_go_to_replica(self, api_client, replica_db, seeker_user, sample_event):
+        """Test that safe requests are served from the replica"""
+        self.create_replica_only_event(replica_db, sample_event.created_by)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.get('/api/events/search/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [event['title'] for event in response.data['results']] == ['Replica Event']
+
+    def test_client_pinned_to_primary_after_write(self, api_client, replica_db, seeker_user, sample_event):
+        """Test read-your-writes after an enrollment"""
+        self.create_replica_only_event(replica_db, sample_event.created_by)
+        api_client.force_authenticate(user=seeker_user)
+
+        response = api_client.post('/api/seeker/enroll', {'event_id': sample_event.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = api_client.get('/api/events/search/')
+        assert [event['title'] for event in response.data['results']] == ['Test Event']
+        assert response.data['results'][0]['total_enrollments'] == 1
+
+    def test_pin_window_is_configurable(self, api_client, replica_db, settings, seeker_user, sample_event):
+        """Test that reads return to the replica once the pin window is over"""
+        settings.DATABASE_REPLICA_PIN_SECONDS = 0
+        self.create_replica_only_event(replica_db, sample_event.created_by)
+        api_client.force_authenticate(user=seeker_user)
+
+        api_client.post('/api/seeker/enroll', {'event_id': sample_event.id}, format='json')
+
+        response = api_client.get('/api/events/search/')
+        assert [event['title'] for event in response.data['results']] == ['Replica Event']
+
+    def test_cached_detail_is_built_from_primary(
+        self, api_client, replica_db, seeker_user, sample_event, django_capture_on_commit_callbacks
+    ):
+        """Test that a lagging replica's detail is never cached, not even for pinned clients"""
+        from events_platform import tiered
+
+        tiered.clear_local()
+        replica_facilitator = User.objects.using(replica_db).create(
+            id=sample_event.created_by.id, username=sample_event.created_by.username,
+        )
+        # bulk_create: save() validates the id as unique against the primary
+        Event.objects.using(replica_db).bulk_create([Event(
+            id=sample_event.id,
+            title='Lagging Replica Copy',
+            description=sample_event.description,
+            language=sample_event.language,
+            location=sample_event.location,
+            starts_at=sample_event.starts_at,
+            ends_at=sample_event.ends_at,
+            created_by=replica_facilitator,
+        )])
+        api_client.force_authenticate(user=seeker_user)
+        url = f'/api/events/{sample_event.id}/'
+        other_client = {'REMOTE_ADDR': '10.0.0.2'}
+
+        assert api_client.get(url, **other_client).data['title'] == 'Test Event'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/api/seeker/enroll', {'event_id': sample_event.id}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        # An unpinned client rebuilds the detail; the pinned one then gets that copy
+        assert api_client.get(url, **other_client).data['total_enrollments'] == 1
+        response = api_client.get(url)
+        assert response.data['title'] == 'Test Event'
+        assert response.data['total_enrollments'] == 1
+
+    def test_reads_outside_requests_use_primary(self, replica_db):
+        """Test that background code (tasks, commands) reads from the primary"""
+        from events_platform.db_router import PrimaryReplicaRouter
+
+        assert PrimaryReplicaRouter().db_for_read(Event) == 'default'
+
+
+@pytest.mark.django_db
+class TestSeedPlatform:
+    def seed(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command('seed_platform', users=50, events=10, stdout=StringIO(), **options)
+
+    def test_seeds_users_events_and_enrollments(self):
+        """Test that every seeded user has a profile and every event its planned enrollments"""
+        self.seed(enrollments_per_event='fixed:5', facilitator_ratio=0.1)
+
+        assert User.objects.count() == UserProfile.objects.count() == 50
+        assert UserProfile.objects.filter(role=UserRole.FACILITATOR).count() == 5
+        assert Event.objects.count() == 10
+        assert Enrollment.objects.count() == 50
+        assert not Enrollment.objects.exclude(seeker__profile__role=UserRole.SEEKER).exists()
+        assert User.objects.first().check_password('SeedPass123!')
+
+    def test_seed_is_deterministic(self):
+        """Test that the same seed produces the same data and cannot be loaded twice"""
+        from django.core.management.base import CommandError
+
+        def snapshot():
+            return [
+                (event.title, event.language, event.location, event.enrollments.count())
+                for event in Event.objects.order_by('id')
+            ]
+
+        self.seed(enrollments_per_event='zipf:1.0:20', seed=7)
+        first = snapshot()
+        assert sorted(count for *_, count in first) == [2, 2, 2, 2, 3, 4, 5, 6, 10, 20]
+
+        with pytest.raises(CommandError):
+            self.seed(enrollments_per_event='zipf:1.0:20', seed=7)
+
+        User.objects.all().delete()
+        self.seed(enrollments_per_event='zipf:1.0:20', seed=7)
+        assert snapshot() == first
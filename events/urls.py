@@ -4,14 +4,17 @@ URL configuration for events app.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from events_platform import query_budgets
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'events', views.EventViewSet, basename='event')
+router.register(r'series', views.EventSeriesViewSet, basename='series')
 
 urlpatterns = [
     # Event search
     path('events/search/', views.search_events, name='event-search'),
+    path('events/autocomplete', views.autocomplete_events, name='event-autocomplete'),
 
     # Event CRUD (REST)
     path('', include(router.urls)),
@@ -20,7 +23,36 @@ urlpatterns = [
     path('seeker/enroll', views.enroll_event, name='seeker-enroll'),
     path('seeker/enrollments', views.my_enrollments, name='seeker-enrollments'),
     path('seeker/enrollments/<int:enrollment_id>/cancel', views.cancel_enrollment, name='cancel-enrollment'),
+    path('seeker/conflicts', views.my_conflicts, name='seeker-conflicts'),
     
     # Facilitator endpoints
     path('facilitator/events', views.my_events, name='facilitator-events'),
+
+    # Async read path (served by uvicorn workers)
+    path('async/events/search/', async_views.search_events, name='async-event-search'),
+    path('async/events/', async_views.event_list, name='async-event-list'),
+    path('async/events/<int:pk>/', async_views.event_detail, name='async-event-detail'),
+    path('async/seeker/enrollments', async_views.my_enrollments, name='async-seeker-enrollments'),
 ]
+
+# Maximum queries per request; must not grow with page size (see events_platform.query_budgets)
+query_budgets.declare({
+    'api-root': 1,
+    'event-search': 6,
+    'event-autocomplete': 1,
+    'event-list': 7,
+    'event-detail': 6,
+    'event-seats-ticket': 2,
+    'series-list': 4,
+    'series-detail': 8,
+    'series-materialize': 13,
+    'seeker-enroll': 23,
+    'seeker-enrollments': 5,
+    'seeker-conflicts': 3,
+    'cancel-enrollment': 10,
+    'facilitator-events': 4,
+    'async-event-search': 6,
+    'async-event-list': 5,
+    'async-event-detail': 2,
+    'async-seeker-enrollments': 3,
+})
@@ -3,17 +3,28 @@ Views for the events app.
 """
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from accounts.permissions import IsSeekerUser, IsFacilitatorUser
-from .models import Event, Enrollment, EnrollmentStatus
+from events_platform.idempotency import idempotent
+from events_platform.throttling import TokenBucketThrottle
+from . import autocomplete, detail, seats, waitlist
+from .conflicts import find_conflicts, schedule_conflicts
+from .facets import cached_facets, count_facets, parse_facets
+from .filters import filter_events, ordering
+from .models import Event, EventSeries, Enrollment, EnrollmentStatus
 from .serializers import (
-    EventSerializer, EventListSerializer, EnrollmentSerializer,
-    EnrollmentCreateSerializer, FacilitatorEventSerializer
+    EventSerializer, EventListSerializer, EventSeriesSerializer, EnrollmentSerializer,
+    EnrollmentCreateSerializer, EventPeriodSerializer, FacilitatorEventSerializer, ScheduleConflictSerializer
 )
+from .series import EventsWithOccurrences, expand_occurrences, expansion_window
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -24,38 +35,11 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter events based on search parameters"""
-        queryset = Event.objects.all()
+        params = self.request.query_params
+        queryset = filter_events(Event.objects.with_enrollment_stats(), params)
         
-        # Search filters
-        location = self.request.query_params.get('location', None)
-        language = self.request.query_params.get('language', None)
-        starts_after = self.request.query_params.get('starts_after', None)
-        starts_before = self.request.query_params.get('starts_before', None)
-        q = self.request.query_params.get('q', None)
-        
-        # Filter by location
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        
-        # Filter by language
-        if language:
-            queryset = queryset.filter(language__icontains=language)
-        
-        # Filter by start date range
-        if starts_after:
-            queryset = queryset.filter(starts_at__gte=starts_after)
-        
-        if starts_before:
-            queryset = queryset.filter(starts_at__lte=starts_before)
-        
-        # Search in title and description
-        if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) | Q(description__icontains=q)
-            )
-        
-        # Default ordering - upcoming events first
-        queryset = queryset.order_by('starts_at')
+        # Default ordering - upcoming events first (or nearest first with ordering=distance)
+        queryset = queryset.order_by(*ordering(params))
         
         return queryset
 
@@ -65,6 +49,23 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventListSerializer
         return EventSerializer
 
+    def list(self, request, *args, **kwargs):
+        """List events merged with the upcoming occurrences of matching series"""
+        params = request.query_params
+        occurrences = expand_occurrences(params, *expansion_window(params, timezone.now()))
+        page = self.paginate_queryset(EventsWithOccurrences(self.get_queryset(), occurrences, ordering(params)))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Event details, cached per event; filtered lookups (?location= etc.) are not cached"""
+        if request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+
+        def build():
+            return super(EventViewSet, self).retrieve(request, *args, **kwargs).data
+        return Response(detail.cached(kwargs[self.lookup_field], build))
+
     def get_permissions(self):
         """Set permissions based on action"""
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -75,6 +76,14 @@ class EventViewSet(viewsets.ModelViewSet):
         """Set the creator as current user"""
         serializer.save(created_by=self.request.user)
 
+    def perform_update(self, serializer):
+        """Fill the seats a larger capacity opens up from the waitlist"""
+        capacity = serializer.instance.capacity
+        event = serializer.save()
+        if capacity is not None and (event.capacity is None or event.capacity > capacity):
+            with transaction.atomic():
+                waitlist.promote(event)
+
     def update(self, request, *args, **kwargs):
         """Only allow creator to update"""
         instance = self.get_object()
@@ -95,6 +104,100 @@ class EventViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=True, methods=['post'], url_path='seats/ticket')
+    def seats_ticket(self, request, pk=None):
+        """
+        Single-use ticket for the event's seat stream, for clients that cannot send the
+        Authorization header (the browser EventSource API)
+        POST /api/events/{id}/seats/ticket/
+        Then: GET /api/events/{id}/seats/stream?ticket=
+        """
+        event = self.get_object()
+        return Response({
+            'ticket': seats.issue_ticket(request.user, event.pk),
+            'expires_in': settings.SEAT_STREAM_TICKET_SECONDS,
+        }, status=status.HTTP_201_CREATED)
+
+
+class EventSeriesViewSet(viewsets.ModelViewSet):
+    """ViewSet for recurring event series"""
+    queryset = EventSeries.objects.select_related('created_by').order_by('starts_at')
+    serializer_class = EventSeriesSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        """Set permissions based on action"""
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'materialize']:
+            return [IsAuthenticated(), IsFacilitatorUser()]
+        return [IsAuthenticated()]
+
+    def check_creator(self, series):
+        if series.created_by_id != self.request.user.pk:
+            return Response({
+                'detail': 'You do not have permission to edit this series',
+                'code': 'permission_denied'
+            }, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def perform_create(self, serializer):
+        """Set the creator as current user"""
+        serializer.save(created_by=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """Only allow creator to update"""
+        return self.check_creator(self.get_object()) or super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        """Carry the shared fields over to occurrences that were already materialized and have not started"""
+        capacity = serializer.instance.capacity
+        series = serializer.save()
+        now = timezone.now()
+        upcoming = series.events.filter(starts_at__gt=now)
+        upcoming.update(
+            title=series.title, description=series.description, language=series.language,
+            location=series.location, capacity=series.capacity, latitude=series.latitude,
+            longitude=series.longitude, geohash=series.geohash, updated_at=now,
+        )
+        # Fill the seats a larger capacity opens up from the occurrences' waitlists
+        if capacity is not None and (series.capacity is None or series.capacity > capacity):
+            for event in upcoming.filter(enrollments__status=EnrollmentStatus.WAITLISTED).distinct():
+                with transaction.atomic():
+                    waitlist.promote(event)
+        # update() sends no post_save, so the autocomplete index, cached details and seat streams are told directly
+        for event in upcoming.with_enrollment_stats():
+            autocomplete.publish_change(
+                event.pk, [event.starts_at.timestamp(), series.title, series.location, series.language]
+            )
+            seats.publish(event)
+            detail.expire(event.pk)
+
+    def destroy(self, request, *args, **kwargs):
+        """Only allow creator to delete; materialized occurrences stay as standalone events"""
+        return self.check_creator(self.get_object()) or super().destroy(request, *args, **kwargs)
+
+    @action(detail=True, methods=['post'])
+    def materialize(self, request, pk=None):
+        """
+        Turn one occurrence into an Event so it can be edited on its own
+        POST /api/series/{id}/materialize
+        Body: {starts_at}
+        """
+        series = self.get_object()
+        denied = self.check_creator(series)
+        if denied:
+            return denied
+
+        starts_at = EnrollmentCreateSerializer().fields['starts_at'].run_validation(request.data.get('starts_at'))
+        if not series.has_occurrence(starts_at):
+            return Response({
+                'detail': 'Occurrence not found',
+                'code': 'event_not_found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        event = series.materialize(starts_at)
+        event = Event.objects.with_enrollment_stats().get(pk=event.pk)
+        return Response(EventSerializer(event).data, status=status.HTTP_201_CREATED)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsFacilitatorUser])
@@ -103,7 +206,7 @@ def my_events(request):
     List facilitator's own events with enrollment counts
     GET /api/facilitator/events
     """
-    events = Event.objects.filter(created_by=request.user).order_by('-created_at')
+    events = Event.objects.with_enrollment_stats().filter(created_by=request.user).order_by('-created_at')
     serializer = FacilitatorEventSerializer(events, many=True)
     
     return Response({
@@ -112,13 +215,16 @@ def my_events(request):
     }, status=status.HTTP_200_OK)
 
 
+@idempotent(per_user=True)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsSeekerUser])
+@throttle_classes([TokenBucketThrottle])
 def enroll_event(request):
     """
-    Enroll in an event
+    Enroll in an event, or join its waitlist when it is full and waitlist is true
     POST /api/seeker/enroll
-    Body: {event_id}
+    Body: {event_id} or {series_id, starts_at}, optionally {waitlist}
+    Header: optionally Idempotency-Key (a retry with the same key gets the first response)
     """
     serializer = EnrollmentCreateSerializer(data=request.data)
     
@@ -141,32 +247,60 @@ def enroll_event(request):
     event_id = serializer.validated_data['event_id']
     
     try:
-        event = Event.objects.get(id=event_id)
+        # A series occurrence without its Event row yet gets one with the enrollment
+        event = serializer.event if event_id is None else Event.objects.get(id=event_id)
         
-        # Check if already enrolled
-        existing_enrollment = Enrollment.objects.filter(
+        # Check if already enrolled or waitlisted
+        existing_enrollment = None if event.pk is None else Enrollment.objects.filter(
             event=event,
             seeker=request.user,
-            status=EnrollmentStatus.ENROLLED
+            status__in=[EnrollmentStatus.ENROLLED, EnrollmentStatus.WAITLISTED]
         ).first()
         
+        if existing_enrollment and existing_enrollment.status == EnrollmentStatus.WAITLISTED:
+            return Response({
+                'detail': 'Already on the waitlist of this event',
+                'code': 'already_waitlisted'
+            }, status=status.HTTP_400_BAD_REQUEST)
         if existing_enrollment:
             return Response({
                 'detail': 'Already enrolled in this event',
                 'code': 'already_enrolled'
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Check for overlapping enrollments
+        conflicts = EventPeriodSerializer(find_conflicts(request.user, event), many=True).data
+        if conflicts and settings.ENROLLMENT_CONFLICT_POLICY == 'reject':
+            return Response({
+                'detail': 'Event overlaps events you are enrolled in',
+                'code': 'schedule_conflict',
+                'conflicts': conflicts
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create enrollment
-        enrollment = Enrollment.objects.create(
-            event=event,
-            seeker=request.user,
-            status=EnrollmentStatus.ENROLLED
-        )
-        
-        return Response(
-            EnrollmentSerializer(enrollment).data,
-            status=status.HTTP_201_CREATED
-        )
+        # Create enrollment (and the occurrence's Event, so a failure leaves neither behind)
+        with transaction.atomic():
+            if event.pk is None:
+                event = event.series.materialize(event.starts_at)
+            if serializer.validated_data['waitlisted']:
+                enrollment = waitlist.join(event, request.user)
+            else:
+                enrollment = Enrollment.objects.create(
+                    event=event,
+                    seeker=request.user,
+                    status=EnrollmentStatus.ENROLLED
+                )
+        # Reload the event with its creator and the new enrollment count in one query
+        enrollment.event = Event.objects.with_enrollment_stats().get(pk=event.pk)
+
+        data = EnrollmentSerializer(enrollment).data
+        if enrollment.status == EnrollmentStatus.WAITLISTED:
+            data['waitlist_place'] = waitlist.place(enrollment)
+        else:
+            seats.publish(enrollment.event)
+            detail.expire(event.pk)
+        if conflicts:
+            data['conflicts'] = conflicts
+        return Response(data, status=status.HTTP_201_CREATED)
         
     except Event.DoesNotExist:
         return Response({
@@ -184,23 +318,37 @@ def enroll_event(request):
 @permission_classes([IsAuthenticated, IsSeekerUser])
 def cancel_enrollment(request, enrollment_id):
     """
-    Cancel an enrollment
+    Cancel an enrollment (or leave a waitlist); a freed seat goes to the head of the waitlist
     POST /api/seeker/enrollments/{id}/cancel
     """
     try:
-        enrollment = Enrollment.objects.get(
-            id=enrollment_id,
-            seeker=request.user
-        )
-        
-        if enrollment.status == EnrollmentStatus.CANCELED:
-            return Response({
-                'detail': 'Enrollment already canceled',
-                'code': 'already_canceled'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        enrollment.status = EnrollmentStatus.CANCELED
-        enrollment.save()
+        with transaction.atomic():
+            # Locked so that two cancels of the same enrollment cannot both free its seat
+            enrollment = Enrollment.objects.select_for_update(of=('self',)).select_related('event', 'seeker').get(
+                id=enrollment_id,
+                seeker=request.user
+            )
+            
+            if enrollment.status == EnrollmentStatus.CANCELED:
+                return Response({
+                    'detail': 'Enrollment already canceled',
+                    'code': 'already_canceled'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            freed_seat = enrollment.status == EnrollmentStatus.ENROLLED
+            enrollment.status = EnrollmentStatus.CANCELED
+            enrollment.position = None
+            enrollment.updated_at = timezone.now()
+            # The row is locked and only its status changes: skip save()'s full_clean queries
+            Enrollment.objects.filter(pk=enrollment.pk).update(
+                status=enrollment.status, position=None, updated_at=enrollment.updated_at
+            )
+            if freed_seat:
+                waitlist.promote(enrollment.event)
+        enrollment.event = Event.objects.with_enrollment_stats().get(pk=enrollment.event_id)
+        if freed_seat:
+            seats.publish(enrollment.event)
+            detail.expire(enrollment.event_id)
         
         return Response(
             EnrollmentSerializer(enrollment).data,
@@ -218,15 +366,17 @@ def cancel_enrollment(request, enrollment_id):
 @permission_classes([IsAuthenticated, IsSeekerUser])
 def my_enrollments(request):
     """
-    List seeker's enrollments
-    GET /api/seeker/enrollments?type=upcoming|past
+    List seeker's enrollments, or the waitlists they are on
+    GET /api/seeker/enrollments?type=upcoming|past|waitlisted
     """
     enrollment_type = request.query_params.get('type', 'all')
     
     enrollments = Enrollment.objects.filter(
         seeker=request.user,
-        status=EnrollmentStatus.ENROLLED
-    ).select_related('event')
+        status=EnrollmentStatus.WAITLISTED if enrollment_type == 'waitlisted' else EnrollmentStatus.ENROLLED
+    ).select_related('seeker').prefetch_related(
+        Prefetch('event', queryset=Event.objects.with_enrollment_stats())
+    )
     
     # Filter by type
     if enrollment_type == 'upcoming':
@@ -244,51 +394,76 @@ def my_enrollments(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def autocomplete_events(request):
+    """
+    Suggest titles, locations and languages of upcoming events with a word starting with the prefix
+    GET /api/events/autocomplete?prefix=&limit=
+    """
+    try:
+        limit = int(request.query_params.get('limit') or autocomplete.DEFAULT_LIMIT)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= autocomplete.MAX_LIMIT:
+        raise ParseError(f'limit must be a whole number from 1 to {autocomplete.MAX_LIMIT}')
+
+    prefix = request.query_params.get('prefix', '')
+    return Response({
+        'prefix': prefix,
+        'results': autocomplete.get_index().suggest(prefix, limit),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsSeekerUser])
+def my_conflicts(request):
+    """
+    List pairs of enrolled events that overlap (events that have not ended)
+    GET /api/seeker/conflicts
+    """
+    conflicts = [
+        {'event': event, 'conflicts_with': earlier}
+        for earlier, event in schedule_conflicts(request.user)
+    ]
+    serializer = ScheduleConflictSerializer(conflicts, many=True)
+
+    return Response({
+        'count': len(conflicts),
+        'results': serializer.data
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def search_events(request):
     """
     Search events with filters
-    GET /api/events/search?location=&language=&starts_after=&starts_before=&q=
+    GET /api/events/search?location=&language=&starts_after=&starts_before=&q=&lat=&lng=&radius_km=&ordering=distance
+        &facets=language,location,date
     """
-    queryset = Event.objects.all()
-    
-    # Search filters
-    location = request.query_params.get('location')
-    language = request.query_params.get('language')
-    starts_after = request.query_params.get('starts_after')
-    starts_before = request.query_params.get('starts_before')
-    q = request.query_params.get('q')
-    
-    # Apply filters
-    if location:
-        queryset = queryset.filter(location__icontains=location)
-    
-    if language:
-        queryset = queryset.filter(language__icontains=language)
-    
-    if starts_after:
-        queryset = queryset.filter(starts_at__gte=starts_after)
-    
-    if starts_before:
-        queryset = queryset.filter(starts_at__lte=starts_before)
-    
-    if q:
-        queryset = queryset.filter(
-            Q(title__icontains=q) | Q(description__icontains=q)
-        )
+    params = request.query_params
+    facet_names = parse_facets(params)
+    matching = filter_events(Event.objects.all(), params)
     
     # Default filter - only upcoming events
-    queryset = queryset.filter(starts_at__gte=timezone.now())
+    matching = matching.filter(starts_at__gte=timezone.now())
     
-    # Order by start date (upcoming first)
-    queryset = queryset.order_by('starts_at')
+    # Order by start date (upcoming first), or nearest first with ordering=distance
+    queryset = matching.with_enrollment_stats().order_by(*ordering(params))
+
+    # Upcoming occurrences of matching series, merged in the same order
+    occurrences = expand_occurrences(params, *expansion_window(params, timezone.now()))
     
     # Pagination
-    from rest_framework.pagination import PageNumberPagination
     paginator = PageNumberPagination()
-    page = paginator.paginate_queryset(queryset, request)
+    page = paginator.paginate_queryset(EventsWithOccurrences(queryset, occurrences, ordering(params)), request)
     
     serializer = EventListSerializer(page, many=True)
     
-    return paginator.get_paginated_response(serializer.data)
+    response = paginator.get_paginated_response(serializer.data)
+    if facet_names:
+        response.data['facets'] = cached_facets(
+            params, facet_names, lambda: count_facets(matching, facet_names, occurrences)
+        )
+    return response
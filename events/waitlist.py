@@ -0,0 +1,107 @@
+"""
+Event waitlists with promotion into freed seats.
+
+A seeker enrolling in a full event with "waitlist": true gets a WAITLISTED
+enrollment instead of an event_full error. Its `position` comes from one
+database sequence, so positions only grow and the queue of an event is its
+waitlisted enrollments by position (the partial index on (event, position)).
+
+When a seat frees up (a cancellation, a larger capacity) promote() moves
+the head of the queue into it, in the same transaction. The head is
+selected FOR UPDATE SKIP LOCKED: cancellations running at the same time
+each lock a different waitlisted seeker instead of waiting on, or both
+promoting, the same one. Free seats are counted inside that transaction,
+so a seat is never filled twice.
+
+Promoted seekers are emailed in batches: the first promotion schedules
+send_waitlist_promotion_emails WAITLIST_NOTIFY_BATCH_SECONDS ahead, later
+ones join that run, and the periodic run picks up any promotion whose task
+was lost.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+from .models import Enrollment, EnrollmentStatus
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_KEY = 'events:waitlist:notify'
+
+
+def next_position(using='default'):
+    """A waitlist position larger than every one handed out before"""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval('enrollments_position_seq')")
+            return cursor.fetchone()[0]
+    # No sequence outside Postgres (single-process development databases)
+    return (Enrollment.objects.using(using).aggregate(Max('position'))['position__max'] or 0) + 1
+
+
+def join(event, seeker):
+    """Put the seeker at the end of the event's waitlist"""
+    return Enrollment.objects.create(
+        event=event,
+        seeker=seeker,
+        status=EnrollmentStatus.WAITLISTED,
+        position=next_position(),
+    )
+
+
+def place(enrollment):
+    """1-based place of a waitlisted enrollment in its event's queue"""
+    return Enrollment.objects.filter(
+        event_id=enrollment.event_id,
+        status=EnrollmentStatus.WAITLISTED,
+        position__lt=enrollment.position,
+    ).count() + 1
+
+
+def promote(event):
+    """
+    Enroll waitlisted seekers into the event's free seats, head of the queue first.
+
+    Must run inside the transaction that freed the seats. Returns the ids of
+    the promoted enrollments.
+    """
+    if event.capacity is None:
+        free = None  # no limit any more: the whole queue
+    else:
+        free = event.capacity - Enrollment.objects.filter(event=event, status=EnrollmentStatus.ENROLLED).count()
+        if free <= 0:
+            return []
+    heads = list(
+        Enrollment.objects.select_for_update(skip_locked=True)
+        .filter(event=event, status=EnrollmentStatus.WAITLISTED)
+        .order_by('position')
+        .values_list('pk', flat=True)[:free]
+    )
+    if heads:
+        now = timezone.now()
+        Enrollment.objects.filter(pk__in=heads).update(
+            status=EnrollmentStatus.ENROLLED, position=None, promoted_at=now, updated_at=now,
+        )
+        transaction.on_commit(schedule_notifications)
+    return heads
+
+
+def schedule_notifications():
+    """Queue one batched email run for the promotions of the next few seconds"""
+    from .tasks import send_waitlist_promotion_emails
+
+    delay = settings.WAITLIST_NOTIFY_BATCH_SECONDS
+    # The run clears the key first; it expires anyway should the task be lost
+    if not cache.add(NOTIFY_KEY, 1, delay + 60):
+        return
+    try:
+        send_waitlist_promotion_emails.apply_async(countdown=delay)
+    except OperationalError as exc:
+        cache.delete(NOTIFY_KEY)
+        logger.warning('Could not queue waitlist promotion emails, left for the periodic run: %s', exc)
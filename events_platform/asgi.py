@@ -1,5 +1,7 @@
 """
 ASGI config for events_platform project.
+
+Live seat count streams (events.seats) are served in front of Django.
 """
 
 import os
@@ -8,4 +10,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from events.seats import with_seat_streams  # noqa: E402 (needs the app registry loaded above)
+
+application = with_seat_streams(django_application)
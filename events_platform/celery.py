@@ -4,10 +4,17 @@ Celery configuration for events_platform project.
 
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
-# Set the default Django settings module
+# Set the default Django settings module (before importing anything that reads settings)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_platform.settings')
 
+from events_platform import metrics  # noqa: E402,F401 (registers task metrics signal handlers)
+
+# Celery runs Django's system checks when a worker starts, which imports the URLconf and
+# with it every view, the admin and the API docs. Checks run in CI and on the web tier.
+os.environ.setdefault('CELERY_SKIP_CHECKS', 'true')
+
 app = Celery('events_platform')
 
 # Load config from Django settings with CELERY namespace
@@ -17,6 +24,19 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
+@worker_process_init.connect
+def warm_database_pools(**kwargs):
+    """Open each prefork child's own database connections before its first task"""
+    from events_platform.db.pool import warm_pools
+    warm_pools()
+
+
+@worker_process_shutdown.connect
+def close_database_pools(**kwargs):
+    from events_platform.db.pool import close_pools
+    close_pools()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -0,0 +1,46 @@
+"""
+PostgreSQL backend that checks connections out of a per-process pool.
+
+Configure with OPTIONS['pool'] (min_size, max_size, max_lifetime, max_idle,
+timeout) and CONN_MAX_AGE = 0. Django then "closes" the connection at
+the end of every request or Celery task. That returns it to the pool
+instead of tearing down the TCP/TLS session.
+"""
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from events_platform.db.pool import ConnectionPool, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        def new_connection():
+            return super(DatabaseWrapper, self).get_new_connection(conn_params)
+
+        def factory():
+            return ConnectionPool(new_connection, **self.settings_dict['OPTIONS'].get('pool', {}))
+
+        return get_pool((self.alias, repr(sorted(conn_params.items()))), factory)
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.getconn()
+        # Same isolation level bookkeeping as the parent, for reused connections
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = IsolationLevel(options.get('isolation_level', IsolationLevel.READ_COMMITTED))
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+
+    def warm_pool(self):
+        self.get_pool(self.get_connection_params()).warmup()
@@ -0,0 +1,197 @@
+"""
+Bounded, health-checked PostgreSQL connection pool.
+
+One pool exists per process and connection settings. Pools are keyed by
+PID, so gunicorn and Celery prefork children never reuse sockets they
+inherited from their parent. Connections are recycled after
+`max_lifetime` seconds. A connection that sat idle longer than
+`max_idle` seconds is checked with `SELECT 1` before it is handed out.
+"""
+
+import collections
+import os
+import threading
+import time
+
+from django.db import connections
+from django.db.utils import OperationalError
+
+# psycopg2 TRANSACTION_STATUS_IDLE / psycopg.pq.TransactionStatus.IDLE
+TRANSACTION_STATUS_IDLE = 0
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections created by `connect()`"""
+
+    def __init__(self, connect, min_size=0, max_size=10, max_lifetime=1800, max_idle=30, timeout=10):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._idle = collections.deque()  # (connection, returned_at), most recent last
+        self._created_at = {}  # id(connection) -> creation time
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self):
+        """Number of open connections, idle or checked out"""
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def getconn(self):
+        """Check out a healthy connection, creating one if the pool is not full"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, needs_check = self._reserve(deadline)
+            if connection is None:
+                return self._create()
+            if not needs_check or self._is_healthy(connection):
+                return connection
+            self._discard(connection)
+
+    def putconn(self, connection):
+        """Return a connection, discarding it if broken, expired or mid-transaction"""
+        if os.getpid() != self.pid:
+            # Inherited across fork: the parent still owns the socket
+            return
+
+        reusable = not self._closed and not connection.closed and not self._expired(connection)
+        if reusable and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+
+        if not reusable:
+            self._discard(connection)
+            return
+
+        with self._cond:
+            self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    def warmup(self):
+        """Open connections until `min_size` are available"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            self.putconn(self._create())
+
+    def close(self):
+        """Close idle connections; checked out ones are closed when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _reserve(self, deadline):
+        """Pop an idle connection, or reserve a slot for a new one (returns None)"""
+        with self._cond:
+            while True:
+                while self._idle:
+                    connection, returned_at = self._idle.pop()
+                    if connection.closed or self._expired(connection):
+                        self._forget(connection)
+                        continue
+                    return connection, time.monotonic() - returned_at > self.max_idle
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, False
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'No database connection available within {self.timeout}s '
+                        f'(pool max_size={self.max_size})'
+                    )
+                self._cond.wait(remaining)
+
+    def _create(self):
+        try:
+            return self._open()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _open(self):
+        connection = self.connect()
+        self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _expired(self, connection):
+        created_at = self._created_at.get(id(connection))
+        return created_at is None or time.monotonic() - created_at >= self.max_lifetime
+
+    def _is_healthy(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _forget(self, connection):
+        """Drop the bookkeeping for a connection that is going away (lock held)"""
+        if self._created_at.pop(id(connection), None) is not None:
+            self._size -= 1
+            self._cond.notify()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _discard(self, connection):
+        with self._cond:
+            self._forget(connection)
+
+
+def get_pool(key, factory):
+    """Return this process's pool for `key`, creating it with `factory()`"""
+    key = (os.getpid(), key)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def warm_pools():
+    """Pre-open `min_size` connections for every pooled database alias"""
+    for connection in connections.all():
+        if hasattr(connection, 'warm_pool'):
+            connection.warm_pool()
+
+
+def close_pools():
+    """Close the current process's pools (worker shutdown)"""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [key for key in _pools if key[0] == pid]
+        for key in pools:
+            _pools.pop(key).close()
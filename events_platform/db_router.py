@@ -0,0 +1,122 @@
+"""
+Primary/replica database routing for events_platform project.
+
+Reads issued while serving a safe (GET/HEAD/OPTIONS) request go to one of
+the read replicas listed in settings.DATABASE_REPLICAS. Everything else --
+writes, unsafe requests, Celery tasks and management commands -- uses the
+primary. A client that has just written is pinned to the primary for
+settings.DATABASE_REPLICA_PIN_SECONDS so it always reads its own writes
+even while the replicas lag behind. Code building values that are cached
+for every client reads inside primary(), so a lagging replica's rows are
+never cached.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_DB_ALIAS = 'default'
+
+# True while handling a request whose reads may be served by a replica
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def primary():
+    """Read from the primary inside the block, even while serving a safe request"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def pin_cache_key(request):
+    """Identify the client by its credentials, falling back to its address"""
+    identity = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+    return 'db:primary-pin:' + hashlib.sha256(identity.encode()).hexdigest()
+
+
+class PrimaryReplicaRouter:
+    """Send replica-safe reads to a random replica and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and _use_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe requests from clients that are not pinned
+    to the primary, and pin clients after a successful write.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        token = _use_replica.set(self.replica_allowed(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        self.pin_after_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        token = _use_replica.set(await self.areplica_allowed(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        await self.apin_after_write(request, response)
+        return response
+
+    def replica_allowed(self, request):
+        return request.method in SAFE_METHODS and not cache.get(pin_cache_key(request))
+
+    async def areplica_allowed(self, request):
+        return request.method in SAFE_METHODS and not await cache.aget(pin_cache_key(request))
+
+    def should_pin(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def pin_after_write(self, request, response):
+        if self.should_pin(request, response):
+            cache.set(pin_cache_key(request), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+    async def apin_after_write(self, request, response):
+        if self.should_pin(request, response):
+            await cache.aset(pin_cache_key(request), True, settings.DATABASE_REPLICA_PIN_SECONDS)
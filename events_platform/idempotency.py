@@ -0,0 +1,123 @@
+"""
+Idempotency keys for POSTs that clients retry (the Idempotency-Key header).
+
+A mobile client that times out on POST /api/seeker/enroll or /auth/signup
+cannot tell whether the request went through, and a plain retry either runs
+everything again or fails with already_enrolled/email_exists. Sent with an
+Idempotency-Key (any unique string, e.g. a UUID per attempted action), the
+first response is stored in the cache for IDEMPOTENCY_KEY_SECONDS and every
+retry with that key gets it back, marked "Idempotent-Replayed: true", before
+authentication, throttling or any query runs.
+
+Keys are scoped per endpoint and, for authenticated endpoints, per user (the
+user id of the access token, read without a query). A key sent again with a
+different body gets 422 idempotency_key_reused. While the first request
+with a key runs it holds a lock (cache.add): a duplicate arriving meanwhile
+waits up to IDEMPOTENCY_WAIT_SECONDS for that response, then gets 409
+idempotency_key_in_progress. Server errors and 429s are not stored, so a
+retry after one runs again. Requests without the header are unaffected.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+RESPONSE_KEY = 'idempotency:{}'
+LOCK_KEY = 'idempotency:lock:{}'
+LOCK_SECONDS = 60  # a request that dies holding a key's lock blocks it at most this long
+MAX_KEY_LENGTH = 255
+POLL = 0.05
+
+
+def token_user(request):
+    """Id of the user the request's access token was issued to, without a query; None without a valid token"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
+
+
+def error_response(detail, code, status):
+    return JsonResponse({'detail': detail, 'code': code}, status=status)
+
+
+def store(name, fingerprint, response):
+    """Keep the response for retries, unless retrying should run the request again"""
+    if response.status_code >= 500 or response.status_code == 429:
+        return
+    if hasattr(response, 'render'):
+        response.render()  # DRF responses render late; rendering twice is a no-op
+    cache.set(RESPONSE_KEY.format(name), {
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'content': response.content,
+        'content_type': response['Content-Type'],
+    }, settings.IDEMPOTENCY_KEY_SECONDS)
+
+
+def replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return error_response(
+            'Idempotency-Key was already used with a different request body', 'idempotency_key_reused', 422,
+        )
+    response = HttpResponse(stored['content'], status=stored['status'], content_type=stored['content_type'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(per_user=False):
+    """
+    Decorator for a POST view (outside @api_view): a request with an
+    Idempotency-Key already seen gets the stored response instead of running.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            key = request.META.get(HEADER)
+            if not key or request.method != 'POST':
+                return view(request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return error_response(
+                    f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters', 'invalid_idempotency_key', 400,
+                )
+            owner = token_user(request) if per_user else ''
+            if owner is None:
+                return view(request, *args, **kwargs)  # no valid token: the view answers 401
+
+            name = hashlib.sha256(f'{request.path}\n{owner}\n{key}'.encode()).hexdigest()
+            fingerprint = hashlib.sha256(request.body).hexdigest()
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+            while True:
+                stored = cache.get(RESPONSE_KEY.format(name))
+                if stored is not None:
+                    return replay(stored, fingerprint)
+                # Not answered yet: run it, unless a duplicate is running (or the first failed: run again)
+                if cache.add(LOCK_KEY.format(name), 1, LOCK_SECONDS):
+                    try:
+                        response = view(request, *args, **kwargs)
+                        store(name, fingerprint, response)
+                        return response
+                    finally:
+                        cache.delete(LOCK_KEY.format(name))
+                if time.monotonic() >= deadline:
+                    return error_response(
+                        'A request with this Idempotency-Key is still in progress', 'idempotency_key_in_progress', 409,
+                    )
+                time.sleep(POLL)
+        return wrapped
+    return decorator
@@ -0,0 +1,73 @@
+"""
+Database query instrumentation shared by the metrics and timing middleware.
+
+One execute wrapper is installed on every database connection (as each one
+is opened, in whichever thread) and reports to the collectors active in the
+current context. Context variables follow a request from an async view into
+the threads sync_to_async runs its queries in, so the queries of async
+requests are counted as well as those of sync ones.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_collectors = ContextVar('query_collectors', default=())
+
+
+class QueryCollector:
+    """
+    Counts queries and their total time.
+    With `record=True` every statement and its duration is kept as well.
+    """
+
+    def __init__(self, record=False):
+        self.record = record
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []  # (sql, duration) when recording
+
+    def add(self, sql, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        if self.record:
+            self.statements.append((sql, elapsed))
+
+
+def report_queries(execute, sql, params, many, context):
+    """Execute wrapper timing each statement for the collectors of the current context"""
+    collectors = _collectors.get()
+    if not collectors:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for collector in collectors:
+            collector.add(sql, elapsed)
+
+
+def install(connection, **kwargs):
+    # First in line, so that execute_wrapper() blocks nested inside can still pop their own wrapper
+    if report_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, report_queries)
+
+
+connection_created.connect(install)
+
+
+@contextmanager
+def collect_queries(record=False):
+    """Collect the queries run on every configured database in this context"""
+    for alias in connections:  # connections this thread opened before this module was imported
+        install(connections[alias])
+    collector = QueryCollector(record=record)
+    token = _collectors.set(_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _collectors.reset(token)
@@ -0,0 +1,178 @@
+"""
+Prometheus metrics for events_platform project.
+
+Per-view request latency, DB query count, DB time and response size are
+recorded by MetricsMiddleware, keyed by resolved URL name. Two-tier cache
+lookups and evictions are counted by events_platform.tiered. Celery task
+duration and outcomes are recorded through Celery signals. With
+PROMETHEUS_MULTIPROC_DIR set (required for several gunicorn workers or
+Celery prefork children), every process writes to that directory and
+/api/metrics aggregates them.
+"""
+
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_failure, task_postrun, task_prerun, task_retry, task_success, worker_ready
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+    start_http_server,
+)
+from events_platform import query_budgets
+from events_platform.instrumentation import collect_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by view',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request by view',
+    ['view', 'method'], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request by view',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size by view',
+    ['view', 'method'], buckets=SIZE_BUCKETS,
+)
+REQUESTS = Counter(
+    'http_requests', 'Requests by view and status code',
+    ['view', 'method', 'status'],
+)
+
+CACHE_LOOKUPS = Counter(
+    'tiered_cache_lookups', 'Two-tier cache lookups by cache and the tier that answered (or miss)',
+    ['cache', 'result'],
+)
+CACHE_EVICTIONS = Counter(
+    'tiered_cache_evictions', 'In-process cache entries dropped to make room',
+    ['cache'],
+)
+
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Celery task run time',
+    ['task'], buckets=LATENCY_BUCKETS + (30.0, 60.0, 300.0),
+)
+TASKS = Counter(
+    'celery_tasks', 'Celery task outcomes',
+    ['task', 'state'],
+)
+
+
+def get_registry():
+    """Registry aggregating every process when running in multiprocess mode"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def view_label(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return 'unresolved'
+    return resolver_match.view_name or 'unnamed'
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count, DB time and response size per resolved URL name,
+    and warn about requests over their query budget
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with collect_queries() as queries:
+            response = self.get_response(request)
+        return self.record(request, response, time.perf_counter() - started, queries)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with collect_queries() as queries:
+            response = await self.get_response(request)
+        return self.record(request, response, time.perf_counter() - started, queries)
+
+    def record(self, request, response, elapsed, queries):
+        view, method = view_label(request), request.method
+        REQUEST_LATENCY.labels(view, method).observe(elapsed)
+        REQUEST_QUERIES.labels(view, method).observe(queries.count)
+        REQUEST_DB_TIME.labels(view, method).observe(queries.duration)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+        REQUESTS.labels(view, method, response.status_code).inc()
+        query_budgets.check(view, queries.count, request)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint
+    GET /api/metrics
+
+    Requires "Authorization: Bearer <METRICS_TOKEN>". Without a token it is
+    served only with DEBUG on, and is otherwise not found.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=404)
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+# Celery task metrics
+_task_started = {}
+
+
+@task_prerun.connect
+def _record_task_start(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _record_task_duration(task_id=None, task=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+
+
+@task_success.connect
+def _record_task_success(sender=None, **kwargs):
+    TASKS.labels(sender.name, 'success').inc()
+
+
+@task_failure.connect
+def _record_task_failure(sender=None, **kwargs):
+    TASKS.labels(sender.name, 'failure').inc()
+
+
+@task_retry.connect
+def _record_task_retry(sender=None, **kwargs):
+    TASKS.labels(sender.name, 'retry').inc()
+
+
+@worker_ready.connect
+def _serve_worker_metrics(**kwargs):
+    """Expose worker metrics on CELERY_METRICS_PORT when the web tier cannot scrape them"""
+    port = os.getenv('CELERY_METRICS_PORT')
+    if port:
+        start_http_server(int(port), registry=get_registry())
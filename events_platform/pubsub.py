@@ -0,0 +1,201 @@
+"""
+Publish/subscribe between processes, for keeping in-process state in sync.
+
+A process that changes shared data publishes a JSON message on a channel;
+every process subscribed to that channel gets it. With PUBSUB_REDIS_URL set,
+channels are Redis pub/sub channels and each process reads its
+subscriptions on one background thread. Otherwise messages are delivered
+in-process (development and tests, where there is only one process).
+
+Each message is tagged with the publishing process, and callbacks are not
+called for the process's own messages: the publisher has already applied
+the change before publishing it. Delivery is at most once. When the
+connection drops, the listener thread keeps reconnecting (with backoff up
+to RECONNECT_MAX_DELAY seconds) and restores every subscription; each
+subscriber's `resync()` is then called, since messages published in
+between were lost. If Redis is unreachable, publishing logs a warning and
+the message is dropped.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_origin = (None, None)
+
+LISTEN_TIMEOUT = 1  # seconds the listener waits for a message before taking new subscriptions
+RECONNECT_MAX_DELAY = 5
+
+
+def origin():
+    """Identifier of this process; forked workers get their own"""
+    global _origin
+    pid, token = _origin
+    if pid != os.getpid():
+        _origin = pid, token = os.getpid(), uuid.uuid4().hex
+    return token
+
+
+class LocalBroker:
+    """Delivers messages to subscribers in this process, synchronously"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel, callback, resync=None):
+        # Nothing is ever missed in-process, so there is nothing to resync
+        with self._lock:
+            self._subscribers.setdefault(channel, {})[callback] = None
+
+
+class RedisBroker:
+    """
+    Redis pub/sub channels, read on one daemon thread per process.
+
+    Only that thread touches the pub/sub connection: subscribe() queues new
+    channels and the thread subscribes to them between two reads.
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_connect_timeout=0.1)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._errors = (redis.RedisError,)
+        self._subscribers = {}
+        self._resyncs = {}
+        self._pending = set()  # channels the listener has yet to subscribe to
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def publish(self, channel, message):
+        try:
+            self._client.publish(channel, json.dumps(message))
+        except self._errors as exc:
+            logger.warning('Message on %s dropped, Redis unavailable: %s', channel, exc)
+
+    def subscribe(self, channel, callback, resync=None):
+        with self._lock:
+            callbacks = self._subscribers.setdefault(channel, {})
+            if not callbacks:
+                self._pending.add(channel)
+            callbacks[callback] = None
+            if resync is not None:
+                self._resyncs[resync] = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='pubsub', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        """Deliver messages forever, reconnecting and resyncing after the connection drops"""
+        delay, lost = 0, False
+        while True:
+            try:
+                with self._lock:
+                    pending = list(self._pending)
+                if pending:
+                    self._pubsub.subscribe(**dict.fromkeys(pending, self._deliver))
+                    with self._lock:
+                        self._pending.difference_update(pending)
+                # Reconnecting happens in here, and restores the earlier subscriptions
+                self._pubsub.get_message(timeout=LISTEN_TIMEOUT)
+            except self._errors as exc:
+                if not lost:
+                    logger.warning('Pub/sub connection lost, reconnecting: %s', exc)
+                delay, lost = min(delay * 2 or 0.1, RECONNECT_MAX_DELAY), True
+                time.sleep(delay)
+                continue
+            except Exception:
+                logger.exception('Pub/sub listener failed')
+                time.sleep(LISTEN_TIMEOUT)
+                continue
+            if lost:
+                logger.warning('Pub/sub connection restored')
+                delay, lost = 0, False
+                self._resync()
+
+    def _resync(self):
+        with self._lock:
+            resyncs = list(self._resyncs)
+        try:
+            for resync in resyncs:
+                try:
+                    resync()
+                except Exception:
+                    logger.exception('Resync after reconnecting failed')
+        finally:
+            connections.close_all()  # this thread's own, opened by resyncs reading the database
+
+    def _deliver(self, raw):
+        message = json.loads(raw['data'])
+        with self._lock:
+            callbacks = list(self._subscribers.get(raw['channel'].decode(), ()))
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception('Subscriber to %s failed', raw['channel'])
+
+
+_broker = (None, None)
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """This process's broker; a forked worker does not inherit its parent's connection or thread"""
+    global _broker
+    pid, broker = _broker
+    if pid != os.getpid():
+        with _broker_lock:
+            pid, broker = _broker
+            if pid != os.getpid():
+                url = settings.PUBSUB_REDIS_URL
+                broker = RedisBroker(url) if url else LocalBroker()
+                _broker = os.getpid(), broker
+    return broker
+
+
+def publish(channel, payload):
+    """Send `payload` (JSON-serializable) to the other processes subscribed to `channel`"""
+    get_broker().publish(channel, {'origin': origin(), 'payload': payload})
+
+
+def subscribe(channel, callback, resync=None):
+    """
+    Call `callback(payload)` for each message other processes publish on
+    `channel`, and `resync()` once the subscription is restored after
+    messages may have been lost; idempotent
+    """
+    get_broker().subscribe(channel, _FromOthers(callback), resync)
+
+
+class _FromOthers:
+    """Subscriber wrapper skipping this process's own messages (equal per callback, so subscribing twice is a no-op)"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, message):
+        if message['origin'] != origin():
+            self.callback(message['payload'])
+
+    def __eq__(self, other):
+        return isinstance(other, _FromOthers) and other.callback == self.callback
+
+    def __hash__(self):
+        return hash(self.callback)
@@ -0,0 +1,46 @@
+"""
+Declarative per-endpoint query budgets for events_platform project.
+
+Each URLconf declares the most queries any of its URL names may run per
+request, e.g. in events/urls.py:
+
+    query_budgets.declare({'event-search': 3, ...})
+
+Budgets are flat: a list endpoint must run the same number of queries for 1
+or 50 results. The query budget tests exercise every declared URL name at
+both sizes. In production, MetricsMiddleware calls `check()` on every request
+and logs a warning when a request goes over its budget.
+"""
+
+import logging
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+_budgets = {}
+
+
+def declare(budgets):
+    """Register {url_name: max_queries} for a URLconf"""
+    for name, limit in budgets.items():
+        if _budgets.get(name, limit) != limit:
+            raise ImproperlyConfigured(f'Conflicting query budgets for URL name "{name}"')
+    _budgets.update(budgets)
+
+
+def get_budgets():
+    """Every declared budget, once the URLconf has been loaded"""
+    get_resolver().url_patterns
+    return dict(_budgets)
+
+
+def check(view_name, query_count, request):
+    """Log a warning when a request ran more queries than its URL name allows"""
+    budget = _budgets.get(view_name)
+    if budget is not None and query_count > budget:
+        logger.warning(
+            'Query budget exceeded: %s %s (%s) ran %d queries, budget %d',
+            request.method, request.path, view_name, query_count, budget,
+        )
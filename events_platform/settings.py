@@ -5,10 +5,12 @@ Django settings for events_platform project.
 import os
 from pathlib import Path
 from datetime import timedelta
-from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env (set LOAD_DOTENV=False where the environment is set directly)
+if os.getenv('LOAD_DOTENV', 'True') == 'True':
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,11 +42,14 @@ INSTALLED_APPS = [
     # Local apps
     'accounts',
     'events',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'events_platform.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'events_platform.staticfiles.WhiteNoiseMiddleware',
+    'events_platform.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,6 +59,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request Server-Timing headers and JSON timing logs (opt-in, sampled)
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'False') == 'True'
+REQUEST_TIMING_SAMPLE_RATE = float(os.getenv('REQUEST_TIMING_SAMPLE_RATE', 0.01))
+if REQUEST_TIMING_ENABLED:
+    MIDDLEWARE.insert(1, 'events_platform.timing.RequestTimingMiddleware')
+
+# Staff-only on-demand profiling ("X-Profile: 1" or "?_profile=1"), at most PROFILING_RATE_LIMIT per hour
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_RATE_LIMIT = int(os.getenv('PROFILING_RATE_LIMIT', 30))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv('PROFILING_SAMPLE_INTERVAL', 0.005))
+if PROFILING_ENABLED:
+    MIDDLEWARE.append('core.profiling.ProfilingMiddleware')
+
+# Process role: web (default), worker or beat. Celery processes never serve HTTP, so they
+# skip the admin, API docs, DRF and CORS apps and all middleware; workers also skip beat's
+# scheduler models. `python manage.py startup_report` compares the roles.
+APP_ROLE = os.getenv('APP_ROLE', 'web')
+WEB_ONLY_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework',
+    'rest_framework_simplejwt',
+    'corsheaders',
+    'drf_spectacular',
+]
+if APP_ROLE not in ('web', 'worker', 'beat'):
+    raise ImproperlyConfigured(f'APP_ROLE must be web, worker or beat, not {APP_ROLE!r}')
+if APP_ROLE != 'web':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+    MIDDLEWARE = []
+if APP_ROLE == 'worker':
+    INSTALLED_APPS.remove('django_celery_beat')
+
 ROOT_URLCONF = 'events_platform.urls'
 
 TEMPLATES = [
@@ -83,9 +123,73 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'events_password'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Bounded per-process connection pool (web and Celery workers), off when DB_POOL_MAX_SIZE=0.
+# Pooled connections are returned at the end of each request/task, so CONN_MAX_AGE must be 0.
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 0))
+if DB_POOL_MAX_SIZE:
+    DATABASES['default'].update({
+        'ENGINE': 'events_platform.db.backends.postgresql_pool',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+                'max_size': DB_POOL_MAX_SIZE,
+                'max_lifetime': int(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+                'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', 30)),
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            },
+        },
+    })
+
+# Read replicas (comma-separated host[:port] list, same credentials as the primary)
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['events_platform.db_router.PrimaryReplicaRouter']
+
+# Seconds a client reads from the primary after a successful write
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+# Cache (Redis when configured, local memory otherwise)
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# In-process tier in front of the cache (events_platform.tiered): entries kept per cache,
+# and seconds an entry is trusted should an invalidation message be lost
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 10000))
+LOCAL_CACHE_SECONDS = int(os.getenv('LOCAL_CACHE_SECONDS', 5))
+
+# Seconds users' roles and verification are cached for permission checks (accounts.profiles)
+PROFILE_CACHE_SECONDS = int(os.getenv('PROFILE_CACHE_SECONDS', 300))
+
+# Pub/sub between processes (events_platform.pubsub); in-process only when unset
+PUBSUB_REDIS_URL = os.getenv('PUBSUB_REDIS_URL', REDIS_URL)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -132,6 +236,53 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': int(os.getenv('DEFAULT_PAGE_SIZE', 20)),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'accounts.utils.custom_exception_handler',
+    # Proxies in front of the app; throttles then take the client IP from X-Forwarded-For
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None,
+}
+
+# Furthest ahead (days) event listings expand recurring series occurrences
+EVENT_SERIES_WINDOW_DAYS = int(os.getenv('EVENT_SERIES_WINDOW_DAYS', 90))
+
+# Seconds search facet counts (?facets=) are cached per normalized set of filters
+EVENT_FACETS_CACHE_SECONDS = int(os.getenv('EVENT_FACETS_CACHE_SECONDS', 60))
+
+# Seconds an event's detail is cached, and how long past that (or an edit) it is
+# still served while one request rebuilds it (see events.detail)
+EVENT_DETAIL_CACHE_SECONDS = int(os.getenv('EVENT_DETAIL_CACHE_SECONDS', 30))
+EVENT_DETAIL_STALE_SECONDS = int(os.getenv('EVENT_DETAIL_STALE_SECONDS', 30))
+
+# Seconds a seat stream ticket (events.seats) can be used, once, in place of the access token
+SEAT_STREAM_TICKET_SECONDS = int(os.getenv('SEAT_STREAM_TICKET_SECONDS', 30))
+
+# Idempotency-Key on enroll and signup (events_platform.idempotency): seconds a response is kept
+# for retries, and seconds a duplicate waits for the request still running with its key
+IDEMPOTENCY_KEY_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_SECONDS', 86400))
+IDEMPOTENCY_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 5))
+
+# Seconds waitlist promotion emails are held back so that promotions close together go out as one batch
+WAITLIST_NOTIFY_BATCH_SECONDS = int(os.getenv('WAITLIST_NOTIFY_BATCH_SECONDS', 10))
+
+# Resolves event locations to coordinates: a class with geocode(location) -> (lat, lng) | None
+GEOCODER = os.getenv('GEOCODER', 'events.geo.GazetteerGeocoder')
+
+# Enrolling in an event that overlaps another of the seeker's events:
+# 'reject' answers 400 schedule_conflict, 'warn' enrolls and lists the conflicts
+ENROLLMENT_CONFLICT_POLICY = os.getenv('ENROLLMENT_CONFLICT_POLICY', 'reject')
+if ENROLLMENT_CONFLICT_POLICY not in ('reject', 'warn'):
+    raise ImproperlyConfigured(
+        f'ENROLLMENT_CONFLICT_POLICY must be reject or warn, not {ENROLLMENT_CONFLICT_POLICY!r}'
+    )
+
+# Token-bucket throttles per URL name (see events_platform.throttling), "capacity/period"
+# per client IP, per email in the body, per user, or shared by all clients (global)
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True') == 'True'
+THROTTLE_REDIS_URL = os.getenv('THROTTLE_REDIS_URL', REDIS_URL)
+THROTTLE_RATES = {
+    'signup': {'ip': '10/hour', 'email': '3/hour', 'global': '20/sec'},
+    'resend-otp': {'ip': '10/hour', 'email': '3/hour', 'global': '20/sec'},
+    'verify-email': {'ip': '30/hour', 'email': '10/hour'},
+    'login': {'ip': '30/min', 'email': '10/min'},
+    'seeker-enroll': {'user': '20/min'},
 }
 
 # JWT Settings
@@ -139,7 +290,8 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_LIFETIME_MINUTES', 60))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_LIFETIME_DAYS', 7))),
     'ROTATE_REFRESH_TOKENS': True,
-    'BLACKLIST_AFTER_ROTATION': True,
+    'BLACKLIST_AFTER_ROTATION': True,  # JTIs kept in the cache until expiry (accounts.tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
     'UPDATE_LAST_LOGIN': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -170,9 +322,37 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Prometheus metrics (/api/metrics), scraped with "Authorization: Bearer <METRICS_TOKEN>". Without a
+# token the endpoint is only served with DEBUG on.
+# Multiprocess servers and Celery workers also need PROMETHEUS_MULTIPROC_DIR in the environment.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {'format': '%(message)s'},
+        'verbose': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'verbose'},
+        'request_timing': {'class': 'logging.StreamHandler', 'formatter': 'json_line'},
+    },
+    'loggers': {
+        'events_platform.query_budgets': {'handlers': ['console'], 'level': 'WARNING'},
+        'events_platform.timing': {'handlers': ['request_timing'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+# django-cors-headers' defaults plus Idempotency-Key (not imported: worker processes skip the package)
+CORS_ALLOW_HEADERS = [
+    'accept', 'authorization', 'content-type', 'user-agent', 'x-csrftoken', 'x-requested-with', 'idempotency-key',
+]
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 # Spectacular Settings (API Documentation)
 SPECTACULAR_SETTINGS = {
@@ -182,6 +362,9 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Pre-rendered OpenAPI schema, written by "manage.py build_schema" at build time
+OPENAPI_SCHEMA_DIR = os.getenv('OPENAPI_SCHEMA_DIR', str(BASE_DIR / 'build' / 'openapi'))
+
 # Security Settings for Production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
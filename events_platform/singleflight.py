@@ -0,0 +1,138 @@
+"""
+Single-flight caching: one rebuild of a cache entry at a time.
+
+cached(key, build, ttl) returns the value cached under `key`, or calls
+build() and caches its result for `ttl` seconds. Without coordination,
+every request that misses the same entry runs build() (a popular event just
+edited: hundreds of requests each counting its enrollments). Instead:
+
+    - within a process, the first caller builds and the others wait on its
+      Future and get the same result (or exception),
+    - across processes, the builder holds a lock key in the cache (cache.add,
+      a SET NX with Redis) while it builds. Callers that find the lock taken
+      poll the cache for up to `wait` seconds for the holder's value, then
+      build it themselves rather than fail.
+
+With `stale` seconds, an entry past its ttl is kept that much longer and
+served while the one caller that takes its lock rebuilds it
+(stale-while-revalidate). expire(key) makes an entry stale at once, for
+writes that change it; delete(key) drops it.
+
+Values go through the cache, so they must pickle, and callers of the same
+process may share one object: treat values as read-only. Exceptions raised
+by build() are not cached.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from django.core.cache import cache
+
+ENTRY_KEY = 'singleflight:{}'
+LOCK_KEY = 'singleflight:lock:{}'
+LOCK_SECONDS = 10  # a builder that dies holding a lock blocks its key at most this long
+WAIT = 1.0  # seconds a caller waits for another process's build before building itself
+POLL = 0.02
+
+_flights = {}  # key -> Future of the build running in this process
+_flights_lock = threading.Lock()
+
+
+def cached(key, build, ttl, stale=0, wait=WAIT):
+    """The value cached under `key`, built by build() in one caller at a time"""
+    return lookup(key, build, ttl, stale, wait)[0]
+
+
+def lookup(key, build, ttl, stale=0, wait=WAIT):
+    """(value, fresh) as cached() finds it; fresh is False for a stale entry served during a rebuild"""
+    entry = cache.get(ENTRY_KEY.format(key))
+    if entry is not None:
+        fresh_until, _, value = entry
+        if time.time() < fresh_until:
+            return value, True
+        # Served stale to everyone but the one caller rebuilding it, in this process or another
+        return _flight(key, lambda: _refresh(key, build, ttl, stale, value), busy=(value, False))
+    return _flight(key, lambda: (_fill(key, build, ttl, stale, wait), True))
+
+
+def _flight(key, build, busy=None):
+    """
+    build() once per key in this process at a time; callers arriving meanwhile
+    share its outcome, or get `busy` at once if given
+    """
+    with _flights_lock:
+        future = _flights.get(key)
+        leader = future is None
+        if leader:
+            future = _flights[key] = Future()
+    if not leader:
+        return future.result() if busy is None else busy
+    try:
+        value = build()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        with _flights_lock:
+            del _flights[key]
+
+
+def _fill(key, build, ttl, stale, wait):
+    """Build a missing entry, or wait for the process holding its lock to"""
+    if cache.add(LOCK_KEY.format(key), 1, LOCK_SECONDS):
+        return _rebuild(key, build, ttl, stale)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL)
+        entry = cache.get(ENTRY_KEY.format(key))
+        if entry is not None:
+            return entry[2]
+    # The holder is slow or gone: build without its lock (and leave the lock alone)
+    value = build()
+    _store(key, value, ttl, stale)
+    return value
+
+
+def _refresh(key, build, ttl, stale, value):
+    """(value, fresh) for a stale entry: rebuilt if this caller gets its lock, else as it is"""
+    # Taken by the leader only, so that a caller that turns out to be a follower holds no lock
+    if not cache.add(LOCK_KEY.format(key), 1, LOCK_SECONDS):
+        return value, False  # being rebuilt by another process
+    return _rebuild(key, build, ttl, stale), True
+
+
+def _rebuild(key, build, ttl, stale):
+    """Build and store an entry whose lock this caller holds"""
+    try:
+        value = build()
+        _store(key, value, ttl, stale)
+        return value
+    finally:
+        cache.delete(LOCK_KEY.format(key))
+
+
+def _store(key, value, ttl, stale):
+    now = time.time()
+    cache.set(ENTRY_KEY.format(key), (now + ttl, now + ttl + stale, value), ttl + stale)
+
+
+def expire(key):
+    """Make the entry stale: the next caller rebuilds it, callers meanwhile still get it until it drops out"""
+    entry = cache.get(ENTRY_KEY.format(key))
+    if entry is None:
+        return
+    _, dropped_at, value = entry
+    remaining = dropped_at - time.time()
+    if remaining >= 1:
+        cache.set(ENTRY_KEY.format(key), (0, dropped_at, value), int(remaining))
+    else:
+        cache.delete(ENTRY_KEY.format(key))
+
+
+def delete(key):
+    """Drop the entry; the next caller rebuilds it"""
+    cache.delete(ENTRY_KEY.format(key))
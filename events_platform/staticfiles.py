@@ -0,0 +1,36 @@
+"""
+Static file serving for events_platform project.
+
+whitenoise's middleware is sync-only: under ASGI, Django would run the rest
+of the middleware chain, and with it every async view, on a thread behind
+it. This subclass also runs natively in async mode. Static files are looked
+up in memory (on disk with WHITENOISE_AUTOREFRESH, i.e. in DEBUG) and opened
+on a thread; other requests go straight to the next handler.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,784 @@
+"""
+Tests for events_platform project infrastructure.
+"""
+
+import time
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from django.db.backends.postgresql.base import Database
+from events_platform.db.pool import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture
+def connection_pool(db):
+    """A small pool of real connections to the test database"""
+    conn_params = connection.get_connection_params()
+    pool = ConnectionPool(lambda: Database.connect(**conn_params), max_size=2, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+class TestConnectionPool:
+    def test_connections_are_reused(self, connection_pool):
+        """Test that a returned connection is handed out again"""
+        first = connection_pool.getconn()
+        connection_pool.putconn(first)
+
+        assert connection_pool.getconn() is first
+        assert connection_pool.size == 1
+
+    def test_pool_size_is_bounded(self, connection_pool):
+        """Test that checkouts beyond max_size time out"""
+        connection_pool.getconn()
+        connection_pool.getconn()
+
+        with pytest.raises(PoolTimeout):
+            connection_pool.getconn()
+
+    def test_warmup_opens_min_size(self, connection_pool):
+        """Test per-process warmup"""
+        connection_pool.min_size = 2
+        connection_pool.warmup()
+
+        assert connection_pool.size == connection_pool.idle == 2
+
+    def test_expired_connections_are_recycled(self, connection_pool):
+        """Test that connections older than max_lifetime are closed on return"""
+        connection_pool.max_lifetime = 0
+        first = connection_pool.getconn()
+        connection_pool.putconn(first)
+
+        assert first.closed
+        assert connection_pool.getconn() is not first
+
+    def test_stale_idle_connection_is_health_checked(self, connection_pool):
+        """Test that a dead idle connection is replaced on checkout"""
+        connection_pool.max_idle = 0
+        first = connection_pool.getconn()
+        connection_pool.putconn(first)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [first.get_backend_pid()])
+        time.sleep(0.01)
+
+        second = connection_pool.getconn()
+        assert second is not first
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_open_transaction_is_rolled_back_on_return(self, connection_pool):
+        """Test that a connection never re-enters the pool mid-transaction"""
+        first = connection_pool.getconn()
+        with first.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection_pool.putconn(first)
+
+        assert first.info.transaction_status == 0
+
+
+@pytest.mark.django_db
+def test_pooled_backend_returns_connection_on_close():
+    """Test that closing a pooled Django connection keeps the session open for reuse"""
+    from events_platform.db.backends.postgresql_pool.base import DatabaseWrapper
+
+    pooled = DatabaseWrapper({
+        **connection.settings_dict,
+        'ENGINE': 'events_platform.db.backends.postgresql_pool',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {'pool': {'max_size': 1}},
+    }, alias='pooled')
+    try:
+        pooled.ensure_connection()
+        raw_connection = pooled.connection
+        pooled.close()
+
+        assert not raw_connection.closed
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pooled.connection is raw_connection
+        pooled.close()
+    finally:
+        pooled.pool.close()
+
+
+class TestPubSub:
+    def test_subscribers_skip_their_own_process(self):
+        """Test that only other processes' messages are delivered, once per subscription"""
+        from events_platform import pubsub
+
+        received = []
+        pubsub.subscribe('test-channel', received.append)
+        pubsub.subscribe('test-channel', received.append)
+
+        pubsub.publish('test-channel', {'n': 1})
+        pubsub.get_broker().publish('test-channel', {'origin': 'another-worker', 'payload': {'n': 2}})
+
+        assert received == [{'n': 2}]
+
+    def test_listener_reconnects_and_resyncs(self, monkeypatch):
+        """Test that a dropped Redis connection is retried and subscribers resync once it is back"""
+        import json
+        import os
+        import threading
+        import redis
+        from events_platform import pubsub
+
+        class PubSub:
+            """Fails its first reads, like a connection Redis dropped, then delivers one message"""
+            def __init__(self):
+                self.channels = {}
+                self.failures = 2
+                self.delivered = threading.Event()
+
+            def subscribe(self, **channels):
+                self.channels.update(channels)
+
+            def get_message(self, timeout):
+                if self.failures:
+                    self.failures -= 1
+                    raise redis.ConnectionError('Connection closed by server.')
+                if not self.delivered.is_set():
+                    self.delivered.set()
+                    data = json.dumps({'origin': 'another-worker', 'payload': {'n': 1}})
+                    self.channels['test-channel']({'channel': b'test-channel', 'data': data})
+                else:
+                    threading.Event().wait(timeout)
+
+        monkeypatch.setattr(pubsub, 'RECONNECT_MAX_DELAY', 0.01)
+        broker = pubsub.RedisBroker('redis://127.0.0.1:1/0')
+        broker._pubsub = PubSub()
+        monkeypatch.setattr(pubsub, '_broker', (os.getpid(), broker))
+
+        received, resynced = [], threading.Event()
+        pubsub.subscribe('test-channel', received.append, resync=resynced.set)
+        assert broker._pubsub.delivered.wait(2) and resynced.wait(2)
+        assert received == [{'n': 1}]
+        assert broker._thread.is_alive()
+
+
+class TestSingleFlight:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_concurrent_misses_build_once(self):
+        """Test that threads missing the same key share one build"""
+        import threading
+        from events_platform import singleflight
+
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.2)
+            return {'value': 1}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(singleflight.cached('hot', build, 60)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert results == [{'value': 1}] * 8
+
+    def test_stale_entry_served_while_another_process_rebuilds(self):
+        """Test that an expired entry is served while its lock is held, then rebuilt by the next caller"""
+        from django.core.cache import cache
+        from events_platform import singleflight
+
+        singleflight.cached('event', lambda: 'old', 60, stale=60)
+        singleflight.expire('event')
+        cache.add(singleflight.LOCK_KEY.format('event'), 1)  # another worker is rebuilding
+
+        assert singleflight.cached('event', lambda: 'new', 60, stale=60) == 'old'
+
+        cache.delete(singleflight.LOCK_KEY.format('event'))
+        assert singleflight.cached('event', lambda: 'new', 60, stale=60) == 'new'
+        assert singleflight.cached('event', lambda: 'newer', 60, stale=60) == 'new'
+
+    def test_miss_waits_for_the_lock_holder(self):
+        """Test that a miss whose lock is held waits for the holder's value, and builds once the wait is over"""
+        import threading
+        from django.core.cache import cache
+        from events_platform import singleflight
+
+        cache.add(singleflight.LOCK_KEY.format('facets'), 1)
+        holder = threading.Timer(0.1, singleflight._store, args=('facets', 'theirs', 60, 0))
+        holder.start()
+        assert singleflight.cached('facets', lambda: 'ours', 60, wait=5) == 'theirs'
+        holder.join()
+
+        cache.add(singleflight.LOCK_KEY.format('stuck'), 1)
+        assert singleflight.cached('stuck', lambda: 'ours', 60, wait=0.1) == 'ours'
+
+    def test_stale_hit_during_a_build_in_this_process_takes_no_lock(self):
+        """Test that a stale entry is served, and its lock left free, while a thread of this process builds"""
+        import threading
+        from django.core.cache import cache
+        from events_platform import singleflight
+
+        release = threading.Event()
+        cache.add(singleflight.LOCK_KEY.format('event'), 1)  # so the first build runs without the lock
+        builder = threading.Thread(
+            target=singleflight.cached, args=('event', lambda: release.wait(2), 60), kwargs={'wait': 0}
+        )
+        builder.start()
+        while 'event' not in singleflight._flights:
+            time.sleep(0.01)
+
+        cache.delete(singleflight.LOCK_KEY.format('event'))
+        singleflight._store('event', 'old', 0, 60)
+        assert singleflight.lookup('event', lambda: 'new', 60, stale=60) == ('old', False)
+        assert cache.get(singleflight.LOCK_KEY.format('event')) is None
+
+        release.set()
+        builder.join()
+
+    def test_build_errors_are_not_cached(self):
+        """Test that an exception reaches the caller and the next caller builds again"""
+        from events_platform import singleflight
+
+        def fail():
+            raise ValueError('database went away')
+
+        with pytest.raises(ValueError):
+            singleflight.cached('broken', fail, 60)
+        assert singleflight.cached('broken', lambda: 'built', 60) == 'built'
+
+
+class TestTieredCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_local_tier_is_bounded_and_counted(self):
+        """Test that the least recently used entry is evicted and lookups are counted per tier"""
+        from events_platform.tiered import TieredCache
+
+        tiered = TieredCache('test:bounded', max_entries=2)
+        for key in ('a', 'b', 'a', 'c'):  # 'b' is least recently used when 'c' arrives
+            tiered.get(key, lambda: key.upper(), 60)
+
+        assert tiered.get('a', lambda: 'rebuilt', 60) == 'A'
+        assert tiered.get('b', lambda: 'rebuilt', 60) == 'B'  # from the shared tier
+        assert tiered.stats() == {
+            'local_hit': 2, 'shared_hit': 1, 'miss': 3, 'hit_rate': 0.5, 'evictions': 2, 'entries': 2,
+        }
+
+    def test_invalidation_reaches_other_workers(self):
+        """Test that invalidate() drops both tiers and another worker's message drops the local copy"""
+        from events_platform import pubsub
+        from events_platform.tiered import CHANNEL, TieredCache
+
+        tiered = TieredCache('test:invalidate')
+        assert tiered.get('1', lambda: 'v1', 60) == 'v1'
+        tiered.invalidate('1')
+        assert tiered.get('1', lambda: 'v2', 60) == 'v2'
+
+        tiered.local.set('1', 'old copy', 60)
+        pubsub.get_broker().publish(CHANNEL, {
+            'origin': 'another-worker', 'payload': {'cache': 'test:invalidate', 'key': '1'},
+        })
+        assert tiered.get('1', lambda: 'v3', 60) == 'v2'
+
+    def test_stale_shared_value_is_not_kept_locally(self):
+        """Test that a stale value served during another worker's rebuild is not cached in-process"""
+        from django.core.cache import cache
+        from events_platform import singleflight
+        from events_platform.tiered import TieredCache
+
+        tiered = TieredCache('test:stale')
+        tiered.get('1', lambda: 'old', 60, stale=60)
+        tiered.invalidate('1', stale=True)
+        cache.add(singleflight.LOCK_KEY.format(tiered.shared_key('1')), 1)  # another worker is rebuilding
+
+        assert tiered.get('1', lambda: 'new', 60, stale=60) == 'old'
+        assert len(tiered.local) == 0
+
+    def test_values_are_built_from_primary(self, settings):
+        """Test that a build during a replica-routed request still reads the primary"""
+        from events_platform import db_router
+        from events_platform.tiered import TieredCache
+
+        settings.DATABASE_REPLICAS = ['replica']
+        router = db_router.PrimaryReplicaRouter()
+        token = db_router._use_replica.set(True)
+        try:
+            assert router.db_for_read(None) == 'replica'
+            assert TieredCache('test:primary').get('1', lambda: router.db_for_read(None), 60) == 'default'
+            assert router.db_for_read(None) == 'replica'
+        finally:
+            db_router._use_replica.reset(token)
+
+
+def test_asgi_middleware_stays_async(settings):
+    """Test that every middleware, opt-in ones included, runs natively under ASGI so async views get no thread"""
+    from asgiref.sync import SyncToAsync
+    from django.core.handlers.asgi import ASGIHandler
+    from django.utils.module_loading import import_string
+
+    settings.MIDDLEWARE = [
+        *settings.MIDDLEWARE, 'events_platform.timing.RequestTimingMiddleware', 'core.profiling.ProfilingMiddleware',
+    ]
+    sync_only = [path for path in settings.MIDDLEWARE if not getattr(import_string(path), 'async_capable', False)]
+
+    assert sync_only == []
+    assert not isinstance(ASGIHandler()._middleware_chain, SyncToAsync)
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_request_metrics_are_exported_per_view(self, settings):
+        """Test that /api/metrics exposes per-view histograms"""
+        settings.DEBUG = True
+        client = APIClient()
+        client.get('/api/health/')
+
+        response = client.get('/api/metrics')
+
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert 'http_request_duration_seconds_count{method="GET",view="health-check"}' in body
+        assert 'http_request_db_queries_bucket{le="0.0",method="GET",view="health-check"}' in body
+        assert 'http_response_size_bytes_count{method="GET",view="health-check"}' in body
+
+    def test_metrics_token(self, settings):
+        """Test that a configured token is required to scrape"""
+        settings.METRICS_TOKEN = 'scrape-secret'
+        client = APIClient()
+
+        assert client.get('/api/metrics').status_code == 401
+        client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        assert client.get('/api/metrics').status_code == 200
+
+    def test_metrics_need_a_token_outside_debug(self, settings):
+        """Test that without a token the endpoint is only served in DEBUG"""
+        settings.METRICS_TOKEN = ''
+        client = APIClient()
+
+        assert client.get('/api/metrics').status_code == 404
+        settings.DEBUG = True
+        assert client.get('/api/metrics').status_code == 200
+
+    def test_async_handler_is_awaited(self):
+        """Test that under ASGI the middleware awaits the handler (no thread) and still counts its queries"""
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.contrib.auth.models import User
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from prometheus_client import REGISTRY
+        from events_platform.metrics import MetricsMiddleware
+
+        async def view(request):
+            await User.objects.acount()
+            return HttpResponse('ok')
+
+        middleware = MetricsMiddleware(view)
+        assert iscoroutinefunction(middleware)
+
+        labels = {'view': 'unresolved', 'method': 'GET'}
+        queries = REGISTRY.get_sample_value('http_request_db_queries_sum', labels) or 0
+        assert async_to_sync(middleware)(RequestFactory().get('/')).status_code == 200
+        assert REGISTRY.get_sample_value('http_request_db_queries_sum', labels) == queries + 1
+
+    def test_celery_task_metrics(self):
+        """Test that task duration and outcome are recorded"""
+        from prometheus_client import REGISTRY
+        from events.tasks import send_enrollment_followup_email
+
+        labels = {'task': send_enrollment_followup_email.name, 'state': 'success'}
+        successes = REGISTRY.get_sample_value('celery_tasks_total', labels) or 0
+
+        send_enrollment_followup_email.apply()
+
+        assert REGISTRY.get_sample_value('celery_tasks_total', labels) == successes + 1
+        assert REGISTRY.get_sample_value(
+            'celery_task_duration_seconds_count', {'task': send_enrollment_followup_email.name}
+        ) >= 1
+
+
+@pytest.fixture
+def request_timing(settings, monkeypatch):
+    """Time every request and let the timing logger reach caplog"""
+    from events_platform import timing
+
+    settings.MIDDLEWARE = ['events_platform.timing.RequestTimingMiddleware', *settings.MIDDLEWARE]
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1.0
+    monkeypatch.setattr(timing.logger, 'propagate', True)
+
+
+@pytest.mark.django_db
+class TestRequestTiming:
+    def test_server_timing_header_and_log_line(self, request_timing, caplog):
+        """Test that phases are reported in Server-Timing and one JSON log line"""
+        import json
+        from django.contrib.auth.models import User
+        from accounts.models import UserProfile, UserRole
+
+        user = User.objects.create_user(
+            username='timing@example.com', email='timing@example.com', password='SecurePass123!'
+        )
+        UserProfile.objects.create(user=user, role=UserRole.SEEKER, email_verified=True)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with caplog.at_level('INFO', logger='events_platform.timing'):
+            response = client.get('/api/events/')
+
+        assert response.status_code == 200
+        phases = {entry.split(';')[0] for entry in response['Server-Timing'].split(', ')}
+        assert phases == {'auth', 'permission', 'db', 'serialize', 'render', 'total'}
+
+        [record] = [r for r in caplog.records if r.name == 'events_platform.timing']
+        line = json.loads(record.getMessage())
+        assert line['view'] == 'event-list'
+        assert line['status'] == 200
+        assert line['query_count'] >= 1
+        assert line['slowest_query']['sql']
+
+    def test_unsampled_requests_are_untouched(self, request_timing, settings):
+        """Test that requests outside the sample get no header"""
+        settings.REQUEST_TIMING_SAMPLE_RATE = 0.0
+
+        response = APIClient().get('/api/health/')
+
+        assert 'Server-Timing' not in response
+
+    def test_async_handler_is_awaited(self, request_timing):
+        """Test that under ASGI sampled requests are timed without moving the handler onto a thread"""
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.contrib.auth.models import User
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from events_platform.timing import RequestTimingMiddleware
+
+        async def view(request):
+            await User.objects.acount()
+            return HttpResponse('ok')
+
+        middleware = RequestTimingMiddleware(view)
+        assert iscoroutinefunction(middleware)
+
+        response = async_to_sync(middleware)(RequestFactory().get('/'))
+        assert 'db;dur=' in response['Server-Timing']
+        assert '"1 queries"' in response['Server-Timing']
+
+    def test_duplicate_queries_fingerprint(self):
+        """Test that repeated statements are reported most repeated first"""
+        from events_platform.timing import duplicate_queries
+
+        count_sql = 'SELECT COUNT(*) FROM enrollments WHERE event_id = %s'
+        statements = [('SELECT 1', 0.001)] + [(count_sql, 0.001)] * 3
+
+        assert duplicate_queries(statements) == [{'sql': count_sql, 'count': 3}]
+
+
+def url_names(patterns):
+    from django.urls import URLResolver
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+def jwt_client(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    @pytest.fixture
+    def page_size(self, settings, monkeypatch):
+        """Pages big enough to hold the largest scenario"""
+        from rest_framework.pagination import PageNumberPagination
+
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'PAGE_SIZE': 50}
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 50)
+
+    @pytest.fixture
+    def world(self, db, page_size, settings):
+        from datetime import timedelta
+        from itertools import count
+        from django.contrib.auth.models import User
+        from django.utils import timezone
+        from accounts.models import UserProfile, UserRole
+        from events.models import Enrollment, Event, EventSeries
+
+        settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        sequence = count()
+
+        class World:
+            def user(self, role, **profile):
+                email = f'{role.lower()}{next(sequence)}@example.com'
+                user = User.objects.create_user(username=email, email=email, password='SecurePass123!')
+                UserProfile.objects.create(user=user, role=role, **{'email_verified': True, **profile})
+                return user
+
+            def events(self, n, created_by=None):
+                created_by = created_by or self.user(UserRole.FACILITATOR)
+                starts_at = timezone.now() + timedelta(days=1)
+                return [
+                    Event.objects.create(
+                        title=f'Budget Event {next(sequence)}', description='Query budget scenario',
+                        language='English', location='Online', starts_at=starts_at,
+                        ends_at=starts_at + timedelta(hours=2), capacity=1000, created_by=created_by,
+                    )
+                    for _ in range(n)
+                ]
+
+            def series(self, n, created_by=None):
+                """Weekly series without an end, first occurrence tomorrow"""
+                created_by = created_by or self.user(UserRole.FACILITATOR)
+                starts_at = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+                return [
+                    EventSeries.objects.create(
+                        title=f'Budget Series {next(sequence)}', description='Query budget scenario',
+                        language='English', location='Online', starts_at=starts_at,
+                        ends_at=starts_at + timedelta(hours=2), rrule='FREQ=WEEKLY', capacity=1000,
+                        created_by=created_by,
+                    )
+                    for _ in range(n)
+                ]
+
+            def enroll(self, events, seeker=None):
+                """Enroll `seeker` (or a new seeker per event) and one more seeker in each event"""
+                for event in events:
+                    for user in (seeker or self.user(UserRole.SEEKER), self.user(UserRole.SEEKER)):
+                        Enrollment.objects.create(event=event, seeker=user)
+
+        return World()
+
+    def scenarios(self, world):
+        """URL name -> scenarios, each `n -> callable performing the request`"""
+        from datetime import timedelta
+        from accounts.models import UserRole
+        from events import waitlist
+        from events.models import Enrollment, Event
+
+        seeker = world.user(UserRole.SEEKER)
+        facilitator = world.user(UserRole.FACILITATOR)
+        seeker_client, facilitator_client = jwt_client(seeker), jwt_client(facilitator)
+
+        def listing(client, path, events_of=None, enrolled=None):
+            def scenario(n):
+                events = world.events(n, created_by=events_of)
+                world.enroll(events, seeker=enrolled)
+                return lambda: client.get(path)
+            return scenario
+
+        def listing_with_series(client, path):
+            def scenario(n):
+                world.events(n)
+                world.series(n)
+                return lambda: client.get(path)
+            return scenario
+
+        def faceted(client, path):
+            def scenario(n):
+                from django.core.cache import cache
+
+                world.events(n)
+                cache.clear()  # count the facet query, not a cached result
+                return lambda: client.get(path, {'facets': 'language,location,date'})
+            return scenario
+
+        def autocomplete(n):
+            from events import autocomplete
+
+            world.events(n)
+            autocomplete.reset()
+            autocomplete.get_index()  # built at worker start, not per request
+            return lambda: seeker_client.get('/api/events/autocomplete', {'prefix': 'budget ev'})
+
+        def single_series(make_request):
+            """A series of `facilitator` with n materialized occurrences"""
+            def scenario(n):
+                [series] = world.series(1, created_by=facilitator)
+                for starts_at in series.occurrences(series.starts_at, series.starts_at + timedelta(weeks=n - 1)):
+                    series.materialize(starts_at)
+                return lambda: make_request(series)
+            return scenario
+
+        def single_event(make_request):
+            def scenario(n):
+                [event] = world.events(1, created_by=facilitator)
+                for _ in range(n):
+                    world.enroll([event])
+                return lambda: make_request(event)
+            return scenario
+
+        def new_seeker_enroll(make_scenario, payload):
+            """Enroll as a seeker with no other enrollments (world events overlap, which would be a conflict)"""
+            def scenario(n):
+                client = jwt_client(world.user(UserRole.SEEKER))
+                return make_scenario(
+                    lambda target: client.post('/api/seeker/enroll', payload(target), format='json')
+                )(n)
+            return scenario
+
+        def unverified(make_request):
+            def scenario(n):
+                user = world.user(UserRole.SEEKER, email_verified=False)
+                return lambda: make_request(user)
+            return scenario
+
+        def otp_verification(n):
+            from accounts.utils import create_otp
+
+            user = world.user(UserRole.SEEKER, email_verified=False)
+            otp = create_otp(user.email)
+            return lambda: APIClient().post('/auth/verify-email', {'email': user.email, 'otp': otp.otp_code})
+
+        def login(n):
+            user = world.user(UserRole.SEEKER)
+            return lambda: APIClient().post('/auth/login', {'email': user.email, 'password': 'SecurePass123!'})
+
+        def refresh(n):
+            from rest_framework_simplejwt.tokens import RefreshToken
+
+            token = str(RefreshToken.for_user(world.user(UserRole.SEEKER)))
+            return lambda: APIClient().post('/auth/refresh', {'refresh': token})
+
+        def cancel(n):
+            [event] = world.events(1)
+            world.enroll([event], seeker=seeker)
+            for _ in range(n):
+                world.enroll([event])
+            enrollment = Enrollment.objects.get(event=event, seeker=seeker)
+            return lambda: seeker_client.post(f'/api/seeker/enrollments/{enrollment.id}/cancel')
+
+        def waitlisted(n):
+            """An event whose two seats are taken (one by `seeker`), with n seekers on its waitlist"""
+            [event] = world.events(1)
+            world.enroll([event], seeker=seeker)
+            Event.objects.filter(pk=event.pk).update(capacity=2)
+            for _ in range(n):
+                waitlist.join(event, world.user(UserRole.SEEKER))
+            return Event.objects.get(pk=event.pk)
+
+        def cancel_promoting(n):
+            enrollment = Enrollment.objects.get(event=waitlisted(n), seeker=seeker)
+            return lambda: seeker_client.post(f'/api/seeker/enrollments/{enrollment.id}/cancel')
+
+        def full_event(make_request):
+            def scenario(n):
+                event = waitlisted(n)
+                return lambda: make_request(event)
+            return scenario
+
+        new_event = {
+            'title': 'New', 'description': 'New event', 'language': 'English', 'location': 'Online',
+            'starts_at': '2099-01-01T10:00:00Z', 'ends_at': '2099-01-01T12:00:00Z',
+        }
+
+        new_series = {**new_event, 'rrule': 'FREQ=WEEKLY;COUNT=10'}
+
+        def occurrence(series):
+            """An occurrence after the materialized ones"""
+            return series.get_rule().after(series.starts_at + timedelta(weeks=60)).isoformat()
+
+        return {
+            'api-root': [lambda n: lambda: seeker_client.get('/api/')],
+            'event-search': [
+                listing(seeker_client, '/api/events/search/'),
+                listing_with_series(seeker_client, '/api/events/search/'),
+                faceted(seeker_client, '/api/events/search/'),
+            ],
+            'event-autocomplete': [autocomplete],
+            'event-list': [
+                listing(seeker_client, '/api/events/'),
+                listing_with_series(seeker_client, '/api/events/'),
+                lambda n: lambda: facilitator_client.post('/api/events/', new_event, format='json'),
+            ],
+            'event-detail': [
+                single_event(lambda event: seeker_client.get(f'/api/events/{event.id}/')),
+                single_event(lambda event: facilitator_client.patch(
+                    f'/api/events/{event.id}/', {'title': 'Renamed'}, format='json')),
+                single_event(lambda event: facilitator_client.delete(f'/api/events/{event.id}/')),
+            ],
+            'event-seats-ticket': [
+                single_event(lambda event: seeker_client.post(f'/api/events/{event.id}/seats/ticket/')),
+            ],
+            'series-list': [
+                lambda n: (world.series(n), lambda: seeker_client.get('/api/series/'))[1],
+                lambda n: lambda: facilitator_client.post('/api/series/', new_series, format='json'),
+            ],
+            'series-detail': [
+                single_series(lambda series: seeker_client.get(f'/api/series/{series.id}/')),
+                single_series(lambda series: facilitator_client.patch(
+                    f'/api/series/{series.id}/', {'title': 'Renamed'}, format='json')),
+            ],
+            'series-materialize': [
+                single_series(lambda series: facilitator_client.post(
+                    f'/api/series/{series.id}/materialize/', {'starts_at': occurrence(series)}, format='json')),
+            ],
+            'seeker-enroll': [
+                new_seeker_enroll(single_event, lambda event: {'event_id': event.id}),
+                new_seeker_enroll(
+                    single_series, lambda series: {'series_id': series.id, 'starts_at': occurrence(series)}
+                ),
+                new_seeker_enroll(full_event, lambda event: {'event_id': event.id, 'waitlist': True}),
+            ],
+            'seeker-enrollments': [listing(seeker_client, '/api/seeker/enrollments', enrolled=seeker)],
+            'seeker-conflicts': [listing(seeker_client, '/api/seeker/conflicts', enrolled=seeker)],
+            'cancel-enrollment': [cancel, cancel_promoting],
+            'facilitator-events': [listing(facilitator_client, '/api/facilitator/events', events_of=facilitator)],
+            'async-event-search': [
+                listing(seeker_client, '/api/async/events/search/'),
+                faceted(seeker_client, '/api/async/events/search/'),
+            ],
+            'async-event-list': [listing(seeker_client, '/api/async/events/')],
+            'async-event-detail': [single_event(lambda event: seeker_client.get(f'/api/async/events/{event.id}/'))],
+            'async-seeker-enrollments': [listing(seeker_client, '/api/async/seeker/enrollments', enrolled=seeker)],
+            'signup': [lambda n: lambda: APIClient().post('/auth/signup', {
+                'email': f'signup{n}@example.com', 'password': 'SecurePass123!', 'role': UserRole.SEEKER,
+            })],
+            'verify-email': [otp_verification],
+            'login': [login],
+            'resend-otp': [unverified(lambda user: APIClient().post('/auth/resend-otp', {'email': user.email}))],
+            'token-refresh': [refresh],
+            'current-user': [lambda n: lambda: seeker_client.get('/auth/me')],
+        }
+
+    def test_every_endpoint_has_a_budget_and_scenario(self, world):
+        """Test that no URL name in the app URLconfs goes unbudgeted or unexercised"""
+        import accounts.urls
+        import events.urls
+        from events_platform.query_budgets import get_budgets
+
+        names = set(url_names(events.urls.urlpatterns)) | set(url_names(accounts.urls.urlpatterns))
+
+        assert names == set(get_budgets())
+        assert names == set(self.scenarios(world))
+
+    def test_query_counts_are_flat_and_within_budget(self, world, assert_query_budget):
+        """Test every endpoint at 1 and 50 results"""
+        for url_name, scenarios in self.scenarios(world).items():
+            for scenario in scenarios:
+                assert_query_budget(url_name, scenario)
+
+    def test_runtime_warning_over_budget(self, world, monkeypatch, caplog):
+        """Test that the production middleware logs requests over their budget"""
+        from accounts.models import UserRole
+        from events_platform import query_budgets
+
+        monkeypatch.setitem(query_budgets._budgets, 'current-user', 1)
+
+        with caplog.at_level('WARNING', logger='events_platform.query_budgets'):
+            jwt_client(world.user(UserRole.SEEKER)).get('/auth/me')
+
+        assert 'Query budget exceeded: GET /auth/me (current-user) ran 2 queries, budget 1' in caplog.text
@@ -0,0 +1,175 @@
+"""
+Token-bucket throttling for events_platform project.
+
+THROTTLE_RATES maps a URL name to its buckets, each "capacity/period":
+
+    'login': {'ip': '30/min', 'email': '10/min', 'global': '100/sec'}
+
+A bucket holds up to `capacity` tokens and refills at capacity/period, so
+bursts are allowed but the sustained rate is capped. Keys are per client IP,
+per email in the request body, per authenticated user, or one bucket shared
+by all clients ("global", load shedding for endpoints that send email).
+Buckets are checked in that order and checking stops at the first empty one,
+so a throttled IP does not drain the email and global buckets.
+
+TokenBucketThrottle runs in DRF's throttle check. For the AllowAny auth views
+that is before any ORM work. A denied request gets a 429 with Retry-After.
+With THROTTLE_REDIS_URL set, buckets live in Redis and are updated by one
+Lua script per check, so all web workers share them. Otherwise each process
+keeps its own buckets in memory (development and tests). If Redis is
+unreachable, requests are allowed and a warning is logged.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('ip', 'email', 'user', 'global')
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# KEYS[1] bucket; ARGV capacity, refill per second. Returns {allowed, seconds to wait}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or capacity
+local at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * refill)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill) + 1)
+return {wait == 0 and 1 or 0, tostring(wait)}
+"""
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacity 10, refill 10/60 tokens per second)"""
+    count, _, period = rate.partition('/')
+    if period not in PERIODS:
+        raise ImproperlyConfigured(f'Invalid throttle rate "{rate}"')
+    return int(count), int(count) / PERIODS[period]
+
+
+class LocalBuckets:
+    """Per-process token buckets, for development and tests"""
+
+    max_buckets = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill):
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - at) * refill)
+            wait = 0 if tokens >= 1 else (1 - tokens) / refill
+            if not wait:
+                tokens -= 1
+            if len(self._buckets) >= self.max_buckets and key not in self._buckets:
+                self._buckets.clear()
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBuckets:
+    """Token buckets shared by every process through Redis"""
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._script = self._client.register_script(TOKEN_BUCKET_LUA)
+        self._errors = (redis.RedisError,)
+
+    def consume(self, key, capacity, refill):
+        try:
+            _, wait = self._script(keys=[key], args=[capacity, refill])
+        except self._errors as exc:
+            logger.warning('Throttle check skipped, Redis unavailable: %s', exc)
+            return 0
+        return float(wait)
+
+    def clear(self):
+        for key in self._client.scan_iter('throttle:*'):
+            self._client.delete(key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = settings.THROTTLE_REDIS_URL
+                _backend = RedisBuckets(url) if url else LocalBuckets()
+    return _backend
+
+
+def reset():
+    """Refill every bucket (tests)"""
+    get_backend().clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Apply the THROTTLE_RATES buckets of the resolved URL name"""
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        if not settings.THROTTLE_ENABLED:
+            return True
+        url_name = request.resolver_match.url_name
+        rates = settings.THROTTLE_RATES.get(url_name)
+        if rates is None:
+            raise ImproperlyConfigured(f'No THROTTLE_RATES for URL name "{url_name}"')
+
+        backend = get_backend()
+        for kind in KINDS:
+            if kind not in rates:
+                continue
+            ident = self.get_identity(kind, request)
+            if ident is None:
+                continue
+            capacity, refill = parse_rate(rates[kind])
+            self.wait_seconds = backend.consume(f'throttle:{url_name}:{kind}:{ident}', capacity, refill)
+            if self.wait_seconds:
+                return False
+        return True
+
+    def get_identity(self, kind, request):
+        if kind == 'ip':
+            return self.get_ident(request)
+        if kind == 'email':
+            email = request.data.get('email') if hasattr(request.data, 'get') else None
+            if not isinstance(email, str) or not email.strip():
+                return None
+            return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        if kind == 'user':
+            return request.user.pk if request.user.is_authenticated else None
+        return 'all'
+
+    def wait(self):
+        return math.ceil(self.wait_seconds) or None
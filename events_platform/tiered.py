@@ -0,0 +1,163 @@
+"""
+Two-tier caching: a bounded in-process LRU in front of the shared cache.
+
+Every request looks up the same few hot objects (the requesting user's
+profile, popular event details). The shared cache (Redis) still costs a
+round-trip per lookup, so a TieredCache keeps the most recently used
+entries of each worker in memory too:
+
+    local     up to LOCAL_CACHE_MAX_ENTRIES entries, least recently used
+              dropped first, each trusted for at most LOCAL_CACHE_SECONDS
+    shared    the Django cache through events_platform.singleflight, for
+              the ttl the caller gives (one build per key at a time)
+
+invalidate(key) drops the entry from both tiers, here and, through the
+'tiered' channel (events_platform.pubsub), in every other worker. A worker
+that misses the message serves its copy until LOCAL_CACHE_SECONDS pass, or
+until its pub/sub connection is restored, which empties its local tiers.
+Stale values that the shared tier serves during a rebuild are not kept
+locally. Values are built from the primary database (db_router.primary()):
+a replica's lagging copy, once cached, would reach every worker's local
+tier and outlive any invalidation sent before it was built.
+
+Lookups are counted per cache as local hits, shared hits and misses, and
+size evictions separately (tiered_cache_lookups / tiered_cache_evictions in
+events_platform.metrics, and stats() in-process).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from events_platform import pubsub, singleflight
+from events_platform.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+CHANNEL = 'tiered'
+RESULTS = ('local_hit', 'shared_hit', 'miss')
+
+
+class LocalLRU:
+    """Bounded, thread-safe map of key -> (expires_at, value), least recently used first out"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        """(True, value), or (False, None) when absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key, value, ttl):
+        """Store the value; returns how many entries were evicted to make room"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    """Named two-tier cache; keys are strings, values must pickle and are shared read-only"""
+
+    def __init__(self, name, max_entries=None):
+        self.name = name
+        self.local = LocalLRU(max_entries or settings.LOCAL_CACHE_MAX_ENTRIES)
+        self.counts = dict.fromkeys(RESULTS, 0)
+        self._subscribed = None  # pid that subscribed to invalidations
+        _caches[name] = self
+
+    def shared_key(self, key):
+        return f'{self.name}:{key}'
+
+    def get(self, key, build, ttl, stale=0):
+        """The value under `key`: from this process, the shared cache, or build()"""
+        if self._subscribed != os.getpid():
+            pubsub.subscribe(CHANNEL, receive, resync=clear_local)
+            self._subscribed = os.getpid()
+
+        found, value = self.local.get(key)
+        if found:
+            return self._count('local_hit', value)
+
+        from events_platform.db_router import primary
+
+        built = []
+
+        def counted_build():
+            # Both tiers hand the value to every client: never build it from a lagging replica
+            built.append(True)
+            with primary():
+                return build()
+
+        value, fresh = singleflight.lookup(self.shared_key(key), counted_build, ttl, stale)
+        if fresh:
+            evicted = self.local.set(key, value, min(ttl, settings.LOCAL_CACHE_SECONDS))
+            if evicted:
+                CACHE_EVICTIONS.labels(self.name).inc(evicted)
+        return self._count('miss' if built else 'shared_hit', value)
+
+    def _count(self, result, value):
+        self.counts[result] += 1
+        CACHE_LOOKUPS.labels(self.name, result).inc()
+        return value
+
+    def invalidate(self, key, stale=False):
+        """Drop `key` in every process; with stale, the shared entry is served stale while it is rebuilt"""
+        self.local.delete(key)
+        if stale:
+            singleflight.expire(self.shared_key(key))
+        else:
+            singleflight.delete(self.shared_key(key))
+        pubsub.publish(CHANNEL, {'cache': self.name, 'key': key})
+
+    def stats(self):
+        lookups = sum(self.counts.values())
+        return {
+            **self.counts,
+            'hit_rate': round((self.counts['local_hit'] + self.counts['shared_hit']) / lookups, 4) if lookups else None,
+            'evictions': self.local.evictions,
+            'entries': len(self.local),
+        }
+
+
+_caches = {}  # name -> TieredCache
+
+
+def receive(message):
+    """Drop the local copy another worker invalidated"""
+    tiered = _caches.get(message['cache'])
+    if tiered is not None:
+        tiered.local.delete(message['key'])
+
+
+def clear_local():
+    """Empty the in-process tier of every cache (tests, and after invalidations were lost)"""
+    for tiered in _caches.values():
+        tiered.local.clear()
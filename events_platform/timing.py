@@ -0,0 +1,175 @@
+"""
+Opt-in per-request timing breakdowns for events_platform project.
+
+When REQUEST_TIMING_ENABLED is set, RequestTimingMiddleware times a sample
+(REQUEST_TIMING_SAMPLE_RATE) of requests. It splits each sampled request into
+auth, permission, db, serialize and render phases. The phases are returned
+as a Server-Timing header and written as one JSON log line, together with
+the query count, duplicated statements (the N+1 fingerprint) and the
+slowest query. Phases are captured by wrapping DRF's APIView
+authentication/permission hooks and Serializer.data. Requests that are not
+sampled only pay for a random() call and a context variable lookup.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.views import APIView
+from events_platform.instrumentation import collect_queries
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('auth', 'permission', 'db', 'serialize', 'render')
+
+_current_timer = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Accumulated wall time per phase for one request"""
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._active = set()
+
+    @contextmanager
+    def measure(self, phase):
+        # Nested calls (e.g. ListSerializer -> Serializer) are only counted once
+        if phase in self._active:
+            yield
+            return
+        self._active.add(phase)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - started
+            self._active.discard(phase)
+
+
+def timed(phase, func):
+    """Wrap `func` so its run time is added to the current request's `phase`"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return func(*args, **kwargs)
+        with timer.measure(phase):
+            return func(*args, **kwargs)
+    wrapper.request_timing_phase = phase
+    return wrapper
+
+
+def install_drf_hooks():
+    """Time DRF authentication, permission checks and serialization (idempotent)"""
+    for name, phase in (
+        ('perform_authentication', 'auth'),
+        ('check_permissions', 'permission'),
+        ('check_object_permissions', 'permission'),
+    ):
+        method = getattr(APIView, name)
+        if not hasattr(method, 'request_timing_phase'):
+            setattr(APIView, name, timed(phase, method))
+
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        data = serializer_class.__dict__['data']
+        if not hasattr(data.fget, 'request_timing_phase'):
+            serializer_class.data = property(timed('serialize', data.fget))
+
+
+def duplicate_queries(statements, limit=5):
+    """Statements run more than once, most repeated first"""
+    counts = Counter(sql for sql, _ in statements)
+    return [
+        {'sql': sql, 'count': count}
+        for sql, count in counts.most_common(limit)
+        if count > 1
+    ]
+
+
+def server_timing_header(phases, total, query_count):
+    entries = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in phases.items()]
+    entries[PHASES.index('db')] += f';desc="{query_count} queries"'
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+class RequestTimingMiddleware:
+    """Emit Server-Timing headers and a JSON timing log line for sampled requests"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_drf_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.REQUEST_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            with collect_queries(record=True) as queries:
+                response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.report(request, response, timer, time.perf_counter() - started, queries)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.REQUEST_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            with collect_queries(record=True) as queries:
+                response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.report(request, response, timer, time.perf_counter() - started, queries)
+
+    def report(self, request, response, timer, total, queries):
+        timer.phases['db'] = queries.duration
+
+        response['Server-Timing'] = server_timing_header(timer.phases, total, queries.count)
+        self.log(request, response, timer, total, queries)
+        return response
+
+    def process_template_response(self, request, response):
+        timer = _current_timer.get()
+        if timer is not None:
+            response.render = timed('render', response.render)
+        return response
+
+    def log(self, request, response, timer, total, queries):
+        slowest = max(queries.statements, key=lambda statement: statement[1], default=None)
+        resolver_match = getattr(request, 'resolver_match', None)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'phases_ms': {phase: round(seconds * 1000, 2) for phase, seconds in timer.phases.items()},
+            'query_count': queries.count,
+            'duplicate_queries': duplicate_queries(queries.statements),
+            'slowest_query': {
+                'sql': slowest[0],
+                'duration_ms': round(slowest[1] * 1000, 2),
+            } if slowest else None,
+        }))
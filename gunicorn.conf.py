@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for events_platform project.
+
+Picked up automatically when gunicorn is started from the project root.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    """Start every deploy with empty Prometheus multiprocess files"""
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_worker_init(worker):
+    """Open the worker's database connections and build its autocomplete index before it accepts requests"""
+    from events_platform.db.pool import warm_pools
+    warm_pools()
+
+    from events.autocomplete import get_index
+    get_index()
+
+
+def worker_exit(server, worker):
+    from events_platform.db.pool import close_pools
+    close_pools()
+
+
+def child_exit(server, worker):
+    """Stop aggregating live gauges of a dead worker"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -60,6 +60,21 @@ def setup_tasks():
     else:
         print("✓ Task already exists: Send event reminder emails")
     
+    # Waitlist promotion email task (catches promotions whose queued run was lost)
+    task3, created3 = PeriodicTask.objects.get_or_create(
+        name='Send waitlist promotion emails',
+        defaults={
+            'interval': schedule,
+            'task': 'events.tasks.send_waitlist_promotion_emails',
+            'enabled': True,
+        }
+    )
+    
+    if created3:
+        print("✓ Created task: Send waitlist promotion emails")
+    else:
+        print("✓ Task already exists: Send waitlist promotion emails")
+    
     print("\n✅ Setup complete! Celery Beat will now run these tasks every 5 minutes.")
     print("\nMake sure Celery worker and beat are running:")
     print("  1. celery -A events_platform worker -l info")